@@ -24,6 +24,8 @@ import numpy as np
 import scipy.fftpack
 import sounddevice as sd
 
+from audio.pitch_contour import PitchContour
+
 
 class MicListener:
     def __init__(self):
@@ -42,6 +44,7 @@ class MicAnalyzer:
     POWER_THRESH = 1e-6  # tuning is activated if the signal power exceeds this threshold
     CONCERT_PITCH = 440  # defining a1
     WHITE_NOISE_THRESH = 0.2  # everything under WHITE_NOISE_THRESH*avg_energy_per_freq is cut off
+    PEAK_WIDTH = 2 * NUM_HPS  # half width of the main lobe of the hann window in the interpolated spectrum
 
     WINDOW_T_LEN = WINDOW_SIZE / SAMPLE_FREQ  # length of the window in seconds
     SAMPLE_T_LENGTH = 1 / SAMPLE_FREQ  # length between two samples in seconds
@@ -59,6 +62,10 @@ class MicAnalyzer:
         self.HANN_WINDOW = np.hanning(self.WINDOW_SIZE)
         self.window_samples = [0 for _ in range(self.WINDOW_SIZE)]
         self.noteBuffer = ["1", "2"]
+        # every analyzed hop is recorded when a PitchContour is set
+        self.pitch_contour = None
+        # every block of samples is given to raw_audio_tap(indata) when set, eg RawAudioRecorder.tap - must not block
+        self.raw_audio_tap = None
         # listeners
         self.listeners = []
 
@@ -72,7 +79,16 @@ class MicAnalyzer:
 
     def do_stop_hearing(self):
         self.is_listening = False
-        self.download_thread.join()
+        if self.download_thread and self.download_thread is not threading.current_thread():
+            self.download_thread.join()
+
+    def request_stop_hearing(self):
+        """
+        stops hearing without waiting for the end of the listening thread
+        safe from the listeners, which are called while the stream is open
+        :return:
+        """
+        self.is_listening = False
 
     def _listen(self):
         self.start_time = datetime.now()
@@ -100,6 +116,9 @@ class MicAnalyzer:
       Callback function of the InputStream method.
       That's where the magic happens ;)
       """
+        raw_audio_tap = self.raw_audio_tap
+        if raw_audio_tap is not None:
+            raw_audio_tap(indata)
         if status:
             if self.debug:
                 print("SS", status)
@@ -113,6 +132,8 @@ class MicAnalyzer:
             if signal_power < self.POWER_THRESH:
                 os.system('cls' if os.name == 'nt' else 'clear')
                 # print("Closest note: ...")
+                if self.pitch_contour is not None:
+                    self.pitch_contour.append(0.0)
                 self._set_current_note("-")
                 return
 
@@ -157,6 +178,9 @@ class MicAnalyzer:
             max_freq = max_ind * (self.SAMPLE_FREQ / self.WINDOW_SIZE) / self.NUM_HPS
 
             closest_note, closest_pitch = self.find_closest_note(max_freq)
+            if self.pitch_contour is not None:
+                self.pitch_contour.append(max_freq, closest_pitch,
+                                          PitchContour.get_peak_confidence(hps_spec, max_ind, self.PEAK_WIDTH))
             max_freq = round(max_freq, 1)
             closest_pitch = round(closest_pitch, 1)
 
@@ -169,6 +193,8 @@ class MicAnalyzer:
             else:
                 self._set_current_note("-")
         else:
+            if self.pitch_contour is not None:
+                self.pitch_contour.append(0.0)
             self._set_current_note("-")
             print('no input')
 
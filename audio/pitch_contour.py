@@ -0,0 +1,109 @@
+import math
+import time
+
+import numpy as np
+
+
+class PitchContour:
+    """
+    every analyzed hop of the microphone: time, frequency, offset to the closest note in cents & confidence
+    stored column by column in typed arrays whose capacity doubles when full (amortized O(1) appends)
+    silent hops are stored with a NaN frequency so that the plots show the gaps
+    """
+    INITIAL_CAPACITY = 1024
+    COLUMNS = {"time": np.float64, "frequency": np.float32, "cents": np.float32, "confidence": np.float32}
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.size = 0
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.size = 0
+
+    def _grow(self):
+        for name, column in self.columns.items():
+            grown = np.empty(max(1, 2 * len(column)), dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def append(self, frequency: float, closest_pitch: float = 0.0, confidence: float = 1.0, hop_time: float = None):
+        """
+        :param frequency: heard frequency in Hz - 0 for a silence
+        :param closest_pitch: frequency of the closest note in Hz
+        :param confidence: between 0 and 1
+        :param hop_time: time.time() of the hop - now by default
+        :return:
+        """
+        if self.size == len(self.columns["time"]):
+            self._grow()
+        i = self.size
+        self.columns["time"][i] = hop_time if hop_time is not None else time.time()
+        if frequency > 0:
+            self.columns["frequency"][i] = frequency
+            self.columns["cents"][i] = 1200 * math.log2(frequency / closest_pitch) if closest_pitch > 0 else np.nan
+            self.columns["confidence"][i] = confidence
+        else:
+            self.columns["frequency"][i] = np.nan
+            self.columns["cents"][i] = np.nan
+            self.columns["confidence"][i] = 0.0
+        self.size += 1
+
+    @staticmethod
+    def get_peak_confidence(spectrum: np.ndarray, peak_index: int, peak_width: int,
+                            nb_other_peaks: int = 5) -> float:
+        """
+        confidence of a pitch picked at the highest peak of a spectrum, eg a harmonic product spectrum
+        the next peaks are summed: the highest peak of a noise spectrum often stands out of the second one alone
+        :param spectrum: magnitudes
+        :param peak_index: index of the highest magnitude
+        :param peak_width: bins on each side of the peak that belong to it
+        :param nb_other_peaks: number of the next highest local maxima compared to the peak
+        :return: 1 - sum of the next peaks / highest peak: 1 for a single peak, 0 when the next peaks are as high
+        """
+        peak = spectrum[peak_index]
+        if peak <= 0:
+            return 0.0
+        others = np.concatenate((spectrum[:max(0, peak_index - peak_width)], spectrum[peak_index + peak_width + 1:]))
+        inner = others[1:-1]
+        local_maxima = inner[(inner >= others[:-2]) & (inner >= others[2:])]
+        if not len(local_maxima):
+            return 1.0
+        if len(local_maxima) > nb_other_peaks:
+            local_maxima = np.partition(local_maxima, -nb_other_peaks)[-nb_other_peaks:]
+        return float(max(0.0, 1 - local_maxima.sum() / peak))
+
+    def get_column(self, name: str) -> np.ndarray:
+        """
+        :param name: one of COLUMNS
+        :return: a view of the recorded values - no copy
+        """
+        return self.columns[name][:self.size]
+
+    def get_view(self, start_time: float = None, end_time: float = None, max_points: int = None) -> dict:
+        """
+        decimated views for plotting, eg the intonation of a whole session
+        :param start_time: time.time() of the first hop - from the beginning by default
+        :param end_time: time.time() of the last hop - to the end by default
+        :param max_points: keeps one hop over n to return at most max_points hops
+        :return: {column name: view of the values} - no copy
+        """
+        size = self.size
+        times = self.columns["time"][:size]
+        first = int(np.searchsorted(times, start_time, side="left")) if start_time is not None else 0
+        last = int(np.searchsorted(times, end_time, side="right")) if end_time is not None else size
+        step = max(1, math.ceil((last - first) / max_points)) if max_points else 1
+        return {name: column[first:last:step] for name, column in self.columns.items()}
+
+    def get_intonation(self, min_confidence: float = 0.5) -> (float, float):
+        """
+        :param min_confidence: hops under this confidence are ignored
+        :return: (mean offset in cents, standard deviation in cents) of the confident voiced hops
+        """
+        cents = self.get_column("cents")
+        confident = cents[(self.get_column("confidence") >= min_confidence) & ~np.isnan(cents)]
+        if not len(confident):
+            return 0.0, 0.0
+        return float(confident.mean()), float(confident.std())
@@ -0,0 +1,132 @@
+import queue
+import threading
+import wave
+
+import numpy as np
+
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+
+class RawAudioRecorder:
+    """
+    copies the microphone input to audio files for an offline re-analysis
+    the audio callback only copies the samples into buffers of a fixed pool: it never waits
+    a block larger than a buffer is split across several buffers, each buffer missing in the pool is a dropped buffer
+    a writer thread writes the buffers in files of CHUNK_SECONDS, FLAC when soundfile is installed, WAV otherwise
+    """
+    NB_BUFFERS = 64
+    CHUNK_SECONDS = 60
+
+    def __init__(self, base_file_name: str, sample_freq: int, buffer_size: int, nb_buffers: int = NB_BUFFERS,
+                 chunk_seconds: int = CHUNK_SECONDS, use_flac: bool = True):
+        """
+        :param base_file_name: the chunks are named {base_file_name}_0000.wav, {base_file_name}_0001.wav...
+        :param sample_freq: in Hz
+        :param buffer_size: samples of each buffer of the pool, usually the number of samples given to tap() at once
+        :param nb_buffers: size of the pool - the memory used is nb_buffers * buffer_size samples
+        :param chunk_seconds: duration of each file
+        :param use_flac: FLAC files if soundfile is installed
+        """
+        self.base_file_name = base_file_name
+        self.sample_freq = sample_freq
+        self.buffer_size = buffer_size
+        self.chunk_samples = int(chunk_seconds * sample_freq)
+        self.extension = "flac" if use_flac and soundfile else "wav"
+        self.free_buffers = queue.Queue()
+        for _ in range(0, nb_buffers):
+            self.free_buffers.put(np.empty(buffer_size, dtype=np.float32))
+        self.filled_buffers = queue.Queue()
+        self.chunk_files = []
+        self.nb_dropped_buffers = 0
+        self.nb_samples = 0
+        self.on_closed = None
+        self.debug = False
+        self.writer_thread = None
+        self.is_recording = False
+
+    def start(self):
+        self.is_recording = True
+        self.writer_thread = threading.Thread(target=self._write, name="_raw_audio_writer", daemon=True)
+        self.writer_thread.start()
+
+    def tap(self, indata: np.ndarray):
+        """
+        called by the audio callback
+        :param indata: samples x channels, only the 1st channel is kept
+        :return:
+        """
+        if not self.is_recording:
+            return
+        for start in range(0, len(indata), self.buffer_size):
+            try:
+                buffer = self.free_buffers.get_nowait()
+            except queue.Empty:
+                self.nb_dropped_buffers += 1
+                continue
+            length = min(len(indata) - start, self.buffer_size)
+            buffer[:length] = indata[start:start + length, 0]
+            self.filled_buffers.put_nowait((buffer, length))
+
+    def stop(self, wait: bool = True, on_closed=None):
+        """
+        :param wait: False to let the writer thread end in background
+        :param on_closed: function(recorder) called by the writer thread once the last file is closed
+        :return:
+        """
+        if not self.is_recording:
+            return
+        self.is_recording = False
+        self.on_closed = on_closed
+        self.filled_buffers.put(None)
+        if wait:
+            self.writer_thread.join()
+
+    def _open_chunk(self):
+        file_name = f"{self.base_file_name}_{len(self.chunk_files):04d}.{self.extension}"
+        self.chunk_files.append(file_name)
+        if self.extension == "flac":
+            return soundfile.SoundFile(file_name, "w", samplerate=self.sample_freq, channels=1, format="FLAC")
+        chunk = wave.open(file_name, "wb")
+        chunk.setnchannels(1)
+        chunk.setsampwidth(2)
+        chunk.setframerate(self.sample_freq)
+        return chunk
+
+    def _write_samples(self, chunk, samples: np.ndarray):
+        if self.extension == "flac":
+            chunk.write(samples)
+        else:
+            chunk.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+
+    def _write(self):
+        chunk = None
+        chunk_length = 0
+        while True:
+            item = self.filled_buffers.get()
+            if item is None:
+                break
+            buffer, length = item
+            written = 0
+            while written < length:
+                if not chunk:
+                    chunk = self._open_chunk()
+                    chunk_length = 0
+                size = min(length - written, self.chunk_samples - chunk_length)
+                self._write_samples(chunk, buffer[written:written + size])
+                written += size
+                chunk_length += size
+                if chunk_length == self.chunk_samples:
+                    chunk.close()
+                    chunk = None
+            self.nb_samples += length
+            self.free_buffers.put(buffer)
+        if chunk:
+            chunk.close()
+        if self.debug or self.nb_dropped_buffers:
+            print("RawAudioRecorder", self.nb_samples, "samples in", len(self.chunk_files), "files -",
+                  self.nb_dropped_buffers, "dropped buffers")
+        if self.on_closed:
+            self.on_closed(self)
@@ -6,6 +6,8 @@ from tkinter.ttk import Progressbar
 from pytube import YouTube
 import os
 
+from file_capabilities.http_session import HttpSession
+
 
 class DownloadMP3Youtube(tkinter.Tk):
     def __init__(self):
@@ -18,6 +20,7 @@ class DownloadMP3Youtube(tkinter.Tk):
         self.search_button = None
         self.progress_bar = None
         self.out_file = None
+        self.http_session = HttpSession.get_default_session()
 
         # def display(self, root: tkinter.Tk):
     def get_ui_frame(self, root: tkinter.Tk) -> Frame:
@@ -47,9 +50,11 @@ class DownloadMP3Youtube(tkinter.Tk):
         video = yt.streams.filter(only_audio=True).first()
 
         destination = "download"
+        os.makedirs(destination, exist_ok=True)
 
-        # download the file
-        self.out_file = video.download(output_path=destination)
+        # download the file through the shared keep-alive connections
+        self.out_file = os.path.join(destination, video.default_filename)
+        self.http_session.download(video.url, self.out_file)
 
         # save the file
         base, ext = os.path.splitext(self.out_file)
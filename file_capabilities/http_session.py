@@ -0,0 +1,205 @@
+import gzip
+import http.client
+import ssl
+import threading
+import time
+import urllib.error
+from email.message import Message
+from urllib.parse import urlsplit, urljoin
+
+
+class HttpResponse:
+    def __init__(self, url: str, status: int, reason: str, headers: Message, body: bytes):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def text(self, encoding: str = None) -> str:
+        charset = encoding or self.headers.get_content_charset() or "utf-8"
+        return self.body.decode(charset, errors="replace")
+
+
+class HttpSession:
+    """
+    process wide pool of keep-alive HTTP(S) connections, so that repeated requests to a host skip the TCP & TLS
+    handshakes - at most max_connections_per_host connections are opened to a host, the others wait for a free one
+    """
+    MAX_CONNECTIONS_PER_HOST = 4
+    TIMEOUT = 15  # seconds
+    MAX_REDIRECTS = 5
+    CHUNK_SIZE = 9 * 1024 * 1024  # bytes per request of download()
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:106.0) Gecko/20100101 Firefox/106.0'
+    STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError,
+                               http.client.CannotSendRequest, http.client.BadStatusLine)
+    default_session = None
+    default_session_lock = threading.Lock()
+
+    def __init__(self, max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST, timeout: float = TIMEOUT,
+                 user_agent: str = USER_AGENT):
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.ssl_context = ssl.create_default_context()
+        self.lock = threading.Lock()
+        self.idle_connections = {}  # (scheme, host, port) -> [connection]
+        self.host_semaphores = {}  # (scheme, host, port) -> threading.Semaphore
+        # metrics
+        self.nb_requests = 0
+        self.nb_connections = 0  # opened connections
+        self.nb_reused_connections = 0
+        self.nb_errors = 0
+        self.nb_bytes = 0  # received bodies, once decompressed
+        self.request_time = 0.0  # seconds spent in requests
+
+    @staticmethod
+    def get_default_session():
+        """
+        :return: the session shared by the whole application
+        """
+        with HttpSession.default_session_lock:
+            if not HttpSession.default_session:
+                HttpSession.default_session = HttpSession()
+            return HttpSession.default_session
+
+    def get_metrics(self) -> dict:
+        with self.lock:
+            return {"requests": self.nb_requests, "connections": self.nb_connections,
+                    "reused connections": self.nb_reused_connections, "errors": self.nb_errors,
+                    "bytes": self.nb_bytes, "request time": round(self.request_time, 3),
+                    "idle connections": sum(len(c) for c in self.idle_connections.values())}
+
+    def _acquire(self, key: tuple) -> (http.client.HTTPConnection, bool):
+        with self.lock:
+            semaphore = self.host_semaphores.get(key)
+            if not semaphore:
+                semaphore = self.host_semaphores[key] = threading.Semaphore(self.max_connections_per_host)
+        semaphore.acquire()
+        with self.lock:
+            idle = self.idle_connections.get(key)
+            if idle:
+                self.nb_reused_connections += 1
+                return idle.pop(), True
+            self.nb_connections += 1
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self.ssl_context), False
+        return http.client.HTTPConnection(host, port, timeout=self.timeout), False
+
+    def _release(self, key: tuple, connection: http.client.HTTPConnection, keep_alive: bool):
+        if keep_alive:
+            with self.lock:
+                self.idle_connections.setdefault(key, []).append(connection)
+        else:
+            connection.close()
+        self.host_semaphores[key].release()
+
+    def _send(self, method: str, url: str, headers: dict, body: bytes) -> HttpResponse:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL {url}")
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        headers = {"User-Agent": self.user_agent, "Accept-Encoding": "gzip", "Connection": "keep-alive",
+                   **(headers or {})}
+        while True:
+            connection, reused = self._acquire(key)
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except self.STALE_CONNECTION_ERRORS:
+                self._release(key, connection, False)
+                if reused:
+                    # closed by the server while idle: a new connection is opened
+                    continue
+                raise
+            except BaseException:
+                self._release(key, connection, False)
+                raise
+            self._release(key, connection, not response.will_close)
+            if response.getheader("Content-Encoding") == "gzip":
+                data = gzip.decompress(data)
+            return HttpResponse(url, response.status, response.reason, response.msg, data)
+
+    def request(self, method: str, url: str, headers: dict = None, body: bytes = None) -> HttpResponse:
+        """
+        :param method: eg "GET"
+        :param url:
+        :param headers: added to the default ones
+        :param body:
+        :return: the response, redirections followed
+        """
+        start = time.monotonic()
+        try:
+            for _ in range(0, self.MAX_REDIRECTS + 1):
+                response = self._send(method, url, headers, body)
+                location = response.headers.get("Location")
+                if response.status in (301, 302, 303, 307, 308) and location:
+                    url = urljoin(url, location)
+                    if response.status == 303:
+                        method, body = "GET", None
+                    continue
+                with self.lock:
+                    self.nb_requests += 1
+                    self.nb_bytes += len(response.body)
+                return response
+            raise urllib.error.URLError(f"Too many redirections from {url}")
+        except Exception:
+            with self.lock:
+                self.nb_errors += 1
+            raise
+        finally:
+            with self.lock:
+                self.request_time += time.monotonic() - start
+
+    def get(self, url: str, headers: dict = None) -> HttpResponse:
+        """
+        :param url:
+        :param headers: added to the default ones
+        :return: the response
+        :raise urllib.error.HTTPError: for 4xx & 5xx statuses, as urllib.request.urlopen()
+        """
+        response = self.request("GET", url, headers)
+        if response.status >= 400:
+            with self.lock:
+                self.nb_errors += 1
+            raise urllib.error.HTTPError(response.url, response.status, response.reason, response.headers, None)
+        return response
+
+    def get_text(self, url: str, headers: dict = None) -> str:
+        return self.get(url, headers).text()
+
+    def download(self, url: str, file_name: str, chunk_size: int = CHUNK_SIZE, on_progress=None):
+        """
+        downloads a large file by ranges on the same kept alive connection
+        :param url:
+        :param file_name: overwritten
+        :param chunk_size: bytes per request
+        :param on_progress: function(downloaded bytes, total bytes or None) called by the downloading thread
+        :return:
+        """
+        downloaded = 0
+        total = None
+        with open(file_name, "wb") as file:
+            while total is None or downloaded < total:
+                response = self.get(url, {"Range": f"bytes={downloaded}-{downloaded + chunk_size - 1}",
+                                          "Accept-Encoding": "identity"})
+                file.write(response.body)
+                downloaded += len(response.body)
+                content_range = response.headers.get("Content-Range")
+                if response.status != 206 or not content_range or not response.body:
+                    # ranges not supported: the whole file has been sent
+                    total = downloaded
+                else:
+                    total = int(content_range.rsplit("/", 1)[1])
+                if on_progress:
+                    on_progress(downloaded, total)
+
+    def close(self):
+        with self.lock:
+            for connections in self.idle_connections.values():
+                for connection in connections:
+                    connection.close()
+            self.idle_connections.clear()
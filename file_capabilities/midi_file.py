@@ -0,0 +1,277 @@
+import json
+import os
+import struct
+
+from learning.pitch import Pitch
+
+
+class MidiFile:
+    """
+    Standard MIDI File (type 0 & 1) reader & writer - no dependency
+    notes are (pitch, onset in seconds, duration in seconds, velocity), see Pitch for the pitches
+    https://www.midi.org/specifications/file-format-specifications/standard-midi-files
+    """
+    PPQ = 480  # ticks per quarter note
+    DEFAULT_VELOCITY = 100
+    CHANNEL = 0
+    MIDI_OFFSET = 12  # MIDI note number of the pitch 0 (C0)
+
+    def __init__(self, tempo: float = 60, sig_up: int = 4, sig_down: int = 4, ppq: int = PPQ):
+        """
+        :param tempo: quarter notes per minute
+        :param sig_up: beats in a bar
+        :param sig_down: beat unit
+        :param ppq: ticks per quarter note
+        """
+        self.tempo = tempo
+        self.sig_up = sig_up
+        self.sig_down = sig_down
+        self.ppq = ppq
+        self.name = ""
+        self.notes = []
+
+    def add_note(self, pitch: int, onset: float, duration: float, velocity: int = DEFAULT_VELOCITY):
+        self.notes.append((pitch, onset, duration, velocity))
+
+    # writing
+
+    @staticmethod
+    def _var_len(value: int) -> bytes:
+        buffer = [value & 0x7F]
+        value >>= 7
+        while value:
+            buffer.append((value & 0x7F) | 0x80)
+            value >>= 7
+        return bytes(reversed(buffer))
+
+    def _ticks(self, seconds: float) -> int:
+        return max(0, int(round(seconds * self.ppq * self.tempo / 60)))
+
+    def _meta_events(self) -> [tuple]:
+        microseconds = int(round(60_000_000 / self.tempo))
+        events = [(0, 0, b"\xFF\x51\x03" + microseconds.to_bytes(3, "big")),
+                  (0, 0, b"\xFF\x58\x04" + bytes([self.sig_up, max(0, self.sig_down.bit_length() - 1), 24, 8]))]
+        if self.name:
+            name = self.name.encode("utf-8")[:127]
+            events.insert(0, (0, 0, b"\xFF\x03" + self._var_len(len(name)) + name))
+        return events
+
+    def _note_events(self) -> [tuple]:
+        events = []
+        status = self.CHANNEL & 0x0F
+        for pitch, onset, duration, velocity in self.notes:
+            key = min(127, max(0, pitch + self.MIDI_OFFSET))
+            start = self._ticks(onset)
+            # note off before note on at the same tick
+            events.append((start, 1, bytes([0x90 | status, key, min(127, max(1, int(velocity)))])))
+            events.append((max(start + 1, self._ticks(onset + duration)), 0, bytes([0x80 | status, key, 0])))
+        return events
+
+    def _track(self, events: [tuple]) -> bytes:
+        data = bytearray()
+        previous_tick = 0
+        events.sort(key=lambda e: (e[0], e[1]))
+        for tick, _, event in events:
+            data += self._var_len(tick - previous_tick)
+            data += event
+            previous_tick = tick
+        data += b"\x00\xFF\x2F\x00"
+        return b"MTrk" + struct.pack(">I", len(data)) + bytes(data)
+
+    def to_bytes(self, midi_type: int = 1) -> bytes:
+        """
+        :param midi_type: 0 for a single track, 1 for a tempo track & a note track
+        :return: the content of the .mid file
+        """
+        if midi_type == 0:
+            tracks = [self._track(self._meta_events() + self._note_events())]
+        elif midi_type == 1:
+            tracks = [self._track(self._meta_events()), self._track(self._note_events())]
+        else:
+            raise ValueError(f"MIDI type {midi_type} is not supported")
+        return b"MThd" + struct.pack(">IHHH", 6, midi_type, len(tracks), self.ppq) + b"".join(tracks)
+
+    def write(self, file_name: str, midi_type: int = 1):
+        with open(file_name, "wb") as file:
+            file.write(self.to_bytes(midi_type))
+
+    # reading
+
+    @staticmethod
+    def _read_var_len(data: bytes, i: int) -> (int, int):
+        value = 0
+        while True:
+            byte = data[i]
+            i += 1
+            value = (value << 7) | (byte & 0x7F)
+            if not byte & 0x80:
+                return value, i
+
+    @staticmethod
+    def _parse_track(data: bytes, tempos: [tuple], signatures: [tuple], raw_notes: [tuple]) -> str:
+        i, tick, status, name = 0, 0, 0, ""
+        pending = {}  # (channel, key) -> [(start tick, velocity)]
+        while i < len(data):
+            delta, i = MidiFile._read_var_len(data, i)
+            tick += delta
+            if data[i] & 0x80:
+                status = data[i]
+                i += 1
+            elif not status:
+                raise ValueError("Running status without any previous status")
+            if status == 0xFF:
+                meta_type = data[i]
+                length, i = MidiFile._read_var_len(data, i + 1)
+                meta = data[i:i + length]
+                i += length
+                if meta_type == 0x51 and length == 3:
+                    tempos.append((tick, int.from_bytes(meta, "big")))
+                elif meta_type == 0x58 and length >= 2:
+                    signatures.append((tick, meta[0], 2 ** meta[1]))
+                elif meta_type == 0x03 and not name:
+                    name = meta.decode("utf-8", errors="replace")
+                elif meta_type == 0x2F:
+                    break
+                status = 0
+            elif status in (0xF0, 0xF7):
+                length, i = MidiFile._read_var_len(data, i)
+                i += length
+                status = 0
+            else:
+                kind, channel = status & 0xF0, status & 0x0F
+                if kind in (0xC0, 0xD0):
+                    i += 1
+                    continue
+                key, velocity = data[i], data[i + 1]
+                i += 2
+                if kind == 0x90 and velocity:
+                    pending.setdefault((channel, key), []).append((tick, velocity))
+                elif kind == 0x80 or kind == 0x90:
+                    starts = pending.get((channel, key))
+                    if starts:
+                        start, start_velocity = starts.pop(0)
+                        raw_notes.append((start, tick, key, start_velocity))
+        return name
+
+    @staticmethod
+    def from_bytes(data: bytes):
+        """
+        :param data: the content of a .mid file
+        :return: a MidiFile - tempo & signature are the first ones of the file, onsets follow every tempo change
+        """
+        if data[:4] != b"MThd":
+            raise ValueError("Not a Standard MIDI File")
+        header_length, midi_type, nb_tracks, division = struct.unpack(">IHHH", data[4:14])
+        if division & 0x8000:
+            raise ValueError("SMPTE time division is not supported")
+        tempos, signatures, raw_notes = [], [], []
+        names = []
+        i = 8 + header_length
+        for _ in range(0, nb_tracks):
+            if data[i:i + 4] != b"MTrk":
+                raise ValueError("Corrupted MIDI track")
+            length = struct.unpack(">I", data[i + 4:i + 8])[0]
+            names.append(MidiFile._parse_track(data[i + 8:i + 8 + length], tempos, signatures, raw_notes))
+            i += 8 + length
+        tempos.sort()
+        if not tempos or tempos[0][0] > 0:
+            tempos.insert(0, (0, 500_000))  # 120 quarter notes per minute by default
+        signatures.sort()
+        midi_file = MidiFile(tempo=round(60_000_000 / tempos[0][1], 3), ppq=division)
+        if signatures:
+            midi_file.sig_up, midi_file.sig_down = signatures[0][1], signatures[0][2]
+        midi_file.name = next((n for n in names if n), "")
+        # tempo map: seconds elapsed at each tempo change
+        changes = []
+        seconds, previous_tick, previous_tempo = 0.0, 0, tempos[0][1]
+        for tick, tempo in tempos:
+            seconds += (tick - previous_tick) * previous_tempo / 1_000_000 / division
+            changes.append((tick, seconds, tempo))
+            previous_tick, previous_tempo = tick, tempo
+
+        def to_seconds(tick: int) -> float:
+            index = 0
+            low, high = 0, len(changes) - 1
+            while low <= high:
+                middle = (low + high) // 2
+                if changes[middle][0] <= tick:
+                    index, low = middle, middle + 1
+                else:
+                    high = middle - 1
+            change_tick, change_seconds, tempo = changes[index]
+            return change_seconds + (tick - change_tick) * tempo / 1_000_000 / division
+
+        for start, end, key, velocity in sorted(raw_notes):
+            onset = to_seconds(start)
+            midi_file.add_note(key - MidiFile.MIDI_OFFSET, onset, to_seconds(end) - onset, velocity)
+        return midi_file
+
+    @staticmethod
+    def read(file_name: str):
+        with open(file_name, "rb") as file:
+            return MidiFile.from_bytes(file.read())
+
+    # learning modules
+
+    @staticmethod
+    def from_module(module_content: dict, tempo: float = 60, sig_up: int = 4, sig_down: int = 4):
+        """
+        one beat per step of the module, empty steps are rests
+        :param module_content: ex {"name": "C chord", "play_notes": "C3-E3-G3"}
+                               with the optional "rests": beats of silence before each step, eg [0, 0, 1]
+        :param tempo: quarter notes per minute
+        :param sig_up: beats in a bar
+        :param sig_down: beat unit
+        :return: a MidiFile
+        """
+        midi_file = MidiFile(tempo, sig_up, sig_down)
+        midi_file.name = module_content.get("name", "")
+        beat = 60 / tempo
+        notes = module_content["play_notes"].split("-")
+        rests = module_content.get("rests") or [0] * len(notes)
+        onset = 0
+        for note, rest in zip(notes, rests):
+            onset += rest
+            if note:
+                midi_file.add_note(Pitch.from_note(note), onset * beat, beat)
+            onset += 1
+        return midi_file
+
+    def to_module(self, name: str = None, description: str = "imported MIDI file") -> dict:
+        """
+        :param name: name of the module - the track name by default
+        :param description:
+        :return: a learning module with the notes in the order of their onsets
+        """
+        play_notes = "-".join(Pitch.to_note(n[0]) for n in sorted(self.notes, key=lambda n: (n[1], n[0])))
+        return {"name": name or self.name, "description": description, "play_notes": play_notes,
+                "next possible": ""}
+
+    @staticmethod
+    def convert_folder(source_path: str, destination_path: str, tempo: float = 60):
+        """
+        converts a folder of learning modules to MIDI files & MIDI files to learning modules, one file at a time
+        :param source_path: eg "learning modules/"
+        :param destination_path: the tree of the source folder is reproduced
+        :param tempo: quarter notes per minute of the MIDI files
+        :return: generator of the written file names
+        """
+        for folder, _, file_names in os.walk(source_path):
+            target_folder = os.path.join(destination_path, os.path.relpath(folder, source_path))
+            for file_name in sorted(file_names):
+                stem, extension = os.path.splitext(file_name)
+                if extension.lower() == ".json":
+                    with open(os.path.join(folder, file_name), encoding="utf-8") as file:
+                        module_content = json.load(file)
+                    target = os.path.join(target_folder, stem + ".mid")
+                    os.makedirs(target_folder, exist_ok=True)
+                    MidiFile.from_module(module_content, tempo).write(target)
+                elif extension.lower() in (".mid", ".midi"):
+                    target = os.path.join(target_folder, stem + ".json")
+                    os.makedirs(target_folder, exist_ok=True)
+                    with open(target, "w", encoding="utf-8") as file:
+                        json.dump(MidiFile.read(os.path.join(folder, file_name)).to_module(stem), file, indent=4,
+                                  ensure_ascii=False)
+                else:
+                    continue
+                yield target
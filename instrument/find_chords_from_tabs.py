@@ -0,0 +1,68 @@
+import tkinter
+from tkinter import Frame, Label, Button, Text, END, messagebox
+from tkinter.filedialog import askopenfilename
+from tkinter.ttk import Combobox
+
+from instrument.fretboard_positions import FretboardPositions
+from instrument.tab_chord_finder import TabChordFinder
+
+
+class FindChordsFromTabs(tkinter.Tk):
+    """
+    writes the chords played above each system of a pasted or loaded ASCII tab
+    for whole corpora, see TabChordFinder.find_chords_in_tabs()
+    """
+
+    def __init__(self):
+        self.frame = None
+        self.tuning_combobox = None
+        self.open_button = None
+        self.find_button = None
+        self.tab = None
+        self.raw_tab = None  # the tab before its last annotation
+        self.annotated_tab = None
+        self.tuning = FretboardPositions.DEFAULT_TUNING
+        self.tab_chord_finder = TabChordFinder(self.tuning)
+
+    def get_ui_frame(self, root: tkinter.Tk) -> Frame:
+        self.frame = Frame(root)
+        Label(self.frame, text="Tuning").pack()
+        self.tuning_combobox = Combobox(self.frame, values=list(FretboardPositions.TUNINGS.keys()), state="readonly")
+        self.tuning_combobox.set(self.tuning)
+        self.tuning_combobox.bind("<<ComboboxSelected>>", self._do_select_tuning)
+        self.tuning_combobox.pack()
+        self.open_button = Button(self.frame, text='Open tab...', command=self.do_open_tab)
+        self.open_button.pack()
+        self.find_button = Button(self.frame, text='Find chords', command=self.do_find_chords)
+        self.find_button.pack()
+        Label(self.frame, text="Tab (paste it or open a file)").pack()
+        self.tab = Text(self.frame, width=120, font=("Courier", 10))
+        self.tab.pack()
+        return self.frame
+
+    def _do_select_tuning(self, event):
+        self.tuning = self.tuning_combobox.get()
+        self.tab_chord_finder = TabChordFinder(self.tuning)
+
+    def do_open_tab(self):
+        file_name = askopenfilename(title="Choose the tab to open",
+                                    filetypes=[("Text file", ".txt"), ("All files", ".*")])
+        if not file_name:
+            return
+        with open(file_name, encoding="utf-8", errors="replace") as file:
+            self.tab.delete('1.0', END)
+            self.tab.insert('end', file.read())
+
+    def do_find_chords(self):
+        tab_text = self.tab.get('1.0', END).rstrip("\n")
+        if tab_text == self.annotated_tab:
+            # found again (eg in another tuning) rather than written above the previous chords
+            tab_text = self.raw_tab
+        if not self.tab_chord_finder.tab_parser.find_systems(tab_text):
+            messagebox.showinfo("Find chords from tabs",
+                                f"No tab of {self.tab_chord_finder.tab_parser.string_quantity} strings found")
+            return
+        self.raw_tab = tab_text
+        self.annotated_tab = self.tab_chord_finder.annotate(tab_text)
+        self.tab.delete('1.0', END)
+        self.tab.insert('end', self.annotated_tab)
@@ -0,0 +1,95 @@
+import numpy as np
+
+from instrument.fretboard_positions import FretboardPositions
+from learning.pitch import Pitch
+
+
+class FingeringPlanner:
+    """
+    chooses one position on the neck for each note of a sequence, minimizing the moves of the hand
+    Viterbi algorithm over the candidate positions of each note: O(n.k²) for n notes with k positions each
+    https://en.wikipedia.org/wiki/Viterbi_algorithm
+    """
+    HAND_SPAN = 4  # frets reachable without moving the hand
+    FRET_SHIFT_COST = 1.0  # per fret between 2 fretted positions
+    HAND_SHIFT_PENALTY = 3.0  # when the hand has to leave its position
+    STRING_CROSS_COST = 0.3  # per string crossed
+    FRET_HEIGHT_COST = 0.05  # per fret, low positions are easier for learners
+
+    def __init__(self, positions: FretboardPositions, hand_span: int = HAND_SPAN):
+        """
+        :param positions: the lookup tables of the neck
+        :param hand_span: frets reachable without moving the hand
+        """
+        self.positions = positions
+        self.hand_span = hand_span
+        self.candidates = {}  # pitch -> (strings array, frets array)
+        self.transitions = {}  # (pitch, pitch) -> cost matrix
+        self.debug = False
+
+    def _candidates(self, pitch: int) -> (np.ndarray, np.ndarray):
+        if pitch not in self.candidates:
+            positions = self.positions.get_positions(pitch)
+            self.candidates[pitch] = (np.array([p[0] for p in positions], dtype=float),
+                                      np.array([p[1] for p in positions], dtype=float))
+        return self.candidates[pitch]
+
+    def _transition(self, from_pitch: int, to_pitch: int) -> np.ndarray:
+        """
+        :return: matrix of the costs to move from each position of from_pitch to each position of to_pitch
+        """
+        key = (from_pitch, to_pitch)
+        if key not in self.transitions:
+            from_strings, from_frets = self._candidates(from_pitch)
+            to_strings, to_frets = self._candidates(to_pitch)
+            shift = np.abs(from_frets[:, None] - to_frets[None, :])
+            # open strings let the hand where it is
+            shift[(from_frets[:, None] == 0) | (to_frets[None, :] == 0)] = 0
+            cost = shift * self.FRET_SHIFT_COST + (shift >= self.hand_span) * self.HAND_SHIFT_PENALTY
+            cost += np.abs(from_strings[:, None] - to_strings[None, :]) * self.STRING_CROSS_COST
+            cost += to_frets[None, :] * self.FRET_HEIGHT_COST
+            self.transitions[key] = cost
+        return self.transitions[key]
+
+    def plan(self, pitches: [int]) -> [tuple]:
+        """
+        :param pitches: the sequence to play, see Pitch
+        :return: [(string index, fret)] for each pitch - None for the pitches out of the neck
+        """
+        planned = [None] * len(pitches)
+        segment = []
+        for i, pitch in enumerate(list(pitches) + [None]):
+            if pitch is not None and self.positions.get_positions(pitch):
+                segment.append(i)
+            elif segment:
+                # notes out of the neck split the sequence in independent segments
+                for j, position in zip(segment, self._plan_segment([pitches[j] for j in segment])):
+                    planned[j] = position
+                segment = []
+        if self.debug:
+            print("FingeringPlanner", len(pitches), "notes", planned)
+        return planned
+
+    def _plan_segment(self, pitches: [int]) -> [tuple]:
+        costs = self._candidates(pitches[0])[1] * self.FRET_HEIGHT_COST
+        back_pointers = []
+        for previous_pitch, pitch in zip(pitches, pitches[1:]):
+            total = costs[:, None] + self._transition(previous_pitch, pitch)
+            best = total.argmin(axis=0)
+            back_pointers.append(best)
+            costs = total[best, np.arange(total.shape[1])]
+        # backtracking from the cheapest last position
+        index = int(costs.argmin())
+        indexes = [index]
+        for best in reversed(back_pointers):
+            index = int(best[index])
+            indexes.append(index)
+        indexes.reverse()
+        return [self.positions.get_positions(p)[i] for p, i in zip(pitches, indexes)]
+
+    def plan_notes(self, notes: [str]) -> [tuple]:
+        """
+        :param notes: eg ["C3", "E3", "G3"] - "-" for silences
+        :return: see plan()
+        """
+        return self.plan([Pitch.from_note(n) if n and n != "-" else None for n in notes])
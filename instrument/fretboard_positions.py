@@ -0,0 +1,87 @@
+from functools import lru_cache
+
+from learning.pitch import Pitch
+
+
+class FretboardPositions:
+    """
+    lookup tables of a fretted neck: position -> pitch & pitch -> positions
+    built once per tuning & fret quantity and shared by all the instances of the instrument
+    strings are indexed from the lowest one (0) to the highest one
+    """
+    TUNINGS = {
+        "Standard": ("E2", "A2", "D3", "G3", "B3", "E4"),
+        "Drop D": ("D2", "A2", "D3", "G3", "B3", "E4"),
+        "DADGAD": ("D2", "A2", "D3", "G3", "A3", "D4"),
+        "Open G": ("D2", "G2", "D3", "G3", "B3", "D4"),
+        "7 strings": ("B1", "E2", "A2", "D3", "G3", "B3", "E4"),
+    }
+    DEFAULT_TUNING = "Standard"
+    FRET_QUANTITY = 18
+
+    def __init__(self, tuning: tuple, fret_quantity: int = FRET_QUANTITY):
+        """
+        prefer get_table() which caches the tables
+        :param tuning: notes of the open strings from the lowest one, eg ("E2", "A2", "D3", "G3", "B3", "E4")
+        :param fret_quantity: number of positions on each string, the open string included
+        """
+        self.tuning = tuple(tuning)
+        self.fret_quantity = fret_quantity
+        self.open_pitches = [Pitch.from_note(n) for n in self.tuning]
+        names = [n.rstrip("0123456789") for n in self.tuning]
+        if len(names) > 1 and names[-1] == names[0]:
+            names[-1] = names[-1].lower()
+        self.string_names = names
+        self.pitches = [[p + fret for fret in range(0, fret_quantity)] for p in self.open_pitches]
+        self.notes = [[Pitch.to_note(p) for p in string_pitches] for string_pitches in self.pitches]
+        self.positions_by_pitch = {}
+        self.positions_by_pitch_class = {}
+        for string, string_pitches in enumerate(self.pitches):
+            for fret, pitch in enumerate(string_pitches):
+                self.positions_by_pitch.setdefault(pitch, []).append((string, fret))
+                self.positions_by_pitch_class.setdefault(Pitch.pitch_class(pitch), []).append((string, fret))
+        self.lowest_pitch = min(self.open_pitches)
+        self.highest_pitch = max(self.open_pitches) + fret_quantity - 1
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_table(tuning, fret_quantity: int = FRET_QUANTITY):
+        """
+        :param tuning: a name of TUNINGS or a tuple of notes, see __init__()
+        :param fret_quantity: number of positions on each string, the open string included
+        :return: the shared lookup tables
+        """
+        if isinstance(tuning, str):
+            if tuning not in FretboardPositions.TUNINGS:
+                raise ValueError(f"Unknown tuning {tuning}")
+            tuning = FretboardPositions.TUNINGS[tuning]
+        return FretboardPositions(tuple(tuning), fret_quantity)
+
+    @property
+    def string_quantity(self) -> int:
+        return len(self.tuning)
+
+    def get_pitch(self, string: int, fret: int) -> int:
+        return self.pitches[string][fret]
+
+    def get_note(self, string: int, fret: int) -> str:
+        """
+        :return: sharp based note with its octave, eg "F#2"
+        """
+        return self.notes[string][fret]
+
+    def get_positions(self, pitch: int) -> [tuple]:
+        """
+        :param pitch: see Pitch
+        :return: [(string index, fret)] from the lowest string
+        """
+        return self.positions_by_pitch.get(pitch, [])
+
+    def get_positions_from_note(self, note: str) -> [tuple]:
+        """
+        :param note: with or without octave, eg "C#", "Db3"
+        :return: [(string index, fret)] from the lowest string
+        """
+        if note[-1:].isdigit():
+            return self.get_positions(Pitch.from_note(note))
+        return self.positions_by_pitch_class.get(Pitch.pitch_class(Pitch.from_note(f"{note}0")), [])
@@ -0,0 +1,110 @@
+from pyharmonytools.harmony.note import Note
+
+
+class FretboardState:
+    """
+    visibility of the finger items drawn on a fretboard canvas
+    the items are indexed by note name, by note with octave & by position:
+    an update only reconfigures the items whose visibility changes, without any tag search
+    """
+
+    def __init__(self, canvas):
+        """
+        :param canvas: the tkinter Canvas owning the items
+        """
+        self.canvas = canvas
+        self.items = {}  # (string index, fret) -> canvas item ids
+        self.positions_by_note = {}  # "C#" or "C#3" -> [(string index, fret)]
+        self.visible = set()  # (string index, fret)
+        self.debug = False
+
+    @staticmethod
+    def note_key(note_name: str) -> str:
+        """
+        :param note_name: with or without octave, sharp or flat based, eg "Bb", "A#3"
+        :return: the sharp based name, eg "A#", "A#3"
+        """
+        raw_note_name = note_name.rstrip("0123456789")
+        if raw_note_name in Note.CHROMATIC_SCALE_FLAT_BASED and raw_note_name not in Note.CHROMATIC_SCALE_SHARP_BASED:
+            raw_note_name = Note.CHROMATIC_SCALE_SHARP_BASED[Note.CHROMATIC_SCALE_FLAT_BASED.index(raw_note_name)]
+        return raw_note_name + note_name[len(note_name.rstrip("0123456789")):]
+
+    def add_position(self, string: int, fret: int, note_name: str, octave: int, item_ids: tuple,
+                     visible: bool = True):
+        """
+        registers the canvas items of a finger position
+        :param string: index of the string in the tuning
+        :param fret:
+        :param note_name: eg "C#"
+        :param octave:
+        :param item_ids: the items displayed for the position
+        :param visible: current state of the items
+        :return:
+        """
+        position = (string, fret)
+        key = self.note_key(note_name)
+        self.items[position] = tuple(item_ids)
+        self.positions_by_note.setdefault(key, []).append(position)
+        self.positions_by_note.setdefault(f"{key}{octave}", []).append(position)
+        if visible:
+            self.visible.add(position)
+
+    def clear(self):
+        self.items = {}
+        self.positions_by_note = {}
+        self.visible = set()
+
+    def get_positions(self, note_name: str) -> [tuple]:
+        """
+        :param note_name: with or without octave, eg "C#" or "Db3"
+        :return: [(string index, fret)]
+        """
+        return self.positions_by_note.get(self.note_key(note_name), [])
+
+    def _set_state(self, position: tuple, visible: bool):
+        state = 'normal' if visible else 'hidden'
+        for item_id in self.items[position]:
+            self.canvas.itemconfigure(item_id, state=state)
+        if visible:
+            self.visible.add(position)
+        else:
+            self.visible.discard(position)
+
+    def set_positions_visible(self, positions: [tuple], visible: bool) -> int:
+        """
+        :param positions: [(string index, fret)]
+        :param visible:
+        :return: number of positions whose items have been reconfigured
+        """
+        changed = [p for p in positions if p in self.items and (p in self.visible) != visible]
+        for position in changed:
+            self._set_state(position, visible)
+        if self.debug:
+            print("FretboardState", "show" if visible else "hide", len(changed), "positions")
+        return len(changed)
+
+    def set_note_visible(self, note_name: str, visible: bool) -> int:
+        """
+        :param note_name: with or without octave
+        :param visible:
+        :return: number of positions whose items have been reconfigured
+        """
+        if not note_name:
+            return 0
+        return self.set_positions_visible(self.get_positions(note_name), visible)
+
+    def show_only(self, positions: [tuple]) -> int:
+        """
+        hides every position but the given ones
+        :param positions: [(string index, fret)]
+        :return: number of positions whose items have been reconfigured
+        """
+        target = set(positions)
+        return (self.set_positions_visible(list(self.visible - target), False)
+                + self.set_positions_visible(list(target), True))
+
+    def show_all(self) -> int:
+        return self.set_positions_visible(list(self.items.keys()), True)
+
+    def hide_all(self) -> int:
+        return self.set_positions_visible(list(self.visible), False)
@@ -1,18 +1,22 @@
 import tkinter
+from collections import deque
 from datetime import datetime
-from functools import partial
-from tkinter import Canvas, CENTER, Frame
-from tkinter.ttk import Progressbar
+from tkinter import Canvas, CENTER, Frame, NW, messagebox
+from tkinter.ttk import Progressbar, Combobox
 
-from pyharmonytools.guitar.guitar_neck.neck import Neck
 from pyharmonytools.harmony.note import Note
 
 from audio.mic_analyzer import MicListener, MicAnalyzer
 # handling click on note : https://www.hashbangcode.com/article/using-events-tkinter-canvas-elements-python
 from audio.note_player import NotePlayer
+from instrument.fingering_planner import FingeringPlanner
+from instrument.fretboard_positions import FretboardPositions
+from instrument.fretboard_state import FretboardState
+from instrument.neck_renderer import NeckRenderer
 from learning.instrument_listener import InstrumentListener
 from learning.learning_center_interfaces import LearningCenterInterface
 from learning.pilotable_instrument import PilotableInstrument
+from learning.pitch import Pitch
 
 
 class GuitarTraining(MicListener, PilotableInstrument):
@@ -24,22 +28,26 @@ class GuitarTraining(MicListener, PilotableInstrument):
         "Gb": "#808CFD", "Db": "#9100FF", "Ab": "#BC76FC", "Eb": "#B8448C", "Bb": "#AB677D",
         "F#": "#808CFD", "C#": "#9100FF", "G#": "#BC76FC", "D#": "#B8448C", "A#": "#AB677D"
     }
+    MAX_SONG_NOTES = 1000  # the whole recordings are kept by the NoteEventLog of NoteRecorder
 
-    def __init__(self, instrument_listener: InstrumentListener):
+    def __init__(self, instrument_listener: InstrumentListener, tuning: str = FretboardPositions.DEFAULT_TUNING):
         self.frame = None
         self.instrument_listener = instrument_listener
         super().__init__()
-        self.highest_note = Note("A#5")
-        self.lowest_note = Note("E2")
         self.status_button = None
         self.learning_center = None
         self.debug = True
         self.learn_button = None
         # guitar
         self.note_player = NotePlayer()
-        self.guitar_neck = Neck()
-        self.MAX_FRET = self.guitar_neck.FRET_QUANTITY_CLASSIC
-        self.MAX_STRING = len(self.guitar_neck.TUNING)
+        self.tuning = None
+        self.positions = None
+        self.MAX_FRET = FretboardPositions.FRET_QUANTITY
+        self.MAX_STRING = 0
+        self.fingering_planner = None
+        self.exercise_notes = []
+        self.planned_positions = []
+        self._set_positions(tuning)
         # mic
         self.mic_analyzer = MicAnalyzer()
         self.mic_analyzer.add_listener(self)
@@ -47,8 +55,11 @@ class GuitarTraining(MicListener, PilotableInstrument):
         self.download_thread = None
         # UI widgets
         self.progress_bar = None
+        self.tuning_combobox = None
         self.ui_root_tk = None
         self.fretboard = None
+        self.fretboard_state = None
+        self.neck_pyimg = None
         # fret representation stuffs
         self.margin_N = 10
         self.margin_S = 10
@@ -66,29 +77,69 @@ class GuitarTraining(MicListener, PilotableInstrument):
         self.start_time = None
         self.is_listening = False
         # captured notes
-        self.song = []
+        self.song = deque(maxlen=self.MAX_SONG_NOTES)
         self.current_note = None
         self.previous_note = None
 
     def get_ui_frame(self, ui_root_tk: Frame) -> Frame:
         self.ui_root_tk = ui_root_tk
         self.frame = Frame(ui_root_tk)
+        self.tuning_combobox = Combobox(self.frame, values=list(FretboardPositions.TUNINGS.keys()), state="readonly")
+        self.tuning_combobox.set(self.tuning)
+        self.tuning_combobox.bind("<<ComboboxSelected>>", self._do_select_tuning)
+        self.tuning_combobox.grid(row=0, column=0)
         self.progress_bar = Progressbar(self.frame, orient='horizontal', mode='indeterminate', length=280)
         self.progress_bar.grid(row=1, column=0)
         self.fretboard = Canvas(self.frame, width=self.fretboard_width, height=self.fretboard_height,
                                 borderwidth=1, background='white')
         self.fretboard.grid(row=2, column=0)
+        self.fretboard.bind("<Button-1>", self._note_clicked)
+        self.fretboard_state = FretboardState(self.fretboard)
         self._draw_fretboard()
         self._initialize_fingers()
         return self.frame
 
+    def _set_positions(self, tuning: str):
+        self.tuning = tuning
+        self.positions = FretboardPositions.get_table(tuning, self.MAX_FRET)
+        self.MAX_STRING = self.positions.string_quantity
+        self.fingering_planner = FingeringPlanner(self.positions)
+        self.planned_positions = self.fingering_planner.plan_notes(self.exercise_notes)
+        self.lowest_note = Note(Pitch.to_note(self.positions.lowest_pitch))
+        self.highest_note = Note(Pitch.to_note(self.positions.highest_pitch))
+
+    def set_tuning(self, tuning: str):
+        """
+        redraws the neck for another tuning & notifies the new range of notes,
+        the previous tuning is kept when the selected module does not fit the new range
+        :param tuning: one of FretboardPositions.TUNINGS
+        :return:
+        """
+        previous_tuning = self.tuning
+        self._set_positions(tuning)
+        if self.instrument_listener:
+            try:
+                self.instrument_listener.instrument_updated(self.lowest_note, self.highest_note)
+            except ValueError:
+                messagebox.showwarning("Tuning", "The range of this tuning is not compatible with the exercise")
+                if previous_tuning is None or previous_tuning == tuning:
+                    return
+                self._set_positions(previous_tuning)
+                if self.tuning_combobox:
+                    self.tuning_combobox.set(previous_tuning)
+                # the listener filtered its modules on the rejected range
+                self.instrument_listener.instrument_updated(self.lowest_note, self.highest_note)
+                return
+        if self.fretboard:
+            self._draw_fretboard()
+            self._initialize_fingers()
+
+    def _do_select_tuning(self, event):
+        self.set_tuning(self.tuning_combobox.get())
+
     def __test_note_display(self):
-        self._draw_finger_on_neck("D", the_string='E', the_fret=5)
-        self._draw_finger_on_neck("D", the_string='A', the_fret=6)
-        self._draw_finger_on_neck("D", the_string='D', the_fret=7)
-        self._draw_finger_on_neck("D", the_string='G', the_fret=8)
-        self._draw_finger_on_neck("D", the_string='B', the_fret=9)
-        self._draw_finger_on_neck("D", the_string='e', the_fret=10)
+        for the_string in range(0, self.MAX_STRING):
+            self._draw_finger_on_neck("D", the_string=the_string, the_fret=5 + the_string)
         self._draw_note("A")
         self._draw_note("B")
         self._draw_note("C")
@@ -110,8 +161,30 @@ class GuitarTraining(MicListener, PilotableInstrument):
     def _do_nothing(self):
         pass
 
-    def _note_clicked(self, note: str, octave: int, event):
-        self.do_play_note(note, octave)
+    def _find_position(self, x: float, y: float):
+        """
+        hit-testing of the finger items
+        :param x: canvas coordinate
+        :param y: canvas coordinate
+        :return: (string index, fret) of the finger under the coordinates - None if there is none
+        """
+        width = 20
+        fret = int((x - self.margin_W - 3) // (self.fretboard_width / self.MAX_FRET))
+        string = self.MAX_STRING - 1 - int(y // self.string_interval_size) if self.string_interval_size else -1
+        if not (0 <= fret < self.MAX_FRET and 0 <= string < self.MAX_STRING):
+            return None
+        nw_x = self.margin_W + fret * self.fretboard_width / self.MAX_FRET + 3
+        nw_y = self.string_interval_size * (self.MAX_STRING - string - 1)
+        if nw_x <= x <= nw_x + width and nw_y <= y <= nw_y + width:
+            return string, fret
+        return None
+
+    def _note_clicked(self, event):
+        position = self._find_position(self.fretboard.canvasx(event.x), self.fretboard.canvasy(event.y))
+        # hidden fingers are not clickable
+        if position and position in self.fretboard_state.visible:
+            pitch = self.positions.get_pitch(*position)
+            self.do_play_note(Note.CHROMATIC_SCALE_SHARP_BASED[Pitch.pitch_class(pitch)], pitch // 12)
 
     def do_play_note(self, note: str, octave: int):
         self.note_player.debug = True
@@ -123,15 +196,13 @@ class GuitarTraining(MicListener, PilotableInstrument):
     def do_start_hearing(self, lc: LearningCenterInterface):
         self.learning_center = lc
         self.mic_analyzer.debug = True
-        for n in Note.CHROMATIC_SCALE_SHARP_BASED:
-            self.change_note_visible_status(n, False)
+        self.fretboard_state.hide_all()
         self.start_time = datetime.now()
         self.progress_bar.start()
         self.mic_analyzer.do_start_hearing()
 
     def do_stop_hearing(self):
-        for n in Note.CHROMATIC_SCALE_SHARP_BASED:
-            self.change_note_visible_status(n, True)
+        self.fretboard_state.show_all()
         self.mic_analyzer.do_stop_hearing()
         self.progress_bar.stop()
         self.display_song()
@@ -152,6 +223,8 @@ class GuitarTraining(MicListener, PilotableInstrument):
             self.current_note = new_note
             if new_note != "-":
                 self._draw_note(new_note)
+        if self.instrument_listener and (new_note == "-" or len(new_note) in [2, 3]):
+            self.instrument_listener.played_note(new_note, heard_freq, closest_pitch)
         if self.learning_center:
             self.learning_center.check_note(new_note, heard_freq, closest_pitch)
 
@@ -162,10 +235,7 @@ class GuitarTraining(MicListener, PilotableInstrument):
         :return:
         """
         # print("reveal" if visible else "hide", note_name)
-        notes_id = self.fretboard.find_withtag(note_name)
-        # print(notes_id)
-        for n_id in notes_id:
-            self.fretboard.itemconfigure(n_id, state='normal' if visible else 'hidden')
+        self.fretboard_state.set_note_visible(note_name, visible)
 
     def unset_current_note(self, all_same_notes: bool = False):
         # print("unset", self.current_note)
@@ -186,112 +256,85 @@ class GuitarTraining(MicListener, PilotableInstrument):
             # print("add_note", self.current_note, (new_note, self.chrono))
 
     def display_song(self):
-        for note in self.song:
-            print(note[1], ":", note[0])
+        fingering = self.fingering_planner.plan_notes([note[0] for note in self.song])
+        for note, position in zip(self.song, fingering):
+            if position:
+                print(note[1], ":", note[0], "string", position[0] + 1, self.positions.string_names[position[0]],
+                      "fret", position[1])
+            else:
+                print(note[1], ":", note[0])
 
     def _draw_note(self, note: str):
         # print("draw note", note)
-        raw_note = note[0:len(note) - 1]
-        octave = int(note[-1:])
-        pos = self.guitar_neck.find_positions_from_note(raw_note, octave)
-        # print("all notes", pos)
-        for p in pos:
-            self._draw_finger_on_neck(raw_note, p[0], p[1])
-
-    def _draw_finger_on_neck(self, note: str, the_string: str, the_fret: int):
-        """
+        self.change_note_visible_status(note, True)
 
+    def _draw_finger_on_neck(self, note: str, the_string: int, the_fret: int):
+        """
+        strings are identified by index : names repeat in open tunings (D A D G A d)
         :param note:
-        :param the_string: E A D G B e
+        :param the_string: 0 for the lowest string
         :param the_fret:
         :return:
         """
         # print(note, the_string, the_fret)
-        self.change_note_visible_status(self.current_note, True)
+        self.fretboard_state.set_positions_visible([(the_string, the_fret)], True)
 
     def _draw_fretboard(self):
         self.fretboard.delete("all")
-        height = self.fretboard_height
-        width = self.fretboard_width
         # print("canvas", height, width)
-        self.string_interval_size = (height + self.margin_N) / self.MAX_STRING
-        fret_marker_color = "#999999"
-        fret_marker_size = 15
-        for fret in range(0, self.MAX_FRET):
-            self.fretboard.create_line(self.margin_W + fret * width / self.MAX_FRET, self.margin_N,
-                                       self.margin_W + fret * width / self.MAX_FRET,
-                                       self.margin_N + (self.MAX_STRING - 1) * self.string_interval_size,
-                                       fill="lightgray", width=1)
-            if fret in [3, 5, 7, 9, 12]:
-                middle_fret_x = ((self.margin_W + fret * width / self.MAX_FRET)
-                                 + (self.margin_W + (fret+1) * width / self.MAX_FRET)) / 2 - fret_marker_size/2
-                middle_neck_y = self.fretboard_height / 2 - fret_marker_size/2
-                if fret in [3, 5, 9]:
-                    self.fretboard.create_oval(middle_fret_x, middle_neck_y, middle_fret_x + fret_marker_size,
-                                               middle_neck_y + fret_marker_size,
-                                               fill=fret_marker_color, outline=fret_marker_color, width=1)
-                elif fret in [7, 12]:
-                    self.fretboard.create_oval(middle_fret_x, middle_neck_y - self.string_interval_size,
-                                               middle_fret_x + fret_marker_size,
-                                               middle_neck_y - self.string_interval_size + fret_marker_size,
-                                               fill=fret_marker_color, outline=fret_marker_color, width=3)
-                    self.fretboard.create_oval(middle_fret_x, middle_neck_y + self.string_interval_size,
-                                               middle_fret_x + fret_marker_size,
-                                               middle_neck_y + self.string_interval_size + fret_marker_size,
-                                               fill=fret_marker_color, outline=fret_marker_color, width=3)
-        for string in range(0, self.MAX_STRING):
-            self.fretboard.create_line(self.margin_W, self.margin_N + string * self.string_interval_size,
-                                       width, self.margin_N + string * self.string_interval_size,
-                                       fill="darkgray", width=2)
-        # nut
-        self.fretboard.create_line(self.margin_W + 5, self.margin_N,
-                                   self.margin_W + 5,
-                                   self.margin_N + (self.MAX_STRING - 1) * self.string_interval_size,
-                                   fill="lightgray", width=10)
-        # string names
-        string_id = 5
-        font = ('Helvetica', 12)
-        for s in self.guitar_neck.TUNING:
-            self.fretboard.create_text(10, self.margin_N + self.string_interval_size * string_id, text=s,
-                                       font=font, anchor=CENTER, fill="#000000")
-            string_id -= 1
+        self.string_interval_size = (self.fretboard_height + self.margin_N) / self.MAX_STRING
+        self.neck_pyimg = NeckRenderer.get_photo_image(tuple(self.positions.string_names), self.MAX_FRET,
+                                                       self.fretboard_width, self.fretboard_height, self.margin_N,
+                                                       self.margin_W)
+        self.fretboard.create_image(0, 0, anchor=NW, image=self.neck_pyimg)
 
     def _initialize_fingers(self):
         font = ('Helvetica', 10)
         width = 20
+        self.fretboard_state.clear()
+        self.fingerings_tk_id = []
         for the_fret in range(0, self.MAX_FRET):
-            for note in self.guitar_neck.TUNING:
+            for string in range(0, self.MAX_STRING):
                 nw_x = self.margin_W + the_fret * self.fretboard_width / self.MAX_FRET + 3
-                nw_y = self.string_interval_size * (self.MAX_STRING - self.guitar_neck.TUNING.index(note) - 1)
+                nw_y = self.string_interval_size * (self.MAX_STRING - string - 1)
                 se_x = nw_x + width
                 se_y = nw_y + width
-                raw_note_name = self.guitar_neck.find_note_from_position(note, the_fret)
-                octave = self.guitar_neck.octave[note][the_fret]
+                pitch = self.positions.get_pitch(string, the_fret)
+                raw_note_name = Note.CHROMATIC_SCALE_SHARP_BASED[Pitch.pitch_class(pitch)]
+                octave = pitch // 12
                 note_color = self.note_colors[raw_note_name]
-                if 'b' in raw_note_name:
-                    raw_note_name = Note.CHROMATIC_SCALE_SHARP_BASED[
-                        Note.CHROMATIC_SCALE_FLAT_BASED.index(raw_note_name)]
-                tags = (raw_note_name, octave, raw_note_name + str(self.guitar_neck.octave[note][the_fret]))
+                tags = (raw_note_name, octave, raw_note_name + str(octave))
                 oval_id = self.fretboard.create_oval(nw_x, nw_y, se_x, se_y, fill=note_color,
                                                      outline=note_color, width=1, tags=tags)
                 text_id = self.fretboard.create_text(nw_x + width / 2, nw_y + width / 2, text=raw_note_name, font=font,
                                                      anchor=CENTER, fill="#222222", tags=tags)
-                self.fretboard.tag_bind(oval_id, sequence='<Button-1>',
-                                        func=partial(self._note_clicked, raw_note_name, octave))
-                self.fretboard.tag_bind(text_id, sequence='<Button-1>',
-                                        func=partial(self._note_clicked, raw_note_name, octave))
                 self.fingerings_tk_id.append((oval_id, text_id))
-                self.change_note_visible_status(raw_note_name, True)
+                self.fretboard_state.add_position(string, the_fret, raw_note_name, octave, (oval_id, text_id))
 
     def clear_notes(self, with_calibration: bool = False):
-        for n in Note.CHROMATIC_SCALE_SHARP_BASED:
-            self.change_note_visible_status(n, False)
+        self.fretboard_state.hide_all()
 
     def show_note(self, note: str):
         if self.debug:
             print("show_note", note)
         self.change_note_visible_status(note, True)
 
+    def set_exercise(self, notes: [str]):
+        self.exercise_notes = list(notes)
+        self.planned_positions = self.fingering_planner.plan_notes(self.exercise_notes)
+
+    def show_step(self, step: int, note: str):
+        """
+        shows the planned position of the step - all the positions of the note if none is planned
+        :param step: index of the step in the exercise
+        :param note:
+        :return:
+        """
+        if step < len(self.planned_positions) and self.planned_positions[step]:
+            self.fretboard_state.set_positions_visible([self.planned_positions[step]], True)
+        else:
+            self.show_note(note)
+
     def mask_note(self, note: str):
         if self.debug:
             print("show_note", note)
@@ -0,0 +1,70 @@
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont, ImageTk
+
+
+class NeckRenderer:
+    """
+    static background of the guitar fretboard: frets, markers, strings, nut & string names
+    rendered once per geometry & shared by every GuitarTraining instance
+    """
+    FRET_COLOR = "lightgray"
+    STRING_COLOR = "darkgray"
+    MARKER_COLOR = "#999999"
+    MARKER_SIZE = 15
+    SINGLE_MARKERS = [3, 5, 9]
+    DOUBLE_MARKERS = [7, 12]
+    photo_images = {}
+
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def render(string_names: tuple, max_fret: int, width: int, height: int, margin_n: int, margin_w: int) -> Image:
+        """
+        :param string_names: from the lowest string, eg ("E", "A", "D", "G", "B", "e")
+        :param max_fret: number of positions on each string, the open string included
+        :param width: of the fretboard
+        :param height: of the fretboard
+        :param margin_n: top margin
+        :param margin_w: left margin
+        :return: the PIL image of the neck
+        """
+        max_string = len(string_names)
+        string_interval_size = (height + margin_n) / max_string
+        image = Image.new("RGB", (width, height), "white")
+        draw = ImageDraw.Draw(image)
+        bottom = margin_n + (max_string - 1) * string_interval_size
+        size = NeckRenderer.MARKER_SIZE
+        for fret in range(0, max_fret):
+            x = margin_w + fret * width / max_fret
+            draw.line([(x, margin_n), (x, bottom)], fill=NeckRenderer.FRET_COLOR, width=1)
+            middle_fret_x = (x + margin_w + (fret + 1) * width / max_fret) / 2 - size / 2
+            middle_neck_y = height / 2 - size / 2
+            if fret in NeckRenderer.SINGLE_MARKERS:
+                draw.ellipse([middle_fret_x, middle_neck_y, middle_fret_x + size, middle_neck_y + size],
+                             fill=NeckRenderer.MARKER_COLOR, outline=NeckRenderer.MARKER_COLOR, width=1)
+            elif fret in NeckRenderer.DOUBLE_MARKERS:
+                for y in [middle_neck_y - string_interval_size, middle_neck_y + string_interval_size]:
+                    draw.ellipse([middle_fret_x, y, middle_fret_x + size, y + size],
+                                 fill=NeckRenderer.MARKER_COLOR, outline=NeckRenderer.MARKER_COLOR, width=3)
+        for string in range(0, max_string):
+            y = margin_n + string * string_interval_size
+            draw.line([(margin_w, y), (width, y)], fill=NeckRenderer.STRING_COLOR, width=2)
+        # nut
+        draw.line([(margin_w + 5, margin_n), (margin_w + 5, bottom)], fill=NeckRenderer.FRET_COLOR, width=10)
+        # string names
+        font = ImageFont.load_default()
+        for string, name in enumerate(string_names):
+            y = margin_n + string_interval_size * (max_string - 1 - string)
+            draw.text((10, y), name, fill="#000000", font=font, anchor="mm")
+        return image
+
+    @staticmethod
+    def get_photo_image(string_names: tuple, max_fret: int, width: int, height: int, margin_n: int,
+                        margin_w: int) -> ImageTk.PhotoImage:
+        """
+        :return: the tkinter image of the neck, see render()
+        """
+        key = (tuple(string_names), max_fret, width, height, margin_n, margin_w)
+        if key not in NeckRenderer.photo_images:
+            NeckRenderer.photo_images[key] = ImageTk.PhotoImage(NeckRenderer.render(*key))
+        return NeckRenderer.photo_images[key]
@@ -0,0 +1,130 @@
+from tkinter import Canvas
+from tkinter.constants import *
+
+from pyharmonytools.harmony.note import Note
+
+from learning.pitch import Pitch
+
+
+class NoteGrid:
+    """
+    grid of all the notes drawn on a single canvas: one column per octave, one row per note
+    the cell items are created once & indexed by pitch; updates mark the cells as dirty
+    and only the cells whose aspect really changed are reconfigured
+    """
+    CELL_WIDTH = 80
+    CELL_HEIGHT = 24
+    PADDING = 5
+    TEXT_COLOR = "#000000"
+    OUTLINE_COLOR = "#666666"
+
+    def __init__(self, parent, nb_octaves: int, default_color: str, on_click=None):
+        """
+        :param parent: tkinter container of the canvas
+        :param nb_octaves: number of columns
+        :param default_color: #RRGGBB in hexa
+        :param on_click: function(note: str, octave: int) called when a cell is clicked
+        """
+        self.nb_octaves = nb_octaves
+        self.default_color = default_color
+        self.on_click = on_click
+        self.debug = False
+        width = nb_octaves * (self.CELL_WIDTH + self.PADDING) + self.PADDING
+        height = 12 * (self.CELL_HEIGHT + self.PADDING) + self.PADDING
+        self.canvas = Canvas(parent, width=width, height=height, borderwidth=0, highlightthickness=0)
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.font = ('Helvetica', 9)
+        nb_pitches = nb_octaves * 12
+        # model
+        self.default_texts = [Pitch.to_note(p) for p in range(0, nb_pitches)]
+        self.colors = [default_color] * nb_pitches
+        self.texts = list(self.default_texts)
+        # view
+        self.drawn_colors = list(self.colors)
+        self.drawn_texts = list(self.texts)
+        self.rect_ids = []
+        self.text_ids = []
+        self.dirty = set()
+        for pitch in range(0, nb_pitches):
+            nw_x, nw_y = self._cell_origin(pitch)
+            self.rect_ids.append(self.canvas.create_rectangle(nw_x, nw_y, nw_x + self.CELL_WIDTH,
+                                                              nw_y + self.CELL_HEIGHT, fill=default_color,
+                                                              outline=self.OUTLINE_COLOR))
+            self.text_ids.append(self.canvas.create_text(nw_x + self.CELL_WIDTH / 2, nw_y + self.CELL_HEIGHT / 2,
+                                                         text=self.texts[pitch], font=self.font, anchor=CENTER,
+                                                         fill=self.TEXT_COLOR))
+
+    def grid(self, **kwargs):
+        self.canvas.grid(**kwargs)
+
+    def _cell_origin(self, pitch: int) -> (int, int):
+        octave, row = divmod(pitch, 12)
+        return (self.PADDING + octave * (self.CELL_WIDTH + self.PADDING),
+                self.PADDING + row * (self.CELL_HEIGHT + self.PADDING))
+
+    def find_pitch(self, x: float, y: float):
+        """
+        :param x: canvas coordinate
+        :param y: canvas coordinate
+        :return: the pitch of the cell under the coordinates - None between the cells
+        """
+        octave, dx = divmod(x - self.PADDING, self.CELL_WIDTH + self.PADDING)
+        row, dy = divmod(y - self.PADDING, self.CELL_HEIGHT + self.PADDING)
+        if 0 <= octave < self.nb_octaves and 0 <= row < 12 and dx <= self.CELL_WIDTH and dy <= self.CELL_HEIGHT:
+            return int(octave) * 12 + int(row)
+        return None
+
+    def _on_click(self, event):
+        pitch = self.find_pitch(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        if pitch is not None and self.on_click:
+            self.on_click(Note.CHROMATIC_SCALE_SHARP_BASED[pitch % 12], pitch // 12)
+
+    def set_cell(self, pitch: int, color: str, text: str = None):
+        """
+        changes the aspect of a cell - displayed by flush()
+        :param pitch: see Pitch
+        :param color: #RRGGBB in hexa
+        :param text: the note name if None
+        :return:
+        """
+        if 0 <= pitch < len(self.colors):
+            self.colors[pitch] = color
+            self.texts[pitch] = text if text else self.default_texts[pitch]
+            self.dirty.add(pitch)
+
+    def set_range(self, lowest_pitch: int, highest_pitch: int, in_range_color: str, out_of_range_color: str,
+                  reset_texts: bool = False):
+        """
+        colors the cells inside & outside a range - displayed by flush()
+        :param lowest_pitch:
+        :param highest_pitch:
+        :param in_range_color: #RRGGBB in hexa
+        :param out_of_range_color: #RRGGBB in hexa
+        :param reset_texts: True to display the note names again
+        :return:
+        """
+        for pitch in range(0, len(self.colors)):
+            self.colors[pitch] = in_range_color if lowest_pitch <= pitch <= highest_pitch else out_of_range_color
+            if reset_texts:
+                self.texts[pitch] = self.default_texts[pitch]
+        self.dirty.update(range(0, len(self.colors)))
+
+    def flush(self) -> int:
+        """
+        reconfigures the dirty cells whose aspect differs from the displayed one
+        :return: number of reconfigured cells
+        """
+        nb_updates = 0
+        for pitch in self.dirty:
+            if self.colors[pitch] != self.drawn_colors[pitch]:
+                self.canvas.itemconfigure(self.rect_ids[pitch], fill=self.colors[pitch])
+                self.drawn_colors[pitch] = self.colors[pitch]
+                nb_updates += 1
+            if self.texts[pitch] != self.drawn_texts[pitch]:
+                self.canvas.itemconfigure(self.text_ids[pitch], text=self.texts[pitch])
+                self.drawn_texts[pitch] = self.texts[pitch]
+                nb_updates += 1
+        self.dirty.clear()
+        if self.debug:
+            print("NoteGrid", nb_updates, "updates")
+        return nb_updates
@@ -0,0 +1,209 @@
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pyharmonytools.harmony.note import Note
+
+from instrument.fretboard_positions import FretboardPositions
+from instrument.tab_parser import TabParser
+
+
+class TabChordFinder:
+    """
+    names the chords played in ASCII tabs
+    the frets of a column are turned into a set of pitch classes through the table of the tuning; a bar without
+    any column of 2 notes or more (an arpeggio, a riff) gathers all its notes instead
+    the pitch class sets of a song are matched at once against the templates of every chord in every key:
+    score = 2 * chord tones played - other notes played - chord tones missing (+ BASS_BONUS if the bass is the root)
+    less than MIN_PITCH_CLASSES notes are too ambiguous to be named, unless they are exactly a power chord
+    """
+    QUALITIES = {"": (0, 4, 7), "m": (0, 3, 7), "5": (0, 7), "7": (0, 4, 7, 10), "maj7": (0, 4, 7, 11),
+                 "m7": (0, 3, 7, 10), "6": (0, 4, 7, 9), "m6": (0, 3, 7, 9), "sus2": (0, 2, 7), "sus4": (0, 5, 7),
+                 "dim": (0, 3, 6), "aug": (0, 4, 8), "m7b5": (0, 3, 6, 10), "dim7": (0, 3, 6, 9),
+                 "add9": (0, 2, 4, 7)}  # the simplest chords first: they win the ties
+    MIN_PITCH_CLASSES = 3
+    MIN_SCORE = 3.0
+    BASS_BONUS = 0.5
+    MAX_FRET = 24
+    CHUNK_SIZE = 64  # songs sent at once to a process
+
+    def __init__(self, tuning=FretboardPositions.DEFAULT_TUNING):
+        """
+        :param tuning: a name of FretboardPositions.TUNINGS or a tuple of notes
+        """
+        self.tuning = tuning
+        positions = FretboardPositions.get_table(tuning, self.MAX_FRET + 1)
+        # string x fret -> pitch class
+        self.pitch_classes = np.array(positions.pitches) % 12
+        self.tab_parser = TabParser(positions.string_quantity)
+        names = []
+        roots = []
+        templates = []
+        for quality, intervals in self.QUALITIES.items():
+            for root in range(0, 12):
+                names.append(f"{Note.CHROMATIC_SCALE_SHARP_BASED[root]}{quality}")
+                roots.append(root)
+                template = np.zeros(12)
+                template[[(root + i) % 12 for i in intervals]] = 1
+                templates.append(template)
+        self.template_names = names
+        self.template_roots = np.array(roots)
+        self.templates = np.array(templates)  # template x pitch class
+        self.template_sizes = self.templates.sum(axis=1)
+        # ties are won by the first qualities
+        self.template_ranks = np.repeat(np.arange(0, len(self.QUALITIES)), 12) * 1e-3
+
+    def _get_pitch_classes(self, frets: dict) -> (np.ndarray, int):
+        """
+        :param frets: {string index from the lowest string: fret}
+        :return: (the 12 pitch classes played - 0 or 1, pitch class of the bass)
+        """
+        strings = np.array([s for s in frets if frets[s] <= self.MAX_FRET], dtype=int)
+        if not len(strings):
+            return np.zeros(12), -1
+        played = self.pitch_classes[strings, [frets[s] for s in strings]]
+        chroma = np.zeros(12)
+        chroma[played] = 1
+        return chroma, int(played[np.argmin(strings)])
+
+    def _get_chord_events(self, events: [tuple]) -> [tuple]:
+        """
+        :param events: see TabParser.get_events()
+        :return: [(column, chroma, bass pitch class)] to be named
+        """
+        bars = {}
+        for column, bar, frets in events:
+            bars.setdefault(bar, []).append((column, *self._get_pitch_classes(frets)))
+        res = []
+        for bar_events in bars.values():
+            chords = [e for e in bar_events if e[1].sum() >= 2]
+            if chords:
+                res.extend(chords)
+            else:
+                column, _, bass = bar_events[0]
+                res.append((column, np.clip(sum(e[1] for e in bar_events), 0, 1), bass))
+        return res
+
+    def match(self, chromas: np.ndarray, basses: np.ndarray) -> [str]:
+        """
+        :param chromas: event x 12 pitch classes played - 0 or 1
+        :param basses: pitch class of the bass of each event
+        :return: the name of the chord of each event - None if nothing looks like a chord
+        """
+        if not len(chromas):
+            return []
+        played = chromas @ self.templates.T  # event x template
+        nb_notes = chromas.sum(axis=1)[:, None]
+        extra = nb_notes - played
+        missing = self.template_sizes[None, :] - played
+        scores = 2 * played - extra - missing - self.template_ranks[None, :]
+        scores += (self.template_roots[None, :] == basses[:, None]) * self.BASS_BONUS
+        scores[(nb_notes < self.MIN_PITCH_CLASSES) & ((extra > 0) | (missing > 0))] = -np.inf
+        best = scores.argmax(axis=1)
+        res = []
+        for event, template in enumerate(best):
+            if scores[event, template] < self.MIN_SCORE:
+                res.append(None)
+                continue
+            name = self.template_names[template]
+            bass = basses[event]
+            if bass != self.template_roots[template] and self.templates[template, bass]:
+                name += f"/{Note.CHROMATIC_SCALE_SHARP_BASED[bass]}"
+            res.append(name)
+        return res
+
+    def find_chords(self, tab_text: str) -> [tuple]:
+        """
+        :param tab_text: a whole tab, with lyrics, chords, comments...
+        :return: [(index of the 1st line of the system in the text, [(column, chord name)])] for each tab system
+                 a chord repeated in a row within a system is named once
+        """
+        systems = []
+        columns = []
+        chromas = []
+        basses = []
+        for line_index, system in self.tab_parser.find_systems(tab_text):
+            chord_events = self._get_chord_events(self.tab_parser.get_events(system))
+            systems.append((line_index, len(chord_events)))
+            for column, chroma, bass in chord_events:
+                columns.append(column)
+                chromas.append(chroma)
+                basses.append(bass)
+        # all the systems of the song are matched at once
+        names = self.match(np.array(chromas), np.array(basses, dtype=int))
+        res = []
+        event = 0
+        for line_index, nb_events in systems:
+            chords = []
+            previous = None
+            for column, name in zip(columns[event:event + nb_events], names[event:event + nb_events]):
+                if name and name != previous:
+                    chords.append((column, name))
+                previous = name or previous
+            event += nb_events
+            res.append((line_index, chords))
+        return res
+
+    @staticmethod
+    def to_line_of_chords(chords: [tuple]) -> str:
+        """
+        :param chords: [(column, chord name)] in the order of the columns
+        :return: the chord names aligned with their columns, at least 1 space between 2 chords
+        """
+        line = ""
+        for column, name in chords:
+            line += " " * max(column - len(line), 1 if line else 0) + name
+        return line
+
+    def get_line_of_chords(self, tab_text: str) -> [str]:
+        """
+        :param tab_text: a whole tab
+        :return: a line of chords per tab system, as UltimateGuitarSong.line_of_chords
+        """
+        return [self.to_line_of_chords(chords) for _, chords in self.find_chords(tab_text)]
+
+    def annotate(self, tab_text: str) -> str:
+        """
+        :param tab_text: a whole tab
+        :return: the tab with its line of chords above each system
+        """
+        lines = tab_text.splitlines()
+        for line_index, chords in reversed(self.find_chords(tab_text)):
+            lines.insert(line_index, self.to_line_of_chords(chords))
+        return "\n".join(lines)
+
+    @staticmethod
+    def _get_lines_of_chords(tuning, tab_texts: [str]) -> [[str]]:
+        finder = TabChordFinder(tuning)
+        return [finder.get_line_of_chords(tab_text) for tab_text in tab_texts]
+
+    @staticmethod
+    def find_chords_in_tabs(tab_texts: [str], tuning=FretboardPositions.DEFAULT_TUNING, processes: int = None,
+                            chunk_size: int = CHUNK_SIZE) -> [[str]]:
+        """
+        batch mode for whole corpora: the songs are shared by a pool of processes
+        :param tab_texts: the tabs of the songs
+        :param tuning: of all the songs
+        :param processes: size of the pool - None for the number of CPUs, 0 to stay in this process
+        :param chunk_size: songs sent at once to a process
+        :return: the lines of chords of each song, see get_line_of_chords()
+        """
+        tab_texts = list(tab_texts)
+        chunks = [tab_texts[i:i + chunk_size] for i in range(0, len(tab_texts), chunk_size)]
+        if processes == 0 or len(chunks) <= 1:
+            return TabChordFinder._get_lines_of_chords(tuning, tab_texts)
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = executor.map(TabChordFinder._get_lines_of_chords, [tuning] * len(chunks), chunks)
+            return [lines for chunk in results for lines in chunk]
+
+
+if __name__ == "__main__":
+    # eg python -m instrument.tab_chord_finder song1.txt song2.txt
+    file_names = sys.argv[1:]
+    tabs = []
+    for file_name in file_names:
+        with open(file_name, encoding="utf-8") as file:
+            tabs.append(file.read())
+    for file_name, line_of_chords in zip(file_names, TabChordFinder.find_chords_in_tabs(tabs)):
+        print(f"{file_name}:")
+        print("\n".join(line_of_chords))
@@ -0,0 +1,76 @@
+import re
+
+
+class TabParser:
+    """
+    reads the ASCII tab systems of a text, eg
+        e|-----0---|-3-----|
+        B|---1-----|---0---|
+        G|-0-------|-----0-|
+        D|-2-------|-------|
+        A|-3-------|-------|
+        E|---------|-3-----|
+    the 1st line of a system is the highest string
+    the frets played at the same column of the lines are simultaneous; a 2 digits fret covers 2 columns
+    """
+    TAB_LINE = re.compile(r"^\s*(?:[A-Ga-g][#b]?\s*)?[|:]?[-0-9|:hpbrxtv/\\~()<>.*^=sS ]*$")
+    MIN_DASHES = 4
+    FRET = re.compile(r"\d{1,2}")
+
+    def __init__(self, string_quantity: int = 6):
+        """
+        :param string_quantity: lines of a system, the other blocks of tab lines are ignored
+        """
+        self.string_quantity = string_quantity
+
+    def is_tab_line(self, line: str) -> bool:
+        return line.count("-") >= self.MIN_DASHES and bool(self.TAB_LINE.match(line))
+
+    def find_systems(self, text: str) -> [tuple]:
+        """
+        :param text: a whole tab, with lyrics, chords, comments...
+        :return: [(index of the 1st line in the text, [lines of the system from the highest string])]
+        """
+        systems = []
+        block = []
+        lines = text.splitlines()
+        for index, line in enumerate(lines + [""]):
+            if self.is_tab_line(line):
+                block.append(line)
+                continue
+            # systems without any line between them
+            if block and len(block) % self.string_quantity == 0:
+                for start in range(0, len(block), self.string_quantity):
+                    systems.append((index - len(block) + start, block[start:start + self.string_quantity]))
+            block = []
+        return systems
+
+    def get_events(self, system: [str]) -> [tuple]:
+        """
+        :param system: lines of a system from the highest string
+        :return: [(column, bar, {string index from the lowest string: fret})] in the order of the columns
+                 the bars are numbered from 0, at each '|' of the 1st line after its first fret
+        """
+        events = {}  # column -> {string: fret}
+        wide_columns = set()  # columns of 2 digits frets
+        for line_index, line in enumerate(system):
+            string = len(system) - 1 - line_index
+            for match in self.FRET.finditer(line):
+                column = match.start()
+                if len(match.group()) > 1:
+                    wide_columns.add(column)
+                events.setdefault(column, {})[string] = int(match.group())
+        # the 1 digit frets under the 2nd digit of a wide fret belong to its column
+        for column in sorted(wide_columns):
+            if column in events and column + 1 in events:
+                for string, fret in events.pop(column + 1).items():
+                    events[column].setdefault(string, fret)
+        first_column = min(events) if events else 0
+        bar_lines = [column for column, char in enumerate(system[0]) if char == "|" and column > first_column]
+        res = []
+        bar = 0
+        for column in sorted(events):
+            while bar < len(bar_lines) and bar_lines[bar] < column:
+                bar += 1
+            res.append((column, bar, events[column]))
+        return res
@@ -0,0 +1,65 @@
+import numpy as np
+
+from learning.pitch import Pitch
+
+
+class VocalRangeCalibrator:
+    """
+    estimation of a vocal range from the heard frequencies
+    the samples are accumulated in a histogram of pitches (constant memory) & the range is given by percentiles
+    so that a few octave errors of the detector do not widen the range
+    """
+    LOW_PERCENTILE = 5
+    HIGH_PERCENTILE = 95
+    MIN_SAMPLES = 16  # 4 seconds with MicAnalyzer.WINDOW_STEP
+    STABLE_SAMPLES = 8  # consecutive samples without any change of the bounds
+    MAX_SAMPLES = 120
+    MAX_CENTS_OFFSET = 40  # samples too far from a note are ignored
+
+    def __init__(self, low_percentile: float = LOW_PERCENTILE, high_percentile: float = HIGH_PERCENTILE):
+        self.low_percentile = low_percentile
+        self.high_percentile = high_percentile
+        self.histogram = np.zeros(Pitch.HIGHEST_PITCH + 1, dtype=np.int64)
+        self.nb_samples = 0
+        self.bounds = None
+        self.nb_stable_samples = 0
+        self.debug = False
+
+    def add_sample(self, frequency: float) -> bool:
+        """
+        :param frequency: heard frequency in Hz
+        :return: True if the sample is taken into account
+        """
+        if frequency <= 0:
+            return False
+        pitch = Pitch.from_frequency(frequency)
+        rounded_pitch = int(round(pitch))
+        if abs(pitch - rounded_pitch) * 100 > self.MAX_CENTS_OFFSET \
+                or not Pitch.LOWEST_PITCH <= rounded_pitch <= Pitch.HIGHEST_PITCH:
+            return False
+        self.histogram[rounded_pitch] += 1
+        self.nb_samples += 1
+        bounds = self.get_bounds()
+        if bounds == self.bounds:
+            self.nb_stable_samples += 1
+        else:
+            self.bounds = bounds
+            self.nb_stable_samples = 0
+        if self.debug:
+            print("VocalRangeCalibrator", Pitch.to_note(rounded_pitch), bounds, self.nb_stable_samples)
+        return True
+
+    def get_bounds(self) -> (int, int):
+        """
+        :return: (lowest pitch, highest pitch) - None without any sample
+        """
+        if not self.nb_samples:
+            return None
+        cumulated = np.cumsum(self.histogram)
+        low = int(np.searchsorted(cumulated, self.nb_samples * self.low_percentile / 100, side="right"))
+        high = int(np.searchsorted(cumulated, self.nb_samples * self.high_percentile / 100, side="left"))
+        return low, max(low, high)
+
+    def is_confident(self) -> bool:
+        return (self.nb_samples >= self.MIN_SAMPLES and self.nb_stable_samples >= self.STABLE_SAMPLES) \
+            or self.nb_samples >= self.MAX_SAMPLES
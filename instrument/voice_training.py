@@ -1,6 +1,6 @@
 import tkinter
+from collections import deque
 from datetime import datetime
-from functools import partial
 from tkinter import Button, Frame, Radiobutton, LabelFrame, messagebox
 from tkinter.ttk import Progressbar
 
@@ -8,9 +8,13 @@ from pyharmonytools.harmony.note import Note
 
 from audio.mic_analyzer import MicAnalyzer, MicListener
 from audio.note_player import NotePlayer
+from audio.pitch_contour import PitchContour
+from instrument.note_grid import NoteGrid
+from instrument.vocal_range_calibrator import VocalRangeCalibrator
 from learning.instrument_listener import InstrumentListener
 from learning.learning_center_interfaces import LearningCenterInterface
 from learning.pilotable_instrument import PilotableInstrument
+from learning.pitch import Pitch
 
 
 class VoiceTraining(MicListener, PilotableInstrument):
@@ -18,6 +22,7 @@ class VoiceTraining(MicListener, PilotableInstrument):
     NOTE_HEARD = "#AA8888"
     NOTE_SHOW = "#EEEEEE"
     NOTE_DISABLED = "#222222"
+    MAX_SONG_NOTES = 1000  # the whole recordings are kept by the NoteEventLog of NoteRecorder
 
     def __init__(self, instrument_listener: InstrumentListener):
         super().__init__()
@@ -36,9 +41,7 @@ class VoiceTraining(MicListener, PilotableInstrument):
         self.bass_radio = None
         self.vocal_range = tkinter.StringVar()
         self.vocal_ranges_labelframe = None
-        self.calibrating_highest_note = None
-        self.calibrating_lowest_note = None
-        self.nb_samples = 20
+        self.calibrator = None
         self.calibrate_highest_button = None
         self.calibrate_button = None
         self.highest_note = None
@@ -48,13 +51,15 @@ class VoiceTraining(MicListener, PilotableInstrument):
         #
         self.mic_analyzer = MicAnalyzer()
         self.mic_analyzer.add_listener(self)
+        self.pitch_contour = PitchContour()
+        self.mic_analyzer.pitch_contour = self.pitch_contour
         # UI data
         self.progress_bar = None
         self.ui_root_tk = None
-        self.notes_buttons = {}
+        self.note_grid = None
         self.learning_thread = None
-        # song data
-        self.song = []
+        # song data: the last heard notes only
+        self.song = deque(maxlen=self.MAX_SONG_NOTES)
         self.sig_up = 4  # 4 fourths in a bar
         self.sig_down = 4  # dealing with fourths
         self.tempo = 60  # 4th per minute
@@ -132,17 +137,9 @@ class VoiceTraining(MicListener, PilotableInstrument):
         self.progress_bar.grid(row=1, column=0, columnspan=9)
         self.notes_labelframe = LabelFrame(self.frame, text='Notes')
         self.notes_labelframe.grid(row=3, column=0)
-        for octave in range(0, len(self.mic_analyzer.OCTAVE_BANDS)):
-            self.notes_buttons[str(octave)] = {}
-            half_tone = 0
-            for note in Note.CHROMATIC_SCALE_SHARP_BASED:
-                half_tone += 1
-                self.notes_buttons[str(octave)][note] = Button(self.notes_labelframe,
-                                                               text=f"{note}{octave}",
-                                                               bg=VoiceTraining.NOTE_MUTE,
-                                                               width=10,
-                                                               command=partial(self.do_play_note, note, octave))
-                self.notes_buttons[str(octave)][note].grid(row=1 + half_tone, column=octave, padx=5)
+        self.note_grid = NoteGrid(self.notes_labelframe, len(self.mic_analyzer.OCTAVE_BANDS),
+                                  VoiceTraining.NOTE_MUTE, on_click=self.do_play_note)
+        self.note_grid.grid(row=1, column=0)
         return self.frame
 
     def _do_change_vocal_range(self):
@@ -176,11 +173,7 @@ class VoiceTraining(MicListener, PilotableInstrument):
 
     def _do_calibrate_with_voice(self):
         self.debug = True
-        self.nb_samples = 20
-        self.lowest_note = None
-        self.highest_note = None
-        self.calibrating_lowest_note = True
-        self.calibrating_highest_note = True
+        self.calibrator = VocalRangeCalibrator()
         self.vocal_range.set("User defined")
         self.progress_bar.start()
         self.mic_analyzer.do_start_hearing()
@@ -194,6 +187,8 @@ class VoiceTraining(MicListener, PilotableInstrument):
     def do_start_hearing(self, lc: LearningCenterInterface):
         self.learning_center = lc
         self.start_time = datetime.now()
+        # the intonation of this session only
+        self.pitch_contour.clear()
         self.progress_bar.start()
         self.mic_analyzer.do_start_hearing()
 
@@ -237,36 +232,34 @@ class VoiceTraining(MicListener, PilotableInstrument):
                 self._change_note_aspects(new_note, VoiceTraining.NOTE_HEARD, accuracy)
                 if self.debug:
                     print("_set_current_note - record", new_note)
+        if self.instrument_listener and (new_note == "-" or len(new_note) in [2, 3]):
+            self.instrument_listener.played_note(new_note, heard_freq, closest_pitch)
         if self.learning_center:
             self.learning_center.check_note(new_note, heard_freq, closest_pitch)
-        if self.calibrating_lowest_note:
-            if self.debug:
-                print("_set_current_note - calibrating_lowest_note", new_note)
-            if self.current_note and 2 <= len(self.current_note) <= 3:
-                if self.nb_samples > 0:
-                    self.nb_samples -= 1
-                else:
-                    self.mic_analyzer.do_stop_hearing()
-                    self.progress_bar.stop()
-                    self.calibrating_lowest_note = None
-                if self.lowest_note and (Note(self.current_note) < self.lowest_note):
-                    self.set_lowest_note(Note(self.current_note))
-                if not self.lowest_note:
-                    self.set_lowest_note(Note(self.current_note))
-        if self.calibrating_highest_note:
+        if self.calibrator and new_note != "-":
             if self.debug:
-                print("_set_current_note - calibrating_highest_note", new_note)
-            if self.current_note and 2 <= len(self.current_note) <= 3:
-                if self.nb_samples > 0:
-                    self.nb_samples -= 1
-                else:
-                    self.mic_analyzer.do_stop_hearing()
-                    self.progress_bar.stop()
-                    self.calibrating_highest_note = None
-                if self.highest_note and (Note(self.current_note) > self.highest_note):
-                    self.set_highest_note(Note(self.current_note))
-                if not self.highest_note:
-                    self.set_highest_note(Note(self.current_note))
+                print("_set_current_note - calibrating", new_note)
+            self.calibrator.add_sample(heard_freq)
+            if self.calibrator.is_confident():
+                # called by the mic analyzer: it can not wait for its own end
+                self.mic_analyzer.request_stop_hearing()
+                self.frame.after(0, self._end_calibration, self.calibrator)
+                self.calibrator = None
+
+    def _end_calibration(self, calibrator: VocalRangeCalibrator):
+        """
+        applies the calibrated range in the UI thread
+        :param calibrator: the confident calibrator
+        :return:
+        """
+        self.progress_bar.stop()
+        lowest_pitch, highest_pitch = calibrator.get_bounds()
+        if self.debug:
+            print("calibrated range", Pitch.to_note(lowest_pitch), Pitch.to_note(highest_pitch))
+        self.lowest_note = None
+        self.highest_note = None
+        self.set_lowest_note(Note(Pitch.to_note(lowest_pitch)))
+        self.set_highest_note(Note(Pitch.to_note(highest_pitch)))
 
     def set_lowest_note(self, lowest_note: Note):
         print("set_lowest_note", lowest_note)
@@ -288,15 +281,12 @@ class VoiceTraining(MicListener, PilotableInstrument):
             messagebox.showwarning("Range", "The new highest note is not compatible with the exercise")
         self._disable_lower_and_higher_notes()
 
-    def _disable_lower_and_higher_notes(self):
+    def _disable_lower_and_higher_notes(self, reset_texts: bool = False):
         # disable higher & lower notes
-        for octave in range(0, len(self.mic_analyzer.OCTAVE_BANDS)):
-            for note in Note.CHROMATIC_SCALE_SHARP_BASED:
-                n = Note(f"{note}{octave}")
-                if self.get_lowest_note() <= n <= self.get_highest_note():
-                    self.notes_buttons[str(octave)][note].config(bg=VoiceTraining.NOTE_MUTE)
-                else:
-                    self.notes_buttons[str(octave)][note].config(bg=VoiceTraining.NOTE_DISABLED)
+        if self.note_grid:
+            self.note_grid.set_range(Pitch.from_note(self.get_lowest_note()), Pitch.from_note(self.get_highest_note()),
+                                     VoiceTraining.NOTE_MUTE, VoiceTraining.NOTE_DISABLED, reset_texts)
+            self.note_grid.flush()
 
     def unset_current_note(self):
         if self.debug:
@@ -317,14 +307,12 @@ class VoiceTraining(MicListener, PilotableInstrument):
         if self.debug:
             print("Changed Note:", note, bg, self.current_note)
         if note and len(note) in [2, 3]:  # and bg and len(bg) == 7:
-            octave = note[-1]
-            the_note = note[0:len(note) - 1]
+            pitch = Pitch.from_note(note)
             if accuracy == -1:
-                btn_text = f"{the_note}{octave}"
-                self.notes_buttons[str(octave)][the_note].configure(bg=bg, text=btn_text)
+                self.note_grid.set_cell(pitch, bg)
             else:
-                btn_text = f"{the_note}{octave} ({round(accuracy, 2)}%)"
-                self.notes_buttons[str(octave)][the_note].configure(bg=bg, text=btn_text)
+                self.note_grid.set_cell(pitch, bg, f"{Pitch.to_note(pitch)} ({round(accuracy, 2)}%)")
+            self.note_grid.flush()
 
     def add_note(self, new_note):
         if self.previous_note != new_note:
@@ -337,18 +325,17 @@ class VoiceTraining(MicListener, PilotableInstrument):
     def display_song(self):
         for note in self.song:
             print(note[1], ":", note[0])
+        mean_cents, deviation_cents = self.pitch_contour.get_intonation()
+        print(len(self.pitch_contour), "hops - intonation:", round(mean_cents, 1), "cents +/-",
+              round(deviation_cents, 1))
 
     def clear_notes(self, with_calibration: bool = False):
-        for octave in range(0, len(self.mic_analyzer.OCTAVE_BANDS)):
-            for note in Note.CHROMATIC_SCALE_SHARP_BASED:
-                if with_calibration:
-                    n = Note(f"{note}{octave}")
-                    if self.get_lowest_note() <= n <= self.get_highest_note():
-                        self.notes_buttons[str(octave)][note].config(bg=VoiceTraining.NOTE_MUTE)
-                    else:
-                        self.notes_buttons[str(octave)][note].config(bg=VoiceTraining.NOTE_DISABLED)
-                else:
-                    self.notes_buttons[str(octave)][note].configure(bg=VoiceTraining.NOTE_MUTE, text=f"{note}{octave}")
+        if with_calibration:
+            self._disable_lower_and_higher_notes()
+        else:
+            self.note_grid.set_range(Pitch.LOWEST_PITCH, Pitch.HIGHEST_PITCH, VoiceTraining.NOTE_MUTE,
+                                     VoiceTraining.NOTE_MUTE, reset_texts=True)
+            self.note_grid.flush()
 
 
 if __name__ == "__main__":
@@ -8,5 +8,12 @@ class InstrumentListener:
     def instrument_updated(self, lowest_note: Note, highest_note: Note):
         pass
 
-    def played_note(self, note: Note):
+    def played_note(self, note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0):
+        """
+        called by the instrument for each heard note, from the mic thread
+        :param note: eg "A#2" or "B3" - "-" for a silence
+        :param heard_freq:
+        :param closest_pitch:
+        :return:
+        """
         pass
@@ -3,16 +3,20 @@ import os
 import random
 import tkinter
 from copy import deepcopy
-from tkinter import Button, Label, Frame, messagebox, Scale, Tk, LabelFrame
+from tkinter import Button, Label, Frame, messagebox, Scale, Tk, LabelFrame, Entry, Checkbutton, IntVar
 from tkinter.constants import *
 from tkinter.ttk import Treeview, Combobox
 
 from pyharmonytools.harmony.note import Note
 
+from file_capabilities.midi_file import MidiFile
 from instrument.guitar_training import GuitarTraining
 from instrument.voice_training import VoiceTraining
 from learning.instrument_listener import InstrumentListener
 from learning.learning_center_interfaces import LearningCenterInterface
+from learning.module_generator import ModuleGenerator
+from learning.module_index import ModuleIndex
+from learning.pitch import Pitch
 
 
 class LearningCenter(InstrumentListener):
@@ -44,6 +48,13 @@ class LearningCenter(InstrumentListener):
         self.learning_scenario = None
         self.ui_root_tk = None
         self.selected_training_module = None
+        self.module_index = ModuleIndex()
+        self.modules_tree_layout = []
+        self.module_generator = ModuleGenerator()
+        self.unpopulated_generated_folders = set()
+        self.search_module_entry = None
+        self.playable_only = None
+        self.playable_only_checkbutton = None
 
     def get_ui_frame(self, root: tkinter.Tk) -> Frame:
         self.frame = Frame(root)
@@ -55,20 +66,31 @@ class LearningCenter(InstrumentListener):
         self.reload_button = Button(self.training_module_labelframe, text='Reload', command=self.do_reload_exercises)
         self.reload_button.grid(row=1, column=0)
         self.list_of_modules = Treeview(self.training_module_labelframe)
-        self.list_of_modules['columns'] = ('Name', 'Description', 'Content', 'Path')
+        self.list_of_modules['columns'] = ('Name', 'Description', 'Content', 'Path', 'File')
         self.list_of_modules.column("#0", width=0, stretch=NO)
         self.list_of_modules.column('Name', anchor=CENTER, width=80)
         self.list_of_modules.column('Description', anchor=CENTER, width=80)
         self.list_of_modules.column('Content', anchor=CENTER, width=80)
         self.list_of_modules.column('Path', anchor=CENTER, width=0)
+        self.list_of_modules.column('File', anchor=CENTER, width=80)
         self.list_of_modules.heading("#0", text="", anchor=CENTER)
         self.list_of_modules.heading('Name', text="Name", anchor=CENTER)
         self.list_of_modules.heading('Description', text="Description", anchor=CENTER)
         self.list_of_modules.heading('Content', text="Content", anchor=CENTER)
         self.list_of_modules.heading('Path', text="Path", anchor=CENTER)
+        self.list_of_modules.heading('File', text="File", anchor=CENTER)
         # http://tkinter.fdex.eu/doc/event.html#events
         self.list_of_modules.bind("<ButtonRelease-1>", self._do_module_select)
+        self.list_of_modules.bind("<<TreeviewOpen>>", self._do_open_module_folder)
         self.list_of_modules.grid(row=2, column=0)
+        self.search_module_entry = Entry(self.training_module_labelframe)
+        self.search_module_entry.bind("<KeyRelease>", self._do_filter_modules)
+        self.search_module_entry.grid(row=3, column=0)
+        self.playable_only = IntVar(value=0)
+        self.playable_only_checkbutton = Checkbutton(self.training_module_labelframe,
+                                                     text="Playable with the instrument only",
+                                                     variable=self.playable_only, command=self._do_filter_modules)
+        self.playable_only_checkbutton.grid(row=4, column=0)
         self.fill_list_of_modules()
 
         self.instrument_selector_labelframe = LabelFrame(self.frame, text='Select your instrument')
@@ -121,6 +143,7 @@ class LearningCenter(InstrumentListener):
         todo : check if [lowest note, highest note] within [note_min,  note_max] instead of first_note
         :return:
         """
+        self.filter_list_of_modules(lowest_note, highest_note)
         module_lowest_note = Note("B9")
         module_highest_note = Note("C0")
         if self.selected_training_module and "play_notes" in self.selected_training_module.keys():
@@ -178,9 +201,14 @@ class LearningCenter(InstrumentListener):
         item = self.list_of_modules.item(self.list_of_modules.selection())['values']
         if item and item[1]:
             self.transpose_scale.set(0)
-            f = open(f"{item[3]}/{item[0]}.json")
-            module_content = json.load(f)
-            f.close()
+            if ModuleGenerator.is_generated_path(item[3]):
+                module_content = self.module_generator.get_module(item[3], str(item[0]))
+            elif str(item[4]).endswith(".mid"):
+                module_content = MidiFile.read(f"{item[3]}/{item[4]}").to_module(str(item[0]))
+            else:
+                f = open(f"{item[3]}/{item[4]}")
+                module_content = json.load(f)
+                f.close()
             self.selected_training_module = module_content
             self.learning_center_interface.set_training_module(module_content)
             if self.selected_instrument_training and self.selected_training_module:
@@ -205,59 +233,150 @@ class LearningCenter(InstrumentListener):
         else:
             messagebox.showinfo("PyHarmony", "This instrument is not yet implemented - try 'Voice' instead")
         if self.instrument_labelframe:
-            self.learning_center_interface.set_instrument(self.selected_instrument_training)
             for widgets in self.instrument_labelframe.winfo_children():
                 widgets.destroy()
-        if instr == "Voice":
-            self.selected_instrument_training = VoiceTraining(self)
-            self.instrument_labelframe = self.selected_instrument_training.get_ui_frame(self.frame)
-            self.instrument_labelframe.grid(row=0, column=1, rowspan=5)
-            # self.selected_instrument_training.set_lowest_note(Note("C3"))
-            # self.selected_instrument_training.set_highest_note(Note("B5"))
-        elif instr == "Guitar":
-            self.selected_instrument_training = GuitarTraining(self)
+        if self.selected_instrument_training:
+            # a single instance per selection: the guitar neck is rendered once
             self.instrument_labelframe = self.selected_instrument_training.get_ui_frame(self.frame)
             self.instrument_labelframe.grid(row=0, column=1, rowspan=5)
-        else:
-            messagebox.showinfo("PyHarmony", "This instrument is not yet implemented - try 'Voice' instead")
-        if self.selected_instrument_training:
-            self.learning_center_interface.set_instrument(self.selected_instrument_training)
+        self.learning_center_interface.set_instrument(self.selected_instrument_training)
         if self.selected_instrument_training and self.selected_training_module:
             try:
                 self.instrument_updated(self.selected_instrument_training.get_lowest_note(),
                                         self.selected_instrument_training.get_highest_note())
             except ValueError as ve:
                 messagebox.showwarning(title="Transposition", message=str(ve))
+        self.filter_list_of_modules()
         Tk.update(self.ui_root_tk)
 
     def fill_list_of_modules(self):
+        # filtered out modules are detached from the tree
+        for (iid, _, _) in self.modules_tree_layout:
+            if self.list_of_modules.exists(iid):
+                self.list_of_modules.delete(iid)
         for item in self.list_of_modules.get_children():
             self.list_of_modules.delete(item)
         self.training_module_id = 0
+        self.module_index.clear()
+        self.modules_tree_layout = []
         self.fill_list_of_modules_folder("", LearningCenter.MODULES_PATH)
+        self.fill_list_of_generated_modules()
         self.list_of_modules.tag_configure("folder", background='orange')
+        self.filter_list_of_modules()
+
+    def _do_filter_modules(self, event=None):
+        self.filter_list_of_modules()
+
+    def filter_list_of_modules(self, lowest_note: Note = None, highest_note: Note = None):
+        """
+        only shows the modules matching the searched name and, if requested, playable with the instrument range
+        :param lowest_note: lowest note of the instrument - the selected instrument one by default
+        :param highest_note: highest note of the instrument - the selected instrument one by default
+        :return:
+        """
+        if not self.search_module_entry:
+            return
+        name = self.search_module_entry.get()
+        lowest_pitch = None
+        highest_pitch = None
+        if self.playable_only.get() and self.selected_instrument_training:
+            lowest_pitch = Pitch.from_note(lowest_note or self.selected_instrument_training.get_lowest_note())
+            highest_pitch = Pitch.from_note(highest_note or self.selected_instrument_training.get_highest_note())
+        is_filtered = name.strip() or lowest_pitch is not None
+        matching = self.module_index.query(name, lowest_pitch, highest_pitch, with_transposition=True)
+        if is_filtered:
+            for folder in {self.module_index.modules[m]["path"] for m in matching} & self.unpopulated_generated_folders:
+                self.populate_generated_folder(folder)
+        # the layout is recorded depth first => moving items at the end rebuilds the original tree
+        for (iid, parent, is_module) in self.modules_tree_layout:
+            if not is_module or not is_filtered or iid in matching:
+                self.list_of_modules.move(iid, parent, 'end')
+            else:
+                self.list_of_modules.detach(iid)
 
     def fill_list_of_modules_folder(self, parent, path: str):
+        """
+        lists the .json & .mid modules of a folder, recorded songs are saved in both formats so both are listed,
+        the File column tells them apart
+        :param parent: iid of the folder in the tree
+        :param path: folder to list
+        :return:
+        """
         modules = os.listdir(path)
         for module in modules:
             abspath = path + "/" + module
-            if module.endswith("json"):
+            if module.endswith("json") or module.endswith(".mid"):
                 try:
-                    f = open(abspath)
-                    module_content = json.load(f)
-                    f.close()
+                    if module.endswith(".mid"):
+                        module_content = MidiFile.read(abspath).to_module(module[:-len(".mid")])
+                    else:
+                        f = open(abspath)
+                        module_content = json.load(f)
+                        f.close()
                     oid = self.list_of_modules.insert(parent=parent, index='end', iid=self.training_module_id, text="",
                                                       values=(module_content["name"], module_content["description"],
-                                                              module_content["play_notes"], path),
+                                                              module_content["play_notes"], path, module),
                                                       tags="module")
+                    self.module_index.add_module(oid, module_content, path)
+                    self.modules_tree_layout.append((oid, parent, True))
                     self.training_module_id += 1
                 except Exception as err:
                     oid = self.list_of_modules.insert(parent=parent, index='end', iid=self.training_module_id, text="",
                                                       values=(module, "** error **", str(err)), tags="module")
+                    self.modules_tree_layout.append((oid, parent, True))
                     self.training_module_id += 1
             else:
                 oid = self.list_of_modules.insert(parent=parent, index='end', iid=self.training_module_id, text="",
                                                   values=(module, "", "", abspath),
                                                   tags="folder")
+                self.modules_tree_layout.append((oid, parent, False))
                 self.training_module_id += 1
                 self.fill_list_of_modules_folder(oid, abspath)
+
+    def fill_list_of_generated_modules(self):
+        """
+        adds the virtual modules of the ModuleGenerator
+        the modules are indexed right away but inserted in the tree only when their folder is opened
+        """
+        self.unpopulated_generated_folders = set()
+        root_iid = ModuleGenerator.ROOT_PATH
+        self.list_of_modules.insert(parent="", index='end', iid=root_iid, text="",
+                                    values=(ModuleGenerator.ROOT_PATH, "", "", ModuleGenerator.ROOT_PATH),
+                                    tags="folder")
+        self.modules_tree_layout.append((root_iid, "", False))
+        for category in ModuleGenerator.CATEGORIES:
+            category_iid = f"{ModuleGenerator.ROOT_PATH}/{category}"
+            self.list_of_modules.insert(parent=root_iid, index='end', iid=category_iid, text="",
+                                        values=(category, "", "", category_iid), tags="folder")
+            self.modules_tree_layout.append((category_iid, root_iid, False))
+            for root_note in ModuleGenerator.ROOT_NOTES:
+                path = ModuleGenerator.get_path(category, root_note)
+                self.list_of_modules.insert(parent=category_iid, index='end', iid=path, text="",
+                                            values=(root_note, "", "", path), tags="folder")
+                self.modules_tree_layout.append((path, category_iid, False))
+                # placeholder to make the folder openable
+                self.list_of_modules.insert(parent=path, index='end', iid=f"{path}/...", text="",
+                                            values=("...", "", "", path))
+                self.unpopulated_generated_folders.add(path)
+                for module_content in self.module_generator.generate(category, root_note):
+                    self.module_index.add_module(f"{path}/{module_content['name']}", module_content, path)
+
+    def _do_open_module_folder(self, event):
+        folder = self.list_of_modules.focus()
+        if folder in self.unpopulated_generated_folders:
+            self.populate_generated_folder(folder)
+
+    def populate_generated_folder(self, path: str):
+        """
+        inserts the virtual modules of a generated folder in the tree
+        :param path: see ModuleGenerator.get_path()
+        """
+        self.unpopulated_generated_folders.discard(path)
+        self.list_of_modules.delete(f"{path}/...")
+        for module_content in self.module_generator.get_modules(path):
+            oid = self.list_of_modules.insert(parent=path, index='end', iid=f"{path}/{module_content['name']}",
+                                              text="", values=(module_content["name"],
+                                                               module_content["description"],
+                                                               module_content["play_notes"], path),
+                                              tags="module")
+            self.modules_tree_layout.append((oid, path, True))
@@ -1,24 +1,30 @@
 import time
 from copy import deepcopy
-from tkinter import Frame, Button, Canvas, Tk, LabelFrame
+from tkinter import Frame, Button, Tk, LabelFrame
 from tkinter.constants import *
 
 import PIL.ImageTk
 from PIL import Image
 from pyharmonytools.harmony.note import Note
 
+from learning.module_path_view import ModulePathView
+from learning.pitch import Pitch
+from learning.practice_session_store import PracticeSessionStore
+from learning.score_follower import ScoreFollower
+
 
 class LearningCenterInterface:
     img = Image.open("resources/checked_icon.png")
+    STEP_VALIDATED = "#26ea6e"
+    STEP_SKIPPED = "#FFA500"
 
     def __init__(self):
         self.exercise_labelframe = None
         self.demonstrate_thread = None
         self.blinking_running = False
         self.preview_running = False
-        self.achieved_img_id = None
-        self.canvas_step_notes = None
         self.status_button = None
+        self.module_path_view = None
         self.module_path_canvas = None
         self.module_path_canvas_height = 100
         self.module_path_canvas_width = 500
@@ -31,6 +37,9 @@ class LearningCenterInterface:
         self.pause_between_notes = 1
         self.notes_sequence = None
         self.current_expected_note_step = 0
+        self.score_follower = None
+        self.session_store = PracticeSessionStore.get_default_store()
+        self.attempt_id = None
         self.selected_instrument_training = None
         self.exercise_achieved_img = self.img.resize((20, 20), Image.LANCZOS)
         self.achieved_pyimg = None
@@ -46,15 +55,18 @@ class LearningCenterInterface:
         self.hear_user_button = Button(self.exercise_labelframe, text='Try it...', command=self.do_hear_user, state=DISABLED)
         self.hear_user_button.grid(row=0, column=1)
 
-        self.module_path_canvas = Canvas(self.exercise_labelframe, width=self.module_path_canvas_width,
-                                         height=self.module_path_canvas_height,
-                                         borderwidth=1, background='white')
-        self.module_path_canvas.grid(row=1, column=0, columnspan=4)
+        self.module_path_view = ModulePathView(self.exercise_labelframe, width=self.module_path_canvas_width,
+                                               height=self.module_path_canvas_height)
+        self.module_path_view.grid(row=1, column=0, columnspan=4)
+        self.module_path_canvas = self.module_path_view.canvas
+        self.achieved_pyimg = PIL.ImageTk.PhotoImage(self.exercise_achieved_img)
+        self.module_path_view.set_achieved_image(self.achieved_pyimg)
 
     def set_instrument(self, instrument):
         self.selected_instrument_training = instrument
         if self.selected_instrument_training and self.scenario:
             self.hear_user_button.config(state=NORMAL)
+            self.selected_instrument_training.set_exercise(self.notes_sequence)
 
     def set_training_module(self, module_content: dict):
         """
@@ -70,60 +82,55 @@ class LearningCenterInterface:
         self.notes_sequence = self.scenario["play_notes"].split("-")
         # silences removed  # todo introduce notes & rests durations in the exercices
         self.notes_sequence = list(filter(None, self.notes_sequence))
-        self.module_path_canvas.delete("all")
-        note_width = 20
-        margin_W = 20
-        margin_E = 20
-        margin_N = 10
-        note_interval = (self.module_path_canvas_width - margin_W - margin_E) / (len(self.notes_sequence) + 1)
-        font = ('Helvetica', 10)
-        step_index = 1
-        self.canvas_step_notes = []
-        self.module_path_canvas.create_line(0, self.module_path_canvas_height / 2 - note_width / 2 + margin_N,
-                                            self.module_path_canvas_width,
-                                            self.module_path_canvas_height / 2 - note_width / 2 + margin_N,
-                                            fill="lightgray", width=5)
-        for step in self.notes_sequence:
-            nw_x = margin_W + step_index * note_interval + 3
-            nw_y = self.module_path_canvas_height / 2
-            se_x = nw_x + note_width
-            se_y = nw_y + note_width
-            step_index += 1
-            oval_id = self.module_path_canvas.create_oval(nw_x, nw_y - note_width / 2, se_x, se_y - note_width / 2, fill="#DDDDDD",
-                                                          outline="#AAAAAA", width=1, tags=step)
-            text_id = self.module_path_canvas.create_text(nw_x + note_width / 2, nw_y - note_width / 2 + margin_N,
-                                                          text=step, font=font, anchor=CENTER, fill="#222222",
-                                                          tags=step)
-            self.canvas_step_notes.append((oval_id, text_id))
-
-        self.achieved_pyimg = PIL.ImageTk.PhotoImage(self.exercise_achieved_img)
-        self.achieved_img_id = self.module_path_canvas.create_image(self.module_path_canvas_width - 20,
-                                                                    self.module_path_canvas_height / 2
-                                                                    + margin_N - note_width,
-                                                                    anchor=NW, image=self.achieved_pyimg,
-                                                                    state='hidden')
+        self.score_follower = ScoreFollower([Pitch.from_note(n) for n in self.notes_sequence],
+                                            step_duration=self.pause_between_notes)
+        if self.selected_instrument_training:
+            self.selected_instrument_training.set_exercise(self.notes_sequence)
+        self.module_path_view.set_steps(self.notes_sequence)
+        self.module_path_view.see(0)
         Tk.update(self.ui_root_tk)
 
     def check_note(self, note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0):
-        if self.debug:
-            print("expected:", self.notes_sequence[self.current_expected_note_step], "heard:", note)
+        """
+        aligns the heard note with the module steps: wrong, extra & skipped notes do not stall the exercise
+        :param note: eg "A#2", "B3" or "-" for a silence
+        :param heard_freq:
+        :param closest_pitch:
+        :return:
+        """
+        if note == "-":
+            self.score_follower.feed_silence()
+            return
         try:
-            heard_raw_heard_note = note[:-1]
-            heard_octave = int(note[-1])
-            expected_raw_note = self.notes_sequence[self.current_expected_note_step][:-1]
-            expected_octave = int(self.notes_sequence[self.current_expected_note_step][-1])
-            if Note(heard_raw_heard_note) == Note(expected_raw_note) and heard_octave == expected_octave:
-                self.validate_current_step()
-                self.current_expected_note_step += 1
-            if self.debug:
-                print("status:", int(100 * self.current_expected_note_step / len(self.notes_sequence)), "%")
-            if self.current_expected_note_step == len(self.notes_sequence):
-                self.module_path_canvas.itemconfigure(self.achieved_img_id, state='normal')
-                self.do_stop_exercise()
-                Tk.update(self.ui_root_tk)
+            status = self.score_follower.feed_note(note, time.time())
         except ValueError:
             if self.debug:
                 print("Not a note")
+            return
+        if not status:
+            return
+        # before the 1st step, the note is not aligned with any step
+        step = status["position"] if status["position"] != ScoreFollower.START else None
+        if self.attempt_id:
+            accuracy = 100 - 100 * abs((closest_pitch - heard_freq) / closest_pitch) if closest_pitch else None
+            self.session_store.record_note(self.attempt_id, note, Pitch.from_note(note), step,
+                                           self.score_follower.expected_pitches[step] if step is not None else None,
+                                           status["matched"], accuracy, status["timing_deviation"])
+        if self.debug:
+            print("expected:", self.notes_sequence[step] if step is not None else None, "heard:", note, status)
+        for step in status["skipped_steps"]:
+            self.module_path_view.set_step_aspect(step, LearningCenterInterface.STEP_SKIPPED)
+        if status["matched"]:
+            self.current_expected_note_step = status["position"]
+            self.validate_current_step()
+            self.current_expected_note_step += 1
+        if self.debug:
+            print("status:", int(100 * self.current_expected_note_step / len(self.notes_sequence)), "%",
+                  "accuracy:", round(self.score_follower.get_accuracy(), 2), "%")
+        if status["finished"]:
+            self.module_path_view.show_achieved(True)
+            self.do_stop_exercise()
+            Tk.update(self.ui_root_tk)
 
     def do_demonstrate_exercise(self):
         """
@@ -149,13 +156,23 @@ class LearningCenterInterface:
     def do_hear_user(self):
         if self.selected_instrument_training and self.scenario:
             # hear
+            self._end_attempt()
             self.set_training_module(self.scenario)
             self.selected_instrument_training.clear_notes(with_calibration=True)
             self.current_expected_note_step = 0
+            self.attempt_id = self.session_store.start_attempt(self.scenario["name"], self.scenario["play_notes"],
+                                                               type(self.selected_instrument_training).__name__)
             self.selected_instrument_training.do_start_hearing(self)
 
     def do_stop_exercise(self):
         self.selected_instrument_training.do_stop_hearing()
+        self._end_attempt()
+
+    def _end_attempt(self):
+        if self.attempt_id:
+            self.session_store.end_attempt(self.attempt_id, self.score_follower.get_accuracy(),
+                                           self.score_follower.is_finished())
+            self.attempt_id = None
 
     def demonstrate_step(self, step: int):
         """
@@ -180,13 +197,11 @@ class LearningCenterInterface:
         note = f"{raw_note_name}{octave}"
         self.selected_instrument_training.do_play_note(raw_note_name, octave)
         self.validate_current_step()
-        self.selected_instrument_training.show_note(note)
-        the_note = self.canvas_step_notes[note_index]
+        self.selected_instrument_training.show_step(note_index, note)
         if self.debug:
-            print(note_index, raw_note_name, octave, the_note)
+            print(note_index, raw_note_name, octave)
         Tk.update(self.ui_root_tk)
-        self.module_path_canvas.itemconfigure(the_note[0], state='normal', fill="#DDDDDD")
-        self.module_path_canvas.itemconfigure(the_note[1], state='normal')
+        self.module_path_view.set_step_aspect(note_index, ModulePathView.DEFAULT_COLOR)
         self.preview_running = False
 
     def validate_current_step(self):
@@ -195,22 +210,17 @@ class LearningCenterInterface:
         :param note:
         :return:
         """
-        the_note = self.canvas_step_notes[self.current_expected_note_step]
-        self.module_path_canvas.itemconfigure(the_note[0], state='normal', fill="#26ea6e")
-        self.module_path_canvas.itemconfigure(the_note[1], state='normal')
+        self.module_path_view.set_step_aspect(self.current_expected_note_step, LearningCenterInterface.STEP_VALIDATED)
+        self.module_path_view.see(self.current_expected_note_step)
 
     def make_note_blink(self, note_index: int, new_color: str):
         self.blinking_running = True
         if self.debug:
             print("make_note_blink", note_index, new_color)
-        the_note = self.canvas_step_notes[note_index]
         for i in range(0, 5):
-            self.module_path_canvas.itemconfigure(the_note[0], state='normal', fill=new_color)
-            self.module_path_canvas.itemconfigure(the_note[1], state='normal')
+            self.module_path_view.set_step_aspect(note_index, new_color)
             time.sleep(0.1)
-            self.module_path_canvas.itemconfigure(the_note[0], state='hidden')
-            self.module_path_canvas.itemconfigure(the_note[1], state='hidden')
+            self.module_path_view.set_step_aspect(note_index, state=HIDDEN)
             time.sleep(0.1)
-        self.module_path_canvas.itemconfigure(the_note[0], state='normal', fill=new_color)
-        self.module_path_canvas.itemconfigure(the_note[1], state='normal')
+        self.module_path_view.set_step_aspect(note_index, new_color)
         self.blinking_running = False
@@ -0,0 +1,121 @@
+from functools import lru_cache
+
+from pychord import QualityManager
+from pyharmonytools.harmony.circle_of_5th import CircleOf5th
+from pyharmonytools.harmony.note import Note
+
+from learning.pitch import Pitch
+
+
+class ModuleGenerator:
+    """
+    virtual learning modules generated on demand for every root note
+    from pychord chord qualities, intervals and pyharmonytools scales
+    the generated modules have the same content as the json files of LearningCenter.MODULES_PATH
+    """
+    ROOT_PATH = "generated"
+    CATEGORIES = ["chords", "chords/inversions", "intervals", "scales"]
+    ROOT_NOTES = Note.CHROMATIC_SCALE_SHARP_BASED
+    ROOT_OCTAVE = 3
+    CHORD_QUALITIES = ["", "m", "5", "6", "m6", "69", "7", "m7", "maj7", "mmaj7", "7b5", "7+5", "m7b5",
+                       "9", "m9", "maj9", "add9", "11", "m11", "13", "sus2", "sus4", "aug", "dim", "dim7"]
+    INVERSION_NAMES = ["root position", "1st inversion", "2nd inversion", "3rd inversion", "4th inversion",
+                       "5th inversion", "6th inversion"]
+    INTERVALS = {1: "2nd minor", 2: "2nd major", 3: "3rd minor", 4: "3rd major", 5: "4th", 6: "4th augmented",
+                 7: "5th", 8: "5th augmented", 9: "6th major", 10: "7th minor", 11: "7th major", 12: "8-octave"}
+    SCALES = ["Natural Major - triads", "Harmonic Major - triads", "Natural Minor - triads",
+              "Harmonic Minor - triads", "Melodic Minor - triads"]
+
+    @staticmethod
+    def get_path(category: str, root_note: str) -> str:
+        """
+        :param category: one of CATEGORIES
+        :param root_note: one of ROOT_NOTES
+        :return: the virtual folder of the modules
+        """
+        return f"{ModuleGenerator.ROOT_PATH}/{category}/{root_note}"
+
+    @staticmethod
+    def is_generated_path(path: str) -> bool:
+        return str(path).startswith(ModuleGenerator.ROOT_PATH + "/")
+
+    @staticmethod
+    def _module(name: str, description: str, pitches: [int]) -> dict:
+        return {"name": name, "description": description,
+                "play_notes": "-".join(Pitch.to_note(p) for p in pitches), "next possible": ""}
+
+    @staticmethod
+    def _chord_components(quality: str) -> tuple:
+        try:
+            return QualityManager().get_quality(quality).components
+        except ValueError:
+            return ()
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def generate(category: str, root_note: str) -> tuple:
+        """
+        memoized generation of the modules of a virtual folder
+        :param category: one of CATEGORIES
+        :param root_note: one of ROOT_NOTES
+        :return: tuple of modules - ex {"name": "D chord", "description": "root position", "play_notes": "D3-F#3-A3"}
+        """
+        root = Pitch.from_note(f"{root_note}{ModuleGenerator.ROOT_OCTAVE}")
+        modules = []
+        if category == "chords":
+            for quality in ModuleGenerator.CHORD_QUALITIES:
+                components = ModuleGenerator._chord_components(quality)
+                if components:
+                    pitches = [root + c for c in components]
+                    modules.append(ModuleGenerator._module(f"{root_note}{quality} chord",
+                                                           ModuleGenerator.INVERSION_NAMES[0], pitches))
+        elif category == "chords/inversions":
+            for quality in ModuleGenerator.CHORD_QUALITIES:
+                pitches = [root + c for c in ModuleGenerator._chord_components(quality)]
+                for inversion in range(1, len(pitches)):
+                    bass = pitches[inversion]
+                    inverted = pitches[inversion:]
+                    # the notes below the bass go up by the fewest octaves: the voicing stays within the chord span
+                    for p in pitches[:inversion]:
+                        while p <= bass:
+                            p += 12
+                        inverted.append(p)
+                    inverted.sort()
+                    modules.append(ModuleGenerator._module(f"{root_note}{quality} chord{inversion + 1}",
+                                                           ModuleGenerator.INVERSION_NAMES[inversion], inverted))
+        elif category == "intervals":
+            for half_tones, name in ModuleGenerator.INTERVALS.items():
+                modules.append(ModuleGenerator._module(f"{root_note} {name}", f"{half_tones} half tones",
+                                                       [root, root + half_tones]))
+        elif category == "scales":
+            for cof_name in ModuleGenerator.SCALES:
+                cof = CircleOf5th.cof_factory(cof_name)
+                pitches = [root]
+                for interval in cof.intervals:
+                    pitches.append(pitches[-1] + interval)
+                pitches.append(root + 12)
+                scale_name = cof_name.split(" - ")[0]
+                modules.append(ModuleGenerator._module(f"{root_note} {scale_name.lower()} scale", scale_name,
+                                                       pitches))
+        else:
+            raise ValueError(f"Unknown module category {category}")
+        return tuple(modules)
+
+    def get_modules(self, path: str) -> [dict]:
+        """
+        :param path: a virtual folder, see get_path()
+        :return: copies of the modules of the folder
+        """
+        category, root_note = path[len(self.ROOT_PATH) + 1:].rsplit("/", 1)
+        return [dict(m) for m in self.generate(category, root_note)]
+
+    def get_module(self, path: str, name: str) -> dict:
+        """
+        :param path: a virtual folder, see get_path()
+        :param name: the module name
+        :return: a copy of the module
+        """
+        for m in self.get_modules(path):
+            if m["name"] == name:
+                return m
+        raise ValueError(f"No module {name} in {path}")
@@ -0,0 +1,257 @@
+from bisect import bisect_left, bisect_right
+
+from learning.pitch import Pitch
+
+
+class PitchRangeTree:
+    """
+    static centered interval tree over the [lowest pitch, highest pitch] ranges of the modules
+    https://en.wikipedia.org/wiki/Interval_tree#Centered_interval_tree
+    """
+
+    def __init__(self, ranges: [(int, int, int)]):
+        """
+        :param ranges: [(lowest pitch, highest pitch, module id)]
+        """
+        self.center = None
+        self.by_start = []
+        self.starts = []
+        self.left = None
+        self.right = None
+        if not ranges:
+            return
+        bounds = sorted([r[0] for r in ranges] + [r[1] for r in ranges])
+        self.center = bounds[len(bounds) // 2]
+        lefts = []
+        rights = []
+        for r in ranges:
+            if r[1] < self.center:
+                lefts.append(r)
+            elif r[0] > self.center:
+                rights.append(r)
+            else:
+                self.by_start.append(r)
+        self.by_start.sort(key=lambda r: r[0])
+        self.starts = [r[0] for r in self.by_start]
+        if lefts:
+            self.left = PitchRangeTree(lefts)
+        if rights:
+            self.right = PitchRangeTree(rights)
+
+    def contained_in(self, lowest: int, highest: int, found: set = None) -> set:
+        """
+        :param lowest:
+        :param highest:
+        :param found: ids already found
+        :return: ids of the modules whose whole range is within [lowest, highest]
+        """
+        if found is None:
+            found = set()
+        if self.center is None:
+            return found
+        # ranges stored here all contain the center
+        if self.center < lowest:
+            if self.right:
+                self.right.contained_in(lowest, highest, found)
+        elif self.center > highest:
+            if self.left:
+                self.left.contained_in(lowest, highest, found)
+        else:
+            for r in self.by_start[bisect_left(self.starts, lowest):]:
+                if r[1] <= highest:
+                    found.add(r[2])
+            if self.left:
+                self.left.contained_in(lowest, highest, found)
+            if self.right:
+                self.right.contained_in(lowest, highest, found)
+        return found
+
+    def overlapping(self, lowest: int, highest: int, found: set = None) -> set:
+        """
+        :param lowest:
+        :param highest:
+        :param found: ids already found
+        :return: ids of the modules that share at least one pitch with [lowest, highest]
+        """
+        if found is None:
+            found = set()
+        if self.center is None:
+            return found
+        for r in self.by_start[:bisect_right(self.starts, highest)]:
+            if r[1] >= lowest:
+                found.add(r[2])
+        if self.left and lowest < self.center:
+            self.left.overlapping(lowest, highest, found)
+        if self.right and highest > self.center:
+            self.right.overlapping(lowest, highest, found)
+        return found
+
+
+class ModuleIndex:
+    """
+    in-memory index over the learning modules:
+        - n-grams on the module names
+        - pitch ranges in an interval tree
+        - interval & pitch class set signatures
+    """
+    NGRAM_SIZE = 3
+
+    def __init__(self):
+        self.modules = {}
+        self.ranges = {}
+        self.name_ngrams = {}
+        self.melodic_intervals = {}
+        self.harmonic_intervals = {}
+        self.pitch_class_sets = {}
+        self.spans = []
+        self.span_ids = []
+        self.range_tree = None
+        self.debug = False
+
+    def clear(self):
+        self.__init__()
+
+    @staticmethod
+    def _ngrams(text: str) -> set:
+        text = f" {text.lower()} "
+        return {text[i:i + ModuleIndex.NGRAM_SIZE] for i in range(0, len(text) - ModuleIndex.NGRAM_SIZE + 1)}
+
+    @staticmethod
+    def normalize_pitch_class_set(pitch_classes) -> int:
+        """
+        transposition invariant signature of a set of pitch classes
+        :param pitch_classes: iterable of 0..11
+        :return: the smallest 12 bits mask among the 12 rotations of the set
+        """
+        mask = 0
+        for pc in pitch_classes:
+            mask |= 1 << (pc % 12)
+        return min(((mask >> r) | (mask << (12 - r))) & 0xFFF for r in range(0, 12))
+
+    def add_module(self, module_id, module_content: dict, path: str = ""):
+        """
+        index a module
+        :param module_id: any hashable id, eg the Treeview iid
+        :param module_content: ex {"name": "C chord", "description": "", "play_notes": "C3-E3-G3"}
+        :param path: the folder of the module
+        :return:
+        """
+        self.modules[module_id] = {"name": module_content["name"],
+                                   "description": module_content.get("description", ""),
+                                   "play_notes": module_content["play_notes"],
+                                   "path": path}
+        for ngram in self._ngrams(module_content["name"]):
+            self.name_ngrams.setdefault(ngram, set()).add(module_id)
+        try:
+            pitches = Pitch.from_play_notes(module_content["play_notes"])
+        except ValueError as err:
+            if self.debug:
+                print("ModuleIndex - not indexed by pitch:", module_content["name"], err)
+            return
+        if not pitches:
+            return
+        self.ranges[module_id] = (min(pitches), max(pitches))
+        for a, b in zip(pitches, pitches[1:]):
+            self.melodic_intervals.setdefault(abs(b - a), set()).add(module_id)
+        distinct_pitches = sorted(set(pitches))
+        for i in range(0, len(distinct_pitches)):
+            for j in range(i + 1, len(distinct_pitches)):
+                interval = distinct_pitches[j] - distinct_pitches[i]
+                self.harmonic_intervals.setdefault(interval, set()).add(module_id)
+        signature = self.normalize_pitch_class_set(Pitch.pitch_class(p) for p in distinct_pitches)
+        self.pitch_class_sets.setdefault(signature, set()).add(module_id)
+        self.range_tree = None
+
+    def _build(self):
+        if self.range_tree is None:
+            self.range_tree = PitchRangeTree([(r[0], r[1], module_id) for module_id, r in self.ranges.items()])
+            by_span = sorted(self.ranges.items(), key=lambda item: item[1][1] - item[1][0])
+            self.spans = [r[1] - r[0] for _, r in by_span]
+            self.span_ids = [module_id for module_id, _ in by_span]
+
+    def get_range(self, module_id) -> (int, int):
+        """
+        :param module_id:
+        :return: (lowest pitch, highest pitch) of the module or None if the module has no note
+        """
+        return self.ranges.get(module_id)
+
+    def search_name(self, text: str) -> set:
+        """
+        :param text: part of the module name, case insensitive
+        :return: ids of the modules whose name contains text
+        """
+        text = text.lower().strip()
+        if not text:
+            return set(self.modules.keys())
+        candidates = None
+        if len(text) >= self.NGRAM_SIZE:
+            for i in range(0, len(text) - self.NGRAM_SIZE + 1):
+                postings = self.name_ngrams.get(text[i:i + self.NGRAM_SIZE], set())
+                candidates = set(postings) if candidates is None else candidates & postings
+                if not candidates:
+                    return set()
+        else:
+            candidates = self.modules.keys()
+        return {module_id for module_id in candidates if text in self.modules[module_id]["name"].lower()}
+
+    def find_playable(self, lowest_pitch: int, highest_pitch: int, with_transposition: bool = False) -> set:
+        """
+        :param lowest_pitch: lowest pitch of the instrument
+        :param highest_pitch: highest pitch of the instrument
+        :param with_transposition: if True, the modules which fit once transposed are also returned
+        :return: ids of the playable modules
+        """
+        self._build()
+        if with_transposition:
+            return set(self.span_ids[:bisect_right(self.spans, highest_pitch - lowest_pitch)])
+        return self.range_tree.contained_in(lowest_pitch, highest_pitch)
+
+    def find_overlapping(self, lowest_pitch: int, highest_pitch: int) -> set:
+        """
+        :param lowest_pitch:
+        :param highest_pitch:
+        :return: ids of the modules having at least one note within [lowest_pitch, highest_pitch]
+        """
+        self._build()
+        return self.range_tree.overlapping(lowest_pitch, highest_pitch)
+
+    def find_by_interval(self, half_tones: int, melodic: bool = False) -> set:
+        """
+        :param half_tones: interval size, eg 7 for a 5th
+        :param melodic: if True, only consecutive notes are considered
+        :return: ids of the modules containing the interval
+        """
+        intervals = self.melodic_intervals if melodic else self.harmonic_intervals
+        return set(intervals.get(abs(half_tones), set()))
+
+    def find_by_pitch_class_set(self, notes: [str]) -> set:
+        """
+        :param notes: eg ["C", "E", "G"] or ["D4", "F#4", "A4"]
+        :return: ids of the modules made of the same pitch classes, in any key
+        """
+        pitch_classes = []
+        for n in notes:
+            if n[-1].isdigit():
+                pitch_classes.append(Pitch.pitch_class(Pitch.from_note(n)))
+            else:
+                pitch_classes.append(Pitch.pitch_class(Pitch.from_note(f"{n}0")))
+        return set(self.pitch_class_sets.get(self.normalize_pitch_class_set(pitch_classes), set()))
+
+    def query(self, name: str = "", lowest_pitch: int = None, highest_pitch: int = None,
+              with_transposition: bool = False, interval: int = None) -> set:
+        """
+        combine the criteria of the index
+        :param name: part of the module name
+        :param lowest_pitch: lowest pitch of the instrument - None for no range constraint
+        :param highest_pitch: highest pitch of the instrument - None for no range constraint
+        :param with_transposition: see find_playable()
+        :param interval: interval the modules must contain - None for no constraint
+        :return: ids of the matching modules
+        """
+        res = self.search_name(name)
+        if res and lowest_pitch is not None and highest_pitch is not None:
+            res &= self.find_playable(lowest_pitch, highest_pitch, with_transposition)
+        if res and interval is not None:
+            res &= self.find_by_interval(interval)
+        return res
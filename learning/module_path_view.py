@@ -0,0 +1,170 @@
+from tkinter import Canvas, Scrollbar
+from tkinter.constants import *
+
+
+class ModulePathView:
+    """
+    scrolling display of the steps of a training module
+    only the visible steps own canvas items: items are recycled when scrolling
+    and updated in place when the module changes (eg transposition)
+    """
+    STEP_WIDTH = 40
+    NOTE_WIDTH = 20
+    MARGIN_W = 20
+    MARGIN_E = 40
+    MARGIN_N = 10
+    DEFAULT_COLOR = "#DDDDDD"
+    OUTLINE_COLOR = "#AAAAAA"
+    TEXT_COLOR = "#222222"
+
+    def __init__(self, parent, width: int = 500, height: int = 100):
+        self.width = width
+        self.height = height
+        self.canvas = Canvas(parent, width=width, height=height, borderwidth=1, background='white')
+        self.scrollbar = Scrollbar(parent, orient=HORIZONTAL, command=self.canvas.xview)
+        self.canvas.configure(xscrollcommand=self._on_xscroll)
+        self.font = ('Helvetica', 10)
+        self.debug = False
+        # steps data
+        self.steps = []
+        self.colors = []
+        self.states = []
+        # canvas items
+        self.visible_items = {}
+        self.free_items = []
+        self.path_line_id = self.canvas.create_line(0, 0, 0, 0, fill="lightgray", width=5)
+        self.achieved_img_id = None
+
+    def grid(self, row: int, column: int, columnspan: int = 1):
+        self.canvas.grid(row=row, column=column, columnspan=columnspan)
+        self.scrollbar.grid(row=row + 1, column=column, columnspan=columnspan, sticky=EW)
+
+    def _step_x(self, step: int) -> float:
+        return self.MARGIN_W + step * self.STEP_WIDTH + 3
+
+    def _path_width(self) -> float:
+        return max(self.width, self._step_x(len(self.steps)) + self.MARGIN_E)
+
+    def set_steps(self, steps: [str]):
+        """
+        displays the steps of a module - the visible items are reused
+        :param steps: ex ["C3", "E3", "G3"]
+        :return:
+        """
+        previous_steps = self.steps
+        self.steps = list(steps)
+        self.colors = [self.DEFAULT_COLOR] * len(self.steps)
+        self.states = [NORMAL] * len(self.steps)
+        path_width = self._path_width()
+        if len(previous_steps) != len(self.steps):
+            path_y = self.height / 2 - self.NOTE_WIDTH / 2 + self.MARGIN_N
+            self.canvas.coords(self.path_line_id, 0, path_y, path_width, path_y)
+            self.canvas.configure(scrollregion=(0, 0, path_width, self.height))
+            if self.achieved_img_id:
+                self.canvas.coords(self.achieved_img_id, path_width - self.MARGIN_E + 10,
+                                   self.height / 2 + self.MARGIN_N - self.NOTE_WIDTH)
+        for step in list(self.visible_items.keys()):
+            if step >= len(self.steps):
+                self._recycle(step)
+            else:
+                oval_id, text_id = self.visible_items[step]
+                self.canvas.itemconfigure(oval_id, fill=self.DEFAULT_COLOR, state=NORMAL)
+                if step >= len(previous_steps) or previous_steps[step] != self.steps[step]:
+                    self.canvas.itemconfigure(text_id, text=self.steps[step], state=NORMAL)
+                else:
+                    self.canvas.itemconfigure(text_id, state=NORMAL)
+        self.show_achieved(False)
+        self.refresh_viewport()
+
+    def _recycle(self, step: int):
+        items = self.visible_items.pop(step)
+        self.canvas.itemconfigure(items[0], state=HIDDEN)
+        self.canvas.itemconfigure(items[1], state=HIDDEN)
+        self.free_items.append(items)
+
+    def _attach(self, step: int):
+        nw_x = self._step_x(step)
+        nw_y = self.height / 2
+        if self.free_items:
+            oval_id, text_id = self.free_items.pop()
+            self.canvas.coords(oval_id, nw_x, nw_y - self.NOTE_WIDTH / 2, nw_x + self.NOTE_WIDTH,
+                               nw_y + self.NOTE_WIDTH / 2)
+            self.canvas.coords(text_id, nw_x + self.NOTE_WIDTH / 2, nw_y - self.NOTE_WIDTH / 2 + self.MARGIN_N)
+            self.canvas.itemconfigure(oval_id, fill=self.colors[step], state=self.states[step])
+            self.canvas.itemconfigure(text_id, text=self.steps[step], state=self.states[step])
+        else:
+            oval_id = self.canvas.create_oval(nw_x, nw_y - self.NOTE_WIDTH / 2, nw_x + self.NOTE_WIDTH,
+                                              nw_y + self.NOTE_WIDTH / 2, fill=self.colors[step],
+                                              outline=self.OUTLINE_COLOR, width=1, state=self.states[step])
+            text_id = self.canvas.create_text(nw_x + self.NOTE_WIDTH / 2, nw_y - self.NOTE_WIDTH / 2 + self.MARGIN_N,
+                                              text=self.steps[step], font=self.font, anchor=CENTER,
+                                              fill=self.TEXT_COLOR, state=self.states[step])
+        self.visible_items[step] = (oval_id, text_id)
+
+    def _visible_range(self) -> (int, int):
+        left = self.canvas.canvasx(0)
+        first = int((left - self.MARGIN_W) // self.STEP_WIDTH) - 1
+        last = int((left + self.width - self.MARGIN_W) // self.STEP_WIDTH) + 1
+        return max(0, first), min(len(self.steps) - 1, last)
+
+    def refresh_viewport(self):
+        """
+        recycles the items of the steps scrolled out & attaches items to the steps scrolled in
+        :return:
+        """
+        first, last = self._visible_range()
+        for step in [s for s in self.visible_items.keys() if not first <= s <= last]:
+            self._recycle(step)
+        for step in range(first, last + 1):
+            if step not in self.visible_items:
+                self._attach(step)
+        if self.debug:
+            print("ModulePathView", first, last, len(self.visible_items), "items +", len(self.free_items), "free")
+
+    def _on_xscroll(self, first: str, last: str):
+        self.scrollbar.set(first, last)
+        self.refresh_viewport()
+
+    def see(self, step: int):
+        """
+        scrolls the path to make the step visible
+        :param step:
+        :return:
+        """
+        first, last = self._visible_range()
+        if not first < step < last:
+            x = max(0, self._step_x(step) - self.width / 2)
+            self.canvas.xview_moveto(x / self._path_width())
+
+    def set_step_aspect(self, step: int, color: str = None, state: str = NORMAL):
+        """
+        :param step: index of the step
+        :param color: #RRGGBB in hexa - unchanged if None
+        :param state: NORMAL or HIDDEN
+        :return:
+        """
+        if color:
+            self.colors[step] = color
+        self.states[step] = state
+        items = self.visible_items.get(step)
+        if items:
+            self.canvas.itemconfigure(items[0], state=state, fill=self.colors[step])
+            self.canvas.itemconfigure(items[1], state=state)
+
+    def set_achieved_image(self, image):
+        """
+        :param image: a PhotoImage displayed at the end of the path once the module is achieved
+        :return:
+        """
+        if self.achieved_img_id:
+            self.canvas.itemconfigure(self.achieved_img_id, image=image)
+        else:
+            self.achieved_img_id = self.canvas.create_image(self._path_width() - self.MARGIN_E + 10,
+                                                            self.height / 2 + self.MARGIN_N - self.NOTE_WIDTH,
+                                                            anchor=NW, image=image, state=HIDDEN)
+
+    def show_achieved(self, visible: bool):
+        if self.achieved_img_id:
+            self.canvas.itemconfigure(self.achieved_img_id, state=NORMAL if visible else HIDDEN)
+            if visible:
+                self.see(len(self.steps) - 1)
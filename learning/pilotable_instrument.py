@@ -43,6 +43,23 @@ class PilotableInstrument:
         """
         pass
 
+    def set_exercise(self, notes: [str]):
+        """
+        registers the steps of the exercise to practice
+        :param notes: eg ["C3", "E3", "G3"]
+        :return:
+        """
+        pass
+
+    def show_step(self, step: int, new_note: str):
+        """
+        shows temporarily the note of an exercise step
+        :param step: index of the step in the exercise
+        :param new_note:
+        :return:
+        """
+        self.show_note(new_note)
+
     def mask_note(self, new_note: str):
         """
         reset a note
@@ -0,0 +1,67 @@
+from functools import lru_cache
+from math import log2
+
+from pyharmonytools.harmony.note import Note
+
+
+class Pitch:
+    """
+    integer representation of notes with octave: C0 = 0, C#0 = 1 ... B9 = 119
+    the MIDI note number is pitch + 12
+    """
+    NB_OCTAVES = 10
+    CONCERT_PITCH = 440  # A4
+    A4 = 4 * 12 + 9
+    LOWEST_PITCH = 0
+    HIGHEST_PITCH = NB_OCTAVES * 12 - 1
+
+    @staticmethod
+    def from_note(note) -> int:
+        """
+        :param note: eg "A#2", "Bb3", "C4" or a Note with an octave
+        :return: the integer pitch of the note
+        """
+        return Pitch._from_note_name(str(note))
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _from_note_name(note: str) -> int:
+        if not note or not note[-1].isdigit():
+            raise ValueError(f"{note} is not a note with an octave")
+        name = Note(note).name
+        natural = Note.get_index(name[0])
+        # the octave is the one of the natural note: Cb4 is B3, B#3 is C4
+        alteration = (Note.get_index(name) - natural + 6) % 12 - 6
+        return int(note[-1]) * 12 + natural + alteration
+
+    @staticmethod
+    def to_note(pitch: int) -> str:
+        """
+        :param pitch: integer pitch
+        :return: the sharp based note name with its octave, eg "A#2"
+        """
+        return f"{Note.CHROMATIC_SCALE_SHARP_BASED[pitch % 12]}{pitch // 12}"
+
+    @staticmethod
+    def from_frequency(frequency: float) -> float:
+        """
+        :param frequency: in Hz
+        :return: the fractional pitch of the frequency, eg 57.5 for a quarter tone above A4
+        """
+        return Pitch.A4 + 12 * log2(frequency / Pitch.CONCERT_PITCH)
+
+    @staticmethod
+    def pitch_class(pitch: int) -> int:
+        """
+        :param pitch: integer pitch
+        :return: 0 for C ... 11 for B
+        """
+        return pitch % 12
+
+    @staticmethod
+    def from_play_notes(play_notes: str) -> [int]:
+        """
+        :param play_notes: a module sequence, eg "C3-E3-G3"
+        :return: the integer pitches of the sequence - empty steps (silences) are skipped
+        """
+        return [Pitch.from_note(n) for n in play_notes.split("-") if n]
@@ -0,0 +1,228 @@
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class PracticeSessionStore:
+    """
+    persistence of the practice attempts in a SQLite database
+    the inserts are queued by the UI & the listener threads and written by batches in a writer thread
+    """
+    DB_FILE_NAME = "practice_sessions.db"
+    BATCH_SIZE = 500
+    FLUSH_PERIOD = 0.5  # seconds
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS attempts (
+            attempt_id TEXT PRIMARY KEY,
+            module_name TEXT NOT NULL,
+            play_notes TEXT,
+            instrument TEXT,
+            started_at REAL NOT NULL,
+            ended_at REAL,
+            accuracy REAL,
+            finished INTEGER DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS attempts_by_module ON attempts (module_name, started_at);
+        CREATE TABLE IF NOT EXISTS note_events (
+            attempt_id TEXT NOT NULL,
+            chrono REAL NOT NULL,
+            note TEXT NOT NULL,
+            pitch INTEGER,
+            step INTEGER,
+            expected_pitch INTEGER,
+            matched INTEGER,
+            accuracy REAL,
+            timing_deviation REAL
+        );
+        CREATE INDEX IF NOT EXISTS note_events_by_attempt ON note_events (attempt_id, chrono);
+        CREATE TABLE IF NOT EXISTS note_stats (
+            instrument TEXT NOT NULL,
+            expected_pitch INTEGER NOT NULL,
+            nb_expected INTEGER NOT NULL,
+            nb_matched INTEGER NOT NULL,
+            sum_accuracy REAL NOT NULL,
+            nb_accuracy INTEGER NOT NULL,
+            PRIMARY KEY (instrument, expected_pitch)
+        );
+    """
+    default_store = None
+
+    def __init__(self, db_file_name: str = DB_FILE_NAME):
+        self.db_file_name = db_file_name
+        self.debug = False
+        self.queue = queue.Queue()
+        self.attempts = {}  # attempt_id -> (instrument, started_at)
+        connection = self._connect()
+        connection.executescript(self.SCHEMA)
+        connection.close()
+        self.read_connection = None
+        self.writer_thread = threading.Thread(target=self._write, name="_practice_session_writer", daemon=True)
+        self.writer_thread.start()
+
+    @staticmethod
+    def get_default_store():
+        """
+        :return: the store shared by the whole application
+        """
+        if not PracticeSessionStore.default_store:
+            PracticeSessionStore.default_store = PracticeSessionStore()
+        return PracticeSessionStore.default_store
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_file_name, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def start_attempt(self, module_name: str, play_notes: str = "", instrument: str = "") -> str:
+        """
+        :param module_name:
+        :param play_notes: ex "C3-E3-G3"
+        :param instrument: ex "VoiceTraining"
+        :return: the id of the attempt
+        """
+        attempt_id = uuid.uuid4().hex
+        started_at = time.time()
+        self.attempts[attempt_id] = (instrument, started_at)
+        self.queue.put(("attempt", (attempt_id, module_name, play_notes, instrument, started_at)))
+        return attempt_id
+
+    def record_note(self, attempt_id: str, note: str, pitch: int = None, step: int = None,
+                    expected_pitch: int = None, matched: bool = False, accuracy: float = None,
+                    timing_deviation: float = None, event_time: float = None):
+        """
+        non blocking record of a heard note
+        :param attempt_id: see start_attempt()
+        :param note: eg "A#2"
+        :param pitch: see Pitch
+        :param step: step of the module aligned with the note
+        :param expected_pitch: pitch of the step
+        :param matched: True if the note is the expected one
+        :param accuracy: intonation accuracy in %
+        :param timing_deviation: in seconds
+        :param event_time: time.time() of the note - now by default
+        :return:
+        """
+        attempt = self.attempts.get(attempt_id)
+        if not attempt:
+            # late event of an ended attempt
+            return
+        instrument, started_at = attempt
+        chrono = (event_time or time.time()) - started_at
+        self.queue.put(("note", (attempt_id, chrono, note, pitch, step, expected_pitch, int(matched), accuracy,
+                                 timing_deviation), instrument))
+
+    def end_attempt(self, attempt_id: str, accuracy: float, finished: bool):
+        """
+        :param attempt_id: see start_attempt()
+        :param accuracy: percentage of the module achieved
+        :param finished: True if the whole module has been played
+        :return:
+        """
+        if self.attempts.pop(attempt_id, None):
+            self.queue.put(("end", (time.time(), accuracy, int(finished), attempt_id)))
+
+    def flush(self):
+        """
+        waits for the queued records to be written
+        :return:
+        """
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(None)
+        self.writer_thread.join()
+        if self.read_connection:
+            self.read_connection.close()
+            self.read_connection = None
+
+    def _write(self):
+        connection = self._connect()
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            try:
+                while len(batch) < self.BATCH_SIZE:
+                    batch.append(self.queue.get(timeout=self.FLUSH_PERIOD if len(batch) == 1 else 0))
+            except queue.Empty:
+                pass
+            if None in batch:
+                running = False
+                batch = batch[:batch.index(None)]
+            try:
+                with connection:
+                    self._write_batch(connection, batch)
+            except sqlite3.Error as err:
+                print("PracticeSessionStore - could not write", len(batch), "records:", err)
+            for _ in range(0, len(batch) + (0 if running else 1)):
+                self.queue.task_done()
+        connection.close()
+
+    def _write_batch(self, connection: sqlite3.Connection, batch: []):
+        attempts = [op[1] for op in batch if op[0] == "attempt"]
+        notes = [op[1] for op in batch if op[0] == "note"]
+        ends = [op[1] for op in batch if op[0] == "end"]
+        connection.executemany("INSERT INTO attempts (attempt_id, module_name, play_notes, instrument, started_at) "
+                               "VALUES (?, ?, ?, ?, ?)", attempts)
+        connection.executemany("INSERT INTO note_events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", notes)
+        stats = {}
+        for op in batch:
+            if op[0] == "note" and op[1][5] is not None:
+                key = (op[2], op[1][5])
+                stat = stats.setdefault(key, [0, 0, 0.0, 0])
+                stat[0] += 1
+                stat[1] += op[1][6]
+                if op[1][7] is not None:
+                    stat[2] += op[1][7]
+                    stat[3] += 1
+        connection.executemany("INSERT INTO note_stats VALUES (?, ?, ?, ?, ?, ?) "
+                               "ON CONFLICT (instrument, expected_pitch) DO UPDATE SET "
+                               "nb_expected = nb_expected + excluded.nb_expected, "
+                               "nb_matched = nb_matched + excluded.nb_matched, "
+                               "sum_accuracy = sum_accuracy + excluded.sum_accuracy, "
+                               "nb_accuracy = nb_accuracy + excluded.nb_accuracy",
+                               [key + tuple(stat) for key, stat in stats.items()])
+        connection.executemany("UPDATE attempts SET ended_at = ?, accuracy = ?, finished = ? WHERE attempt_id = ?",
+                               ends)
+        if self.debug:
+            print("PracticeSessionStore", len(attempts), "attempts", len(notes), "notes", len(ends), "ends")
+
+    def _read(self, query: str, parameters: tuple = ()) -> [tuple]:
+        if not self.read_connection:
+            self.read_connection = self._connect()
+        return self.read_connection.execute(query, parameters).fetchall()
+
+    def get_module_progress(self, module_name: str, limit: int = 100) -> [tuple]:
+        """
+        :param module_name:
+        :param limit: number of attempts
+        :return: [(started_at, accuracy, finished)] of the latest ended attempts, oldest first
+        """
+        rows = self._read("SELECT started_at, accuracy, finished FROM attempts "
+                          "WHERE module_name = ? AND ended_at IS NOT NULL "
+                          "ORDER BY started_at DESC LIMIT ?", (module_name, limit))
+        return rows[::-1]
+
+    def get_attempt_notes(self, attempt_id: str) -> [tuple]:
+        """
+        :param attempt_id:
+        :return: [(chrono, note, step, matched, accuracy, timing_deviation)]
+        """
+        return self._read("SELECT chrono, note, step, matched, accuracy, timing_deviation FROM note_events "
+                          "WHERE attempt_id = ? ORDER BY chrono", (attempt_id,))
+
+    def get_weakest_notes(self, instrument: str = None, limit: int = 5) -> [tuple]:
+        """
+        :param instrument: all instruments if None
+        :param limit: number of notes
+        :return: [(expected pitch, nb times expected, success rate in %, average intonation accuracy)]
+        """
+        where = "WHERE instrument = ?" if instrument else ""
+        return self._read(f"SELECT expected_pitch, SUM(nb_expected), "
+                          f"100.0 * SUM(nb_matched) / SUM(nb_expected) AS success, "
+                          f"SUM(sum_accuracy) / MAX(SUM(nb_accuracy), 1) "
+                          f"FROM note_stats {where} GROUP BY expected_pitch "
+                          f"ORDER BY success ASC, SUM(nb_expected) DESC LIMIT ?",
+                          ((instrument,) if instrument else ()) + (limit,))
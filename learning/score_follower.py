@@ -0,0 +1,161 @@
+from learning.pitch import Pitch
+
+
+class ScoreFollower:
+    """
+    online alignment of the heard notes with the steps of a module
+    streaming dynamic time warping constrained to a band around the current position:
+    each heard note costs O(band) whatever the length of the module
+    https://en.wikipedia.org/wiki/Dynamic_time_warping
+    the alignment starts on a virtual step -1 before the module, so that notes heard before the 1st step are extra
+    """
+    BAND = 8
+    SKIP_PENALTY = 0.35  # cost of each expected note that has not been played: skipping 2 steps is not an extra note
+    EXTRA_PENALTY = 0.8  # cost of a played note which is not expected
+    MATCH_THRESHOLD = 0.5  # pitch distance in half tones under which the heard note matches the step
+    START = -1  # virtual step before the 1st one
+
+    def __init__(self, expected_pitches: [int], step_duration: float = 1.0, expected_onsets: [float] = None,
+                 band: int = BAND):
+        """
+        :param expected_pitches: pitches of the module steps, see Pitch
+        :param step_duration: expected duration between 2 steps in seconds when expected_onsets is not provided
+        :param expected_onsets: expected time of each step in seconds from the 1st step
+        :param band: maximum number of steps the alignment may jump from the current position
+        """
+        self.expected_pitches = list(expected_pitches)
+        self.step_duration = step_duration
+        self.expected_onsets = expected_onsets
+        self.band = band
+        self.debug = False
+        self.reset()
+
+    def reset(self):
+        # costs of the alignments ending on each step of the band: {step: cost}
+        self.costs = {self.START: 0.0}
+        self.position = self.START
+        self.last_step = self.START  # last step matched or passed over - the skipped steps are reported from it
+        self.last_pitch = None
+        self.nb_events = 0
+        self.matched_steps = set()
+        self.nb_extra = 0
+        self.nb_skipped = 0
+        self.anchor = None  # (time, step) of the 1st matched note
+        self.last_status = None
+
+    def _cost(self, pitch: float, step: int) -> float:
+        return min(1.0, abs(pitch - self.expected_pitches[step]))
+
+    @property
+    def nb_matched(self) -> int:
+        """
+        :return: number of distinct steps matched - a step played again is counted once
+        """
+        return len(self.matched_steps)
+
+    def _expected_time(self, step: int):
+        if not self.anchor:
+            return None
+        anchor_time, anchor_step = self.anchor
+        if self.expected_onsets:
+            return anchor_time + self.expected_onsets[step] - self.expected_onsets[anchor_step]
+        return anchor_time + (step - anchor_step) * self.step_duration
+
+    def feed_silence(self):
+        """
+        a silence separates 2 onsets of the same note
+        :return:
+        """
+        self.last_pitch = None
+
+    def feed_note(self, note: str, time: float) -> dict:
+        """
+        :param note: eg "A#2" or "B3"
+        :param time: time of the event in seconds
+        :return: see feed()
+        """
+        return self.feed(Pitch.from_note(note), time)
+
+    def feed_frequency(self, frequency: float, time: float) -> dict:
+        """
+        :param frequency: heard frequency in Hz
+        :param time: time of the event in seconds
+        :return: see feed()
+        """
+        return self.feed(Pitch.from_frequency(frequency), time)
+
+    def feed(self, pitch: float, time: float) -> dict:
+        """
+        aligns a new heard pitch - a pitch identical to the previous one is the same note still sounding
+        :param pitch: integer or fractional pitch
+        :param time: time of the event in seconds
+        :return: None if the note is still sounding, else
+            {"position": step aligned with the note - START for a note before the 1st step,
+             "matched": True if the note is the expected one, "extra": True if the note is not part of the module, "skipped_steps": steps passed over,
+             "timing_deviation": seconds late (>0) or early (<0) - None before the 1st matched note,
+             "finished": True when the last step is matched}
+        """
+        if not self.expected_pitches:
+            return None
+        if self.last_pitch is not None and round(pitch) == round(self.last_pitch):
+            return None
+        self.last_pitch = pitch
+        previous_position = self.position
+        low = max(0, self.position - self.band)
+        high = min(len(self.expected_pitches) - 1, self.position + self.band)
+        inf = float("inf")
+        new_costs = {}
+        origins = {}
+        if low == 0 and self.START in self.costs:
+            # not started yet: the note is extra
+            new_costs[self.START], origins[self.START] = self.costs[self.START] + self.EXTRA_PENALTY, self.START
+        # best predecessor to advance on a step, possibly skipping some steps
+        best_previous, best_origin = self.costs.get(low - 1, inf), low - 1
+        for step in range(low, high + 1):
+            stay = self.costs.get(step, inf) + self.EXTRA_PENALTY
+            advance = best_previous + self._cost(pitch, step)
+            # on a tie, the alignment does not go back before the current position
+            if advance < stay or advance == stay and best_origin >= previous_position:
+                new_costs[step], origins[step] = advance, best_origin
+            else:
+                new_costs[step], origins[step] = stay, step
+            best_previous += self.SKIP_PENALTY
+            if self.costs.get(step, inf) <= best_previous:
+                best_previous, best_origin = self.costs[step], step
+        self.costs = new_costs
+        self.nb_events += 1
+        # ties go to the furthest step
+        self.position = min(new_costs.keys(), key=lambda s: (new_costs[s], -s))
+        origin = origins[self.position]
+        extra = origin == self.position
+        matched = not extra and self._cost(pitch, self.position) < self.MATCH_THRESHOLD
+        # the steps passed over while the previous notes were extra are reported when the alignment catches up
+        skipped_steps = list(range(self.last_step + 1, self.position)) if not extra else []
+        if not extra:
+            self.last_step = max(self.last_step, self.position)
+        self.nb_skipped += len(skipped_steps)
+        if extra:
+            self.nb_extra += 1
+        elif matched:
+            self.matched_steps.add(self.position)
+        timing_deviation = None
+        if matched:
+            if self.anchor is None:
+                self.anchor = (time, self.position)
+            timing_deviation = time - self._expected_time(self.position)
+        self.last_status = {"position": self.position, "matched": matched, "extra": extra,
+                            "skipped_steps": skipped_steps, "timing_deviation": timing_deviation,
+                            "finished": matched and self.position == len(self.expected_pitches) - 1}
+        if self.debug:
+            print("ScoreFollower", pitch, self.last_status)
+        return self.last_status
+
+    def is_finished(self) -> bool:
+        return bool(self.last_status and self.last_status["finished"])
+
+    def get_accuracy(self) -> float:
+        """
+        :return: percentage of matched notes among the expected and the extra notes
+        """
+        total = len(self.expected_pitches) + self.nb_extra
+        return 100 * self.nb_matched / total if total else 0.0
@@ -0,0 +1,132 @@
+import queue
+import threading
+
+import numpy as np
+
+
+class NoteEventLog:
+    """
+    columnar log of the played notes: pitch, onset & duration in seconds, confidence
+    the events are collected in fixed size chunks; full chunks are appended to a binary file
+    by a writer thread so that a recording of any length uses a bounded memory
+    """
+    EVENT_DTYPE = np.dtype([("pitch", "<i2"), ("onset", "<f8"), ("duration", "<f4"), ("confidence", "<f4")])
+    CHUNK_SIZE = 4096
+
+    def __init__(self, file_name: str, chunk_size: int = CHUNK_SIZE):
+        """
+        :param file_name: the binary file of the events, overwritten
+        :param chunk_size: number of events kept in memory before being written
+        """
+        self.file_name = file_name
+        self.chunk_size = chunk_size
+        self.chunk = np.empty(chunk_size, dtype=self.EVENT_DTYPE)
+        self.chunk_length = 0
+        self.nb_events = 0
+        self.current_note = None  # (pitch, onset, confidence) of the note being played
+        self.closed = False
+        self.on_closed = None
+        self.debug = False
+        self.queue = queue.Queue()
+        open(self.file_name, "wb").close()
+        self.writer_thread = threading.Thread(target=self._write, name="_note_event_writer", daemon=True)
+        self.writer_thread.start()
+
+    def add_event(self, pitch: int, onset: float, duration: float, confidence: float = 1.0):
+        """
+        :param pitch: see Pitch
+        :param onset: in seconds from the beginning of the recording
+        :param duration: in seconds
+        :param confidence: between 0 and 1
+        :return:
+        """
+        self.chunk[self.chunk_length] = (pitch, onset, duration, confidence)
+        self.chunk_length += 1
+        self.nb_events += 1
+        if self.chunk_length == self.chunk_size:
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        if self.chunk_length:
+            self.queue.put(self.chunk[:self.chunk_length])
+            self.chunk = np.empty(self.chunk_size, dtype=self.EVENT_DTYPE)
+            self.chunk_length = 0
+
+    def note_on(self, pitch: int, time: float, confidence: float = 1.0):
+        """
+        ends the current note & starts a new one - a repeated pitch is the same note still sounding
+        :param pitch: see Pitch
+        :param time: in seconds from the beginning of the recording
+        :param confidence: between 0 and 1
+        :return:
+        """
+        if self.current_note and self.current_note[0] == pitch:
+            return
+        self.note_off(time)
+        self.current_note = (pitch, time, confidence)
+
+    def note_off(self, time: float):
+        """
+        ends the current note
+        :param time: in seconds from the beginning of the recording
+        :return:
+        """
+        if self.current_note:
+            pitch, onset, confidence = self.current_note
+            self.add_event(pitch, onset, time - onset, confidence)
+            self.current_note = None
+
+    def close(self, time: float = None, on_closed=None):
+        """
+        writes the remaining events without waiting for the writer thread
+        :param time: end of the current note in seconds - the note is dropped if None
+        :param on_closed: function(log) called by the writer thread once everything is written
+        :return:
+        """
+        if self.closed:
+            return
+        if time is not None:
+            self.note_off(time)
+        self._flush_chunk()
+        self.closed = True
+        self.on_closed = on_closed
+        self.queue.put(None)
+
+    def join(self):
+        self.writer_thread.join()
+
+    def _write(self):
+        with open(self.file_name, "ab") as file:
+            while True:
+                chunk = self.queue.get()
+                if chunk is None:
+                    break
+                chunk.tofile(file)
+                file.flush()
+                if self.debug:
+                    print("NoteEventLog", len(chunk), "events written to", self.file_name)
+        if self.on_closed:
+            self.on_closed(self)
+
+    @staticmethod
+    def read(file_name: str) -> np.ndarray:
+        """
+        :param file_name: a file written by a NoteEventLog
+        :return: structured array of the events, see EVENT_DTYPE
+        """
+        return np.fromfile(file_name, dtype=NoteEventLog.EVENT_DTYPE)
+
+    @staticmethod
+    def iter_chunks(file_name: str, chunk_size: int = CHUNK_SIZE):
+        """
+        streaming read of a log
+        :param file_name: a file written by a NoteEventLog
+        :param chunk_size: max number of events per chunk
+        :return: generator of structured arrays, see EVENT_DTYPE
+        """
+        with open(file_name, "rb") as file:
+            while True:
+                chunk = np.fromfile(file, dtype=NoteEventLog.EVENT_DTYPE, count=chunk_size)
+                if not len(chunk):
+                    break
+                yield chunk
@@ -1,19 +1,33 @@
 import json
+import os
+import time
 import tkinter
+from collections import deque
 from datetime import datetime
-from tkinter import Frame, LabelFrame, messagebox, Tk, Button
+from tkinter import Frame, LabelFrame, messagebox, Tk, Button, Checkbutton, IntVar, Label
 from tkinter.constants import *
 from tkinter.ttk import Combobox
 
+import numpy as np
 from moustovtkwidgets_lib.mtk_edit_table import mtkEditTable, mtkEditTableListener
-from pyharmonytools.harmony.note import Note
 
+from audio.raw_audio_recorder import RawAudioRecorder
+from file_capabilities.midi_file import MidiFile
 from instrument.guitar_training import GuitarTraining
 from instrument.voice_training import VoiceTraining
 from learning.instrument_listener import InstrumentListener
+from learning.pitch import Pitch
+from note_recorder.note_event_log import NoteEventLog
+from note_recorder.tempo_quantizer import TempoQuantizer
 
 
 class NoteRecorder(InstrumentListener, mtkEditTableListener):
+    RECORDINGS_PATH = "recordings/"
+    SONGS_PATH = "learning modules/songs/"
+    QUANTIZATION_SUBDIVISION = 2  # grid steps per beat
+    TABLE_REFRESH_PERIOD = 100  # ms
+    MAX_VISIBLE_ROWS = 200
+
     def __init__(self):
         self.instrument_frame = None
         self.notes_cells = None
@@ -28,9 +42,81 @@ class NoteRecorder(InstrumentListener, mtkEditTableListener):
         self.instrument_labelframe = None
         self.frame = None
         self.ui_root_tk = None
+        self.event_log = None
+        self.raw_audio_recorder = None
+        self.raw_audio_var = None
+        self.dropped_buffers_label = None
+        self.recording_start = None
+        self.last_played_note = None
+        # played notes waiting to be displayed: (chrono, note) appended by the mic thread
+        self.pending_notes = deque()
+        self.visible_rows = deque()
+        self.open_row = None  # (iid, chrono, note) of the note being played
+        self.table_refresh_id = None
+
+    def played_note(self, note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0):
+        recording_start = self.recording_start
+        if not recording_start:
+            # heard before the start or after the stop of the recording
+            return
+        event_log = self.event_log
+        chrono = time.time() - recording_start
+        if event_log:
+            if note == "-":
+                event_log.note_off(chrono)
+            else:
+                confidence = 1 - abs((closest_pitch - heard_freq) / closest_pitch) if closest_pitch else 1.0
+                event_log.note_on(Pitch.from_note(note), chrono, confidence)
+        if note != self.last_played_note:
+            # displayed later by the Tk thread, see _refresh_played_notes()
+            self.pending_notes.append((chrono, note))
+        self.last_played_note = note
+
+    def _refresh_played_notes(self):
+        """
+        inserts the pending notes in the table by batch, in the Tk thread
+        only the last MAX_VISIBLE_ROWS notes are kept in the table
+        :return:
+        """
+        nb_notes = len(self.pending_notes)
+        for _ in range(0, nb_notes):
+            chrono, note = self.pending_notes.popleft()
+            if self.open_row:
+                iid, onset, open_note = self.open_row
+                if self.notes_cells.exists(iid):
+                    self.notes_cells.item(iid, values=(round(onset, 2), open_note, round(chrono - onset, 2)))
+                self.open_row = None
+            if note != "-":
+                iid = self.notes_cells.insert(parent="", index='end', text="", values=(round(chrono, 2), note, ""))
+                self.visible_rows.append(iid)
+                self.open_row = (iid, chrono, note)
+        while len(self.visible_rows) > self.MAX_VISIBLE_ROWS:
+            self.notes_cells.delete(self.visible_rows.popleft())
+        if nb_notes and self.visible_rows:
+            self.notes_cells.see(self.visible_rows[-1])
+        if self.raw_audio_recorder:
+            self._show_dropped_buffers(self.raw_audio_recorder)
+
+    def _show_dropped_buffers(self, raw_audio_recorder: RawAudioRecorder):
+        """
+        the audio buffers lost when the writer thread of the raw audio is too slow
+        :param raw_audio_recorder:
+        :return:
+        """
+        nb_dropped_buffers = raw_audio_recorder.nb_dropped_buffers
+        text = f"{nb_dropped_buffers} audio buffers dropped" if nb_dropped_buffers else ""
+        if self.dropped_buffers_label and self.dropped_buffers_label.cget("text") != text:
+            self.dropped_buffers_label.configure(text=text, fg="red")
 
-    def played_note(self, note: Note):
-        self.notes_cells.insert(parent="", index='end', text="", values=("chrono", str(Note), "duration"))
+    def _schedule_table_refresh(self):
+        self._refresh_played_notes()
+        self.table_refresh_id = self.frame.after(self.TABLE_REFRESH_PERIOD, self._schedule_table_refresh)
+
+    def _stop_table_refresh(self):
+        if self.table_refresh_id:
+            self.frame.after_cancel(self.table_refresh_id)
+            self.table_refresh_id = None
+        self._refresh_played_notes()
 
     def get_ui_frame(self, root: tkinter.Tk) -> Frame:
         self.frame = Frame(root)
@@ -55,6 +141,11 @@ class NoteRecorder(InstrumentListener, mtkEditTableListener):
         self.record_button.grid(row=1, column=0)
         self.stop_button = Button(self.recorder_labelframe, text='Stop', command=self.do_stop_recording)
         self.stop_button.grid(row=1, column=1)
+        self.raw_audio_var = IntVar(value=0)
+        Checkbutton(self.recorder_labelframe, text='Keep raw audio', variable=self.raw_audio_var).grid(row=1,
+                                                                                                      column=2)
+        self.dropped_buffers_label = Label(self.recorder_labelframe, text="")
+        self.dropped_buffers_label.grid(row=2, column=0, columnspan=3)
         # todo [BPM (30-250) / shield signature / number of bars] vs [chrono]
 
         # todo display score
@@ -72,27 +163,102 @@ class NoteRecorder(InstrumentListener, mtkEditTableListener):
         self.notes_cells.column("#0", width=70, stretch=NO)
         return self.frame
 
-    def do_save_score(self):
-        score = []
-        previous_note = ""
-        for note in self.selected_instrument.song:
-            if previous_note != note[0]:
-                score.append(note[0])
-                previous_note = note[0]
+    def do_save_score(self, event_log: NoteEventLog = None):
+        """
+        saves the recorded notes as a learning module
+        :param event_log: the closed log of the recording - the song of the instrument if None
+        :return:
+        """
         score_file_name = str(datetime.now()).replace(":", "-")
-        # todo take rests & durations into account
-        file_content = {"name": score_file_name, "description": "recorded notes", "play_notes": "-".join(score),
+        os.makedirs(self.SONGS_PATH, exist_ok=True)
+        if event_log:
+            events = NoteEventLog.read(event_log.file_name)
+            tempo = TempoQuantizer.estimate_tempo(events["onset"])
+            onsets, durations, steps = TempoQuantizer.quantize(events["onset"], events["duration"], tempo,
+                                                               self.QUANTIZATION_SUBDIVISION)
+            length_steps = np.round(durations * tempo / 60 * self.QUANTIZATION_SUBDIVISION)
+            play_notes = TempoQuantizer.to_play_notes(events["pitch"], steps, length_steps)
+            # the rests are kept apart: every step of play_notes is a note
+            rests = TempoQuantizer.get_rests(steps, length_steps)
+            midi_file = MidiFile(tempo, self.selected_instrument.sig_up, self.selected_instrument.sig_down)
+            midi_file.name = score_file_name
+            velocities = 40 + 87 * np.clip(events["confidence"], 0, 1)
+            start = onsets[0] if len(onsets) else 0.0
+            for pitch, onset, duration, velocity in zip(events["pitch"].tolist(), (onsets - start).tolist(),
+                                                        durations.tolist(), velocities.tolist()):
+                midi_file.add_note(pitch, onset, duration, velocity)
+            midi_file.write(self.SONGS_PATH + score_file_name + ".mid")
+        else:
+            score = []
+            previous_note = ""
+            for note in self.selected_instrument.song:
+                if previous_note != note[0] and note[0] != "-":
+                    score.append(note[0])
+                previous_note = note[0]
+            play_notes = "-".join(score)
+            rests = None
+        file_content = {"name": score_file_name, "description": "recorded notes", "play_notes": play_notes,
                         "next possible": ""}
-        with open("learning modules/songs/" + score_file_name + ".json", "w", encoding='utf-8') as file:
+        if rests:
+            file_content["rests"] = rests
+        with open(self.SONGS_PATH + score_file_name + ".json", "w", encoding='utf-8') as file:
             json.dump(file_content, file, indent=4, ensure_ascii=False)
         print(f"Saved to {score_file_name}")
 
     def do_start_recording(self):
+        os.makedirs(self.RECORDINGS_PATH, exist_ok=True)
+        recording_name = self.RECORDINGS_PATH + str(datetime.now()).replace(":", "-")
+        self.last_played_note = None
+        self.pending_notes.clear()
+        self.recording_start = time.time()
+        self.event_log = NoteEventLog(recording_name + ".notes")
+        if self.raw_audio_var and self.raw_audio_var.get():
+            mic_analyzer = self.selected_instrument.mic_analyzer
+            self.raw_audio_recorder = RawAudioRecorder(recording_name, mic_analyzer.SAMPLE_FREQ,
+                                                       mic_analyzer.WINDOW_STEP)
+            self.raw_audio_recorder.start()
+            mic_analyzer.raw_audio_tap = self.raw_audio_recorder.tap
+            self._show_dropped_buffers(self.raw_audio_recorder)
+        self.open_row = None
+        self._stop_table_refresh()
+        self._schedule_table_refresh()
         self.selected_instrument.do_start_hearing(None)
 
     def do_stop_recording(self):
         self.selected_instrument.do_stop_hearing()
-        self.do_save_score()
+        raw_audio_recorder = self.raw_audio_recorder
+        self.raw_audio_recorder = None
+        if raw_audio_recorder:
+            self.selected_instrument.mic_analyzer.raw_audio_tap = None
+            # the last audio files are closed by the writer thread
+            raw_audio_recorder.stop(wait=False)
+            # no more tap(): the count is final
+            self._show_dropped_buffers(raw_audio_recorder)
+        recording_start = self.recording_start
+        self.recording_start = None
+        if recording_start:
+            # ends the last displayed note
+            self.pending_notes.append((time.time() - recording_start, "-"))
+        self._stop_table_refresh()
+        event_log = self.event_log
+        self.event_log = None
+        if event_log:
+            # the score is saved by the writer thread once the last events are written
+            event_log.close(time.time() - recording_start, on_closed=self._save_closed_log)
+        else:
+            self.do_save_score()
+
+    def _save_closed_log(self, event_log: NoteEventLog):
+        """
+        called by the writer thread of the log: the errors are reported on the Tk thread
+        :param event_log: the closed log of the recording
+        :return:
+        """
+        try:
+            self.do_save_score(event_log)
+        except Exception as err:
+            message = f"The recording {event_log.file_name} could not be saved: {err}"
+            self.frame.after(0, lambda: messagebox.showerror("PyHarmony", message))
 
     def _do_select_instrument(self, event):
         """
@@ -110,18 +276,9 @@ class NoteRecorder(InstrumentListener, mtkEditTableListener):
             self.selected_instrument = GuitarTraining(self)
         else:
             messagebox.showinfo("PyHarmony", "This instrument is not yet implemented - try 'Voice' instead")
-        if instr == "Voice":
-            self.selected_instrument = VoiceTraining(self)
+        if self.selected_instrument:
             for widget in self.instrument_frame.winfo_children():
                 widget.destroy()
             self.instrument_frame = self.selected_instrument.get_ui_frame(self.frame)
             self.instrument_frame.grid(row=1, column=0, columnspan=5, sticky='nsew', padx=5, pady=5)
-        elif instr == "Guitar":
-            self.selected_instrument = GuitarTraining(self)
-            for widget in self.instrument_frame.winfo_children():
-                widget.destroy()
-            self.instrument_frame = self.selected_instrument.get_ui_frame(self.frame)
-            self.instrument_frame.grid(row=1, column=0, columnspan=5, sticky='nsew', padx=5, pady=5)
-        else:
-            messagebox.showinfo("PyHarmony", "This instrument is not yet implemented - try 'Voice' instead")
         Tk.update(self.ui_root_tk)
\ No newline at end of file
@@ -0,0 +1,115 @@
+import numpy as np
+
+from learning.pitch import Pitch
+
+
+class TempoQuantizer:
+    """
+    tempo estimation & grid quantization of recorded notes, vectorized over whole recordings
+    the tempo is the beat period that best explains the inter-onset-interval (IOI) histogram
+    https://en.wikipedia.org/wiki/Inter-onset_interval
+    """
+    MIN_BPM = 30
+    MAX_BPM = 250
+    BPM_STEP = 0.5
+    HISTOGRAM_BIN = 0.01  # seconds
+    MAX_IOI = 4.0  # seconds, longer intervals are pauses
+    MIN_IOI = 0.05  # seconds, shorter intervals are detection glitches
+    FIT_TOLERANCE = 0.1  # standard deviation of the fit, in half beats
+    PREFERRED_BPM = 120
+    PRIOR_OCTAVES = 1.0  # standard deviation of the tempo prior, in octaves of tempo
+
+    @staticmethod
+    def ioi_histogram(onsets: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        :param onsets: in seconds
+        :return: (centers of the bins in seconds, counts)
+        """
+        iois = np.diff(np.sort(np.asarray(onsets, dtype=np.float64)))
+        iois = iois[(iois >= TempoQuantizer.MIN_IOI) & (iois <= TempoQuantizer.MAX_IOI)]
+        edges = np.arange(0, TempoQuantizer.MAX_IOI + TempoQuantizer.HISTOGRAM_BIN, TempoQuantizer.HISTOGRAM_BIN)
+        counts, edges = np.histogram(iois, bins=edges)
+        return (edges[:-1] + edges[1:]) / 2, counts
+
+    @staticmethod
+    def estimate_tempo(onsets: np.ndarray, min_bpm: float = MIN_BPM, max_bpm: float = MAX_BPM) -> float:
+        """
+        :param onsets: in seconds
+        :param min_bpm:
+        :param max_bpm:
+        :return: beats per minute - PREFERRED_BPM if there are not enough notes
+        """
+        centers, counts = TempoQuantizer.ioi_histogram(onsets)
+        used = counts > 0
+        if not used.any():
+            return float(TempoQuantizer.PREFERRED_BPM)
+        centers, counts = centers[used], counts[used]
+        bpms = np.arange(min_bpm, max_bpm + TempoQuantizer.BPM_STEP, TempoQuantizer.BPM_STEP)
+        half_beats = 30 / bpms
+        # distance of each IOI to the closest multiple of half a beat, for each tempo
+        ratios = centers[None, :] / half_beats[:, None]
+        errors = (ratios - np.round(ratios)) / TempoQuantizer.FIT_TOLERANCE
+        fits = (np.exp(-0.5 * errors ** 2) * counts[None, :]).sum(axis=1) / counts.sum()
+        # octave errors: double & half tempos fit as well, the tempo prior decides
+        prior = np.exp(-0.5 * (np.log2(bpms / TempoQuantizer.PREFERRED_BPM) / TempoQuantizer.PRIOR_OCTAVES) ** 2)
+        return float(bpms[np.argmax(fits * prior)])
+
+    @staticmethod
+    def quantize(onsets: np.ndarray, durations: np.ndarray, tempo: float, subdivision: int = 4,
+                 phase: float = None) -> (np.ndarray, np.ndarray, np.ndarray):
+        """
+        snaps the onsets & durations to the grid
+        :param onsets: in seconds
+        :param durations: in seconds
+        :param tempo: beats per minute
+        :param subdivision: grid steps per beat
+        :param phase: time of a grid step in seconds - the circular mean of the onsets by default
+        :return: (quantized onsets in seconds, quantized durations in seconds, onset grid steps from the 1st note)
+        """
+        onsets = np.asarray(onsets, dtype=np.float64)
+        durations = np.asarray(durations, dtype=np.float64)
+        grid = 60 / tempo / subdivision
+        if not len(onsets):
+            return onsets, durations, np.zeros(0, dtype=np.int64)
+        if phase is None:
+            angles = 2 * np.pi * onsets / grid
+            phase = float(np.angle(np.exp(1j * angles).mean()) / (2 * np.pi) * grid)
+        steps = np.round((onsets - phase) / grid).astype(np.int64)
+        length_steps = np.maximum(1, np.round(durations / grid)).astype(np.int64)
+        return steps * grid + phase, length_steps * grid, steps - steps.min()
+
+    @staticmethod
+    def _sort_notes(pitches: np.ndarray, steps: np.ndarray, lengths: np.ndarray = None) -> [tuple]:
+        """
+        :return: [(pitch, silent grid steps before the note)] in the order of the onsets
+        """
+        steps = np.asarray(steps)
+        lengths = np.ones(len(steps), dtype=np.int64) if lengths is None else np.asarray(lengths, dtype=np.int64)
+        order = np.argsort(steps, kind="stable")
+        notes = []
+        sounding_until = steps[order[0]] if len(steps) else 0
+        for pitch, step, length in zip(np.asarray(pitches)[order].tolist(), steps[order].tolist(),
+                                       lengths[order].tolist()):
+            notes.append((pitch, max(0, step - sounding_until)))
+            sounding_until = max(sounding_until, step + length)
+        return notes
+
+    @staticmethod
+    def to_play_notes(pitches: np.ndarray, steps: np.ndarray, lengths: np.ndarray = None) -> str:
+        """
+        :param pitches: see Pitch
+        :param steps: onset grid steps, see quantize()
+        :param lengths: duration in grid steps - 1 step by default
+        :return: a learning module sequence in the order of the onsets, eg "C3-E3-G3" - the rests are given by
+                 get_rests()
+        """
+        return "-".join(Pitch.to_note(pitch) for pitch, _ in TempoQuantizer._sort_notes(pitches, steps, lengths))
+
+    @staticmethod
+    def get_rests(steps: np.ndarray, lengths: np.ndarray = None) -> [int]:
+        """
+        :param steps: onset grid steps, see quantize()
+        :param lengths: duration in grid steps - 1 step by default
+        :return: the silent grid steps before each note of to_play_notes(), eg [0, 0, 1] for C3 E3 . G3
+        """
+        return [rest for _, rest in TempoQuantizer._sort_notes(np.zeros(len(steps)), steps, lengths)]
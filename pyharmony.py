@@ -7,6 +7,7 @@ from tkinter.filedialog import askopenfilename
 from audio.capture_sound_fft import CaptureSoundFFT
 from audio.capture_sound_plot import capture_and_display_sound
 from file_capabilities.download_mp3_youtube import DownloadMP3Youtube
+from instrument.find_chords_from_tabs import FindChordsFromTabs
 from learning.learning_center import LearningCenter
 from note_recorder.note_recorder import NoteRecorder
 from ultimate_guitar.search_cadence import SearchSongFromCadence
@@ -24,6 +25,7 @@ class RootWindow(tkinter.Tk):
         self.learning_center = None
         self.search_chords = None
         self.search_cadence = None
+        self.find_chords_from_tabs = None
         self.live_hearing = None
         self.menu_bar = None
         self._set_layout()
@@ -72,7 +74,7 @@ class RootWindow(tkinter.Tk):
 
         menu_score = Menu(self.menu_bar, tearoff=0)
         menu_score.add_command(label="Transpose", command=self.do_about)
-        menu_score.add_command(label="Find chords from tabs", command=self.do_about)
+        menu_score.add_command(label="Find chords from tabs", command=self.do_find_chords_from_tabs)
         self.menu_bar.add_cascade(label="Score", menu=menu_score)
 
         menu_help = Menu(self.menu_bar, tearoff=0)
@@ -122,6 +124,12 @@ class RootWindow(tkinter.Tk):
         frame = self.search_cadence.get_ui_frame(self)
         frame.grid(row=1, column=0, columnspan=5, sticky='nsew', padx=5, pady=5)
 
+    def do_find_chords_from_tabs(self):
+        self.clear_root()
+        self.find_chords_from_tabs = FindChordsFromTabs()
+        frame = self.find_chords_from_tabs.get_ui_frame(self)
+        frame.grid(row=1, column=0, columnspan=5, sticky='nsew', padx=5, pady=5)
+
     def do_record_notes(self):
         self.clear_root()
         self.note_recorder = NoteRecorder()
@@ -139,6 +147,8 @@ class RootWindow(tkinter.Tk):
             self.search_cadence.frame.grid_remove()
         if self.note_recorder:
             self.note_recorder.frame.grid_remove()
+        if self.find_chords_from_tabs:
+            self.find_chords_from_tabs.frame.grid_remove()
 
 
 
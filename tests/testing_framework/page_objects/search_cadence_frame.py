@@ -23,7 +23,7 @@ class SearchCadenceFrame:
 
     def click_button_search_cadence(self):
         self.search_cadence_object.do_search_songs()
-        self.search_cadence_object.download_thread.join()
+        self.search_cadence_object.search_job.displayed.wait()
 
     def get_found_songs(self) -> {}:
         songs = self.search_cadence_object.list_of_songs.get_children()
@@ -23,7 +23,7 @@ class SearchChordsFrame:
 
     def click_button_search_chords(self):
         self.search_chord_object.do_search_songs()
-        self.search_chord_object.download_thread.join()
+        self.search_chord_object.search_job.displayed.wait()
 
     def get_found_songs(self) -> {}:
         songs = self.search_chord_object.list_of_songs.get_children()
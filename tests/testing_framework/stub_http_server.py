@@ -0,0 +1,101 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def ug_song_page(artist: str, title: str, lines: [tuple]) -> str:
+    """
+    minimal recorded Ultimate Guitar song page, as digested by UltimateGuitarSong.digest()
+    :param artist:
+    :param title:
+    :param lines: [(chords, lyrics)] eg [("C G Am", "When I find myself")]
+    :return: the html of the page
+    """
+    tabs = []
+    for chords, lyrics in lines:
+        chords_line = "  ".join(f"[ch]{c}[/ch]" for c in chords.split())
+        tabs.append(f"[tab]  {chords_line}\\r\\n{lyrics}[/tab]")
+    content = "\\r\\n".join(tabs)
+    return f"<html><title>{title} CHORDS by {artist} @ Ultimate-Guitar.Com</title>" \
+           f"<div data-content=\"{{&quot;content&quot;:&quot;{content}&quot;,&quot;revision_id&quot;:1}}\">" \
+           f"</div></html>"
+
+
+class StubHttpServer:
+    """
+    local stand-in for remote sites: serves recorded pages from a thread
+    pages = {path: body} - a body can be preceded by failures: {path: [503, 503, body]}
+    """
+
+    def __init__(self, pages: dict = None, delay: float = 0.0):
+        """
+        :param pages: {path: body or list of HTTP error codes ending with the body}
+        :param delay: seconds waited before each answer
+        """
+        self.pages = dict(pages or {})
+        self.delay = delay
+        self.requests = []  # requested paths, in order
+        self.max_concurrent_requests = 0
+        self.concurrent_requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with stub.lock:
+                    stub.requests.append(self.path)
+                    stub.concurrent_requests += 1
+                    stub.max_concurrent_requests = max(stub.max_concurrent_requests, stub.concurrent_requests)
+                    answer = stub.pages.get(self.path)
+                    if isinstance(answer, list):
+                        answer = answer.pop(0) if len(answer) > 1 else answer[0]
+                try:
+                    time.sleep(stub.delay)
+                    if answer is None:
+                        status, body = 404, b"not found"
+                    elif isinstance(answer, int):
+                        status, body = answer, b"error"
+                    else:
+                        status, body = 200, answer.encode("utf-8")
+                    self.send_response(status)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with stub.lock:
+                        stub.concurrent_requests -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="_stub_http_server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
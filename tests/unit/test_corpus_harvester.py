@@ -0,0 +1,71 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from tests.testing_framework.stub_http_server import StubHttpServer, ug_song_page
+from ultimate_guitar.corpus_harvester import CorpusHarvester
+from ultimate_guitar.progression_index import ProgressionIndex
+from ultimate_guitar.song_fetcher import SongFetcher
+
+
+class LocalSearch:
+    """
+    search engine of the songs of a StubHttpServer: the query is the list of the paths
+    """
+
+    def __init__(self, server: StubHttpServer):
+        self.server = server
+        self.queries = []
+
+    def search(self, query: str, limit: int) -> [str]:
+        self.queries.append(query)
+        return [self.server.url(path) for path in query.split()][:limit]
+
+
+class TestCorpusHarvester(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.corpus_file_name = os.path.join(self.tmp_dir.name, "corpus.jsonl.gz")
+        self.pages = {f"/tab/{i}": ug_song_page(f"Artist {i}", f"Song {i}", [("C G Am F", "la")])
+                      for i in range(0, 4)}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _harvester(self, server: StubHttpServer) -> CorpusHarvester:
+        return CorpusHarvester(self.corpus_file_name, search_engine=LocalSearch(server),
+                               song_fetcher=SongFetcher(min_host_interval=0.0, max_retries=0))
+
+    def test_songs_are_harvested_once(self):
+        with StubHttpServer(self.pages) as server:
+            harvester = self._harvester(server)
+            assert harvester.harvest(["chords:/tab/0 /tab/1 /tab/2", "chords:/tab/2 /tab/3 /tab/0"]) == 4
+            harvester.song_fetcher.shutdown()
+        songs = list(CorpusHarvester.read_corpus(self.corpus_file_name))
+        assert sorted(s["song_title"] for s in songs) == ["Song 0", "Song 1", "Song 2", "Song 3"]
+        assert songs[0]["chords_sequence"] == ["C", "G", "Am", "F"]
+        assert sorted(server.requests) == sorted(self.pages)
+        index = ProgressionIndex()
+        assert index.add_corpus(self.corpus_file_name) == 4
+
+    def test_interrupted_harvest_resumes(self):
+        pages = dict(self.pages)
+        pages["/tab/3"] = [503]
+        queries = ["chords:/tab/0 /tab/1", "chords:/tab/2 /tab/3"]
+        with StubHttpServer(pages) as server:
+            harvester = self._harvester(server)
+            assert harvester.harvest(queries) == 3
+            assert harvester.nb_errors == 1
+            harvester.song_fetcher.shutdown()
+            # killed while writing a song
+            with open(self.corpus_file_name, "ab") as corpus:
+                corpus.write(b"\x1f\x8b\x08\x00garbage")
+            server.pages["/tab/3"] = self.pages["/tab/3"]
+            server.requests.clear()
+            harvester = self._harvester(server)
+            assert harvester.harvest(queries) == 1
+            harvester.song_fetcher.shutdown()
+        assert harvester.search_engine.queries == []
+        assert server.requests == ["/tab/3"]
+        songs = list(CorpusHarvester.read_corpus(self.corpus_file_name))
+        assert sorted(s["song_title"] for s in songs) == ["Song 0", "Song 1", "Song 2", "Song 3"]
@@ -0,0 +1,22 @@
+from unittest import TestCase
+
+from instrument.fingering_planner import FingeringPlanner
+from instrument.fretboard_positions import FretboardPositions
+
+
+class TestFingeringPlanner(TestCase):
+    def setUp(self):
+        self.planner = FingeringPlanner(FretboardPositions.get_table("Standard"))
+
+    def test_open_position_scale(self):
+        planned = self.planner.plan_notes(["C3", "D3", "E3", "F3", "G3", "A3", "B3", "C4"])
+        assert planned == [(1, 3), (2, 0), (2, 2), (2, 3), (3, 0), (3, 2), (4, 0), (4, 1)]
+
+    def test_hand_stays_in_position(self):
+        planned = self.planner.plan_notes(["A4", "C5", "D5", "A4"])
+        frets = [p[1] for p in planned]
+        assert max(frets) - min(frets) < FingeringPlanner.HAND_SPAN
+
+    def test_out_of_neck_notes(self):
+        assert self.planner.plan_notes(["C1", "-", "E2"]) == [None, None, (0, 0)]
+        assert self.planner.plan([]) == []
@@ -0,0 +1,25 @@
+from unittest import TestCase
+
+from instrument.fretboard_positions import FretboardPositions
+from learning.pitch import Pitch
+
+
+class TestFretboardPositions(TestCase):
+    def test_standard_tuning(self):
+        table = FretboardPositions.get_table("Standard")
+        assert table is FretboardPositions.get_table("Standard")
+        assert table.string_names == ["E", "A", "D", "G", "B", "e"]
+        assert table.get_note(0, 8) == "C3"
+        assert table.get_positions(Pitch.from_note("E4")) == [(2, 14), (3, 9), (4, 5), (5, 0)]
+        assert table.get_positions_from_note("Bb2") == table.get_positions_from_note("A#2") == [(0, 6), (1, 1)]
+        assert len(table.get_positions_from_note("E")) == 10
+
+    def test_alternative_tunings(self):
+        assert FretboardPositions.get_table("Drop D").get_note(0, 0) == "D2"
+        assert FretboardPositions.get_table("DADGAD").string_names == ["D", "A", "D", "G", "A", "d"]
+        seven_strings = FretboardPositions.get_table("7 strings", 24)
+        assert seven_strings.string_quantity == 7
+        assert seven_strings.lowest_pitch == Pitch.from_note("B1")
+        assert seven_strings.highest_pitch == Pitch.from_note("E4") + 23
+        with self.assertRaises(ValueError):
+            FretboardPositions.get_table("Banjo")
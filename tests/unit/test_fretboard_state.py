@@ -0,0 +1,47 @@
+from unittest import TestCase
+
+from instrument.fretboard_state import FretboardState
+
+
+class RecordingCanvas:
+    def __init__(self):
+        self.calls = []
+
+    def itemconfigure(self, item_id, **options):
+        self.calls.append((item_id, options["state"]))
+
+
+class TestFretboardState(TestCase):
+    def setUp(self):
+        self.canvas = RecordingCanvas()
+        self.state = FretboardState(self.canvas)
+        self.state.add_position(0, 0, "E", 2, (1, 2))
+        self.state.add_position(0, 5, "A", 2, (3, 4))
+        self.state.add_position(1, 0, "A", 2, (5, 6))
+        self.state.add_position(1, 1, "Bb", 2, (7, 8))
+
+    def test_only_changed_items_are_configured(self):
+        assert self.state.set_note_visible("A2", True) == 0
+        assert self.canvas.calls == []
+        assert self.state.hide_all() == 4
+        assert len(self.canvas.calls) == 8
+        self.canvas.calls = []
+        assert self.state.set_note_visible("A", True) == 2
+        assert self.state.set_note_visible("A2", True) == 0
+        assert sorted(self.canvas.calls) == [(3, "normal"), (4, "normal"), (5, "normal"), (6, "normal")]
+
+    def test_note_names(self):
+        assert self.state.get_positions("A#2") == self.state.get_positions("Bb") == [(1, 1)]
+        assert self.state.get_positions("C3") == []
+        self.state.show_only([(1, 1)])
+        assert self.state.visible == {(1, 1)}
+
+    def test_strings_with_the_same_name_are_distinct(self):
+        # DADGAD : the 1st and the 3rd strings are both named D
+        state = FretboardState(RecordingCanvas())
+        state.add_position(0, 0, "D", 2, (1, 2))
+        state.add_position(2, 0, "D", 3, (3, 4))
+        state.hide_all()
+        state.set_positions_visible([(2, 0)], True)
+        assert state.visible == {(2, 0)}
+        assert state.get_positions("D3") == [(2, 0)]
@@ -0,0 +1,63 @@
+import os
+import socket
+import tempfile
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from file_capabilities.http_session import HttpSession
+from tests.testing_framework.stub_http_server import StubHttpServer
+
+
+class TestHttpSession(TestCase):
+    def setUp(self):
+        self.session = HttpSession(max_connections_per_host=2, timeout=5)
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_connections_are_kept_alive(self):
+        with StubHttpServer({"/page": "hello"}) as server:
+            texts = [self.session.get_text(server.url("/page")) for _ in range(0, 5)]
+        assert texts == ["hello"] * 5
+        metrics = self.session.get_metrics()
+        assert metrics["requests"] == 5
+        assert metrics["connections"] == 1
+        assert metrics["reused connections"] == 4
+        assert metrics["bytes"] == 25
+
+    def test_connections_per_host_are_limited(self):
+        with StubHttpServer({f"/page-{i}": str(i) for i in range(0, 8)}, delay=0.05) as server:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                texts = list(executor.map(lambda i: self.session.get_text(server.url(f"/page-{i}")), range(0, 8)))
+        assert texts == [str(i) for i in range(0, 8)]
+        assert server.max_concurrent_requests == 2
+        assert self.session.get_metrics()["connections"] == 2
+
+    def test_errors_are_raised_as_urllib(self):
+        with StubHttpServer({"/busy": [503]}) as server:
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                self.session.get(server.url("/busy"))
+            assert self.session.request("GET", server.url("/missing")).status == 404
+        assert context.exception.code == 503
+        metrics = self.session.get_metrics()
+        assert metrics["errors"] == 1
+        assert metrics["connections"] == 1
+
+    def test_closed_connection_is_replaced(self):
+        with StubHttpServer({"/page": "hello"}) as server:
+            assert self.session.get_text(server.url("/page")) == "hello"
+            for connections in self.session.idle_connections.values():
+                for connection in connections:
+                    connection.sock.shutdown(socket.SHUT_RDWR)
+            assert self.session.get_text(server.url("/page")) == "hello"
+        assert self.session.get_metrics()["connections"] == 2
+
+    def test_download(self):
+        with StubHttpServer({"/file": "x" * 1000}) as server, tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "file")
+            progress = []
+            self.session.download(server.url("/file"), file_name, on_progress=lambda *p: progress.append(p))
+            with open(file_name) as file:
+                assert file.read() == "x" * 1000
+        assert progress == [(1000, 1000)]
@@ -0,0 +1,27 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from file_capabilities.midi_file import MidiFile
+
+
+class TestMidiFile(TestCase):
+    def test_module_round_trip(self):
+        midi_file = MidiFile.from_module({"name": "C scale", "play_notes": "C3-D3--E3"}, tempo=120, sig_up=3)
+        for midi_type in [0, 1]:
+            read = MidiFile.from_bytes(midi_file.to_bytes(midi_type))
+            assert (read.tempo, read.sig_up, read.sig_down, read.name) == (120, 3, 4, "C scale")
+            assert [n[0] for n in read.notes] == [36, 38, 40]
+            assert [n[1] for n in read.notes] == [0.0, 0.5, 1.5]
+            assert read.to_module()["play_notes"] == "C3-D3-E3"
+
+    def test_convert_folder(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            written = list(MidiFile.convert_folder("learning modules/intervals", os.path.join(tmp_dir, "mid")))
+            assert written and all(name.endswith(".mid") for name in written)
+            modules = list(MidiFile.convert_folder(os.path.join(tmp_dir, "mid"), os.path.join(tmp_dir, "json")))
+            assert len(modules) == len(written)
+
+    def test_not_a_midi_file(self):
+        with self.assertRaises(ValueError):
+            MidiFile.from_bytes(b"RIFF0000")
@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+from learning.module_generator import ModuleGenerator
+from learning.pitch import Pitch
+
+
+class TestModuleGenerator(TestCase):
+    def setUp(self):
+        self.module_generator = ModuleGenerator()
+
+    def _play_notes(self, category: str, root_note: str, name: str) -> str:
+        return self.module_generator.get_module(ModuleGenerator.get_path(category, root_note), name)["play_notes"]
+
+    def test_triads(self):
+        assert self._play_notes("chords", "D", "D chord") == "D3-F#3-A3"
+        assert self._play_notes("chords", "D", "Dm chord") == "D3-F3-A3"
+        assert self._play_notes("chords/inversions", "D", "D chord2") == "F#3-A3-D4"
+        assert self._play_notes("chords/inversions", "D", "D chord3") == "A3-D4-F#4"
+
+    def test_inversions_of_extended_chords_stay_within_the_chord_span(self):
+        assert self._play_notes("chords/inversions", "D", "D69 chord2") == "F#3-A3-B3-D4-E4"
+        assert self._play_notes("chords/inversions", "D", "D69 chord3") == "A3-B3-D4-E4-F#4"
+        for module in ModuleGenerator.generate("chords/inversions", "C"):
+            pitches = Pitch.from_play_notes(module["play_notes"])
+            assert pitches == sorted(pitches), module
+            root_position = Pitch.from_play_notes(self._play_notes("chords", "C", module["name"][:-1]))
+            # within an octave, or the span of the extended chords
+            assert pitches[-1] - pitches[0] <= max(12, root_position[-1] - root_position[0]), module
+
+    def test_intervals_and_scales(self):
+        assert self._play_notes("intervals", "A", "A 5th") == "A3-E4"
+        assert self._play_notes("scales", "C", "C natural major scale") == "C3-D3-E3-F3-G3-A3-B3-C4"
+
+    def test_unknown_module(self):
+        with self.assertRaises(ValueError):
+            self.module_generator.get_module(ModuleGenerator.get_path("chords", "C"), "C chord9")
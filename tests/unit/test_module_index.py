@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+from learning.module_index import ModuleIndex
+from learning.pitch import Pitch
+
+
+class TestModuleIndex(TestCase):
+    def setUp(self):
+        self.index = ModuleIndex()
+        self.index.add_module(0, {"name": "C chord", "play_notes": "C3-E3-G3"}, "chords")
+        self.index.add_module(1, {"name": "D chord", "play_notes": "D4-F#4-A4"}, "chords")
+        self.index.add_module(2, {"name": "5th", "play_notes": "C3-G3"}, "intervals")
+        self.index.add_module(3, {"name": "C scale2", "play_notes": "C3-D3-E3-F3-G3-A3-B3-A4-G4-F4-E4-D4-C4"},
+                              "scales")
+
+    def test_pitch(self):
+        assert Pitch.from_note("C0") == 0
+        assert Pitch.from_note("Bb3") == Pitch.from_note("A#3") == 46
+        assert Pitch.to_note(Pitch.from_note("F#4")) == "F#4"
+
+    def test_search_name(self):
+        assert self.index.search_name("chord") == {0, 1}
+        assert self.index.search_name("C sc") == {3}
+        assert self.index.search_name("xyz") == set()
+
+    def test_find_playable(self):
+        low, high = Pitch.from_note("C3"), Pitch.from_note("B3")
+        assert self.index.find_playable(low, high) == {0, 2}
+        assert self.index.find_playable(low, high, with_transposition=True) == {0, 1, 2}
+        assert self.index.find_overlapping(Pitch.from_note("A4"), Pitch.from_note("B9")) == {1, 3}
+
+    def test_find_by_interval(self):
+        assert self.index.find_by_interval(7) == {0, 1, 2, 3}
+        assert self.index.find_by_interval(7, melodic=True) == {2}
+        assert self.index.find_by_pitch_class_set(["G", "B", "D"]) == {0, 1}
+
+    def test_query(self):
+        low, high = Pitch.from_note("C3"), Pitch.from_note("B3")
+        assert self.index.query("chord", low, high) == {0}
+        assert self.index.query("", interval=4) == {0, 1, 3}
@@ -0,0 +1,107 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from learning.module_path_view import ModulePathView
+
+
+class ScrollingCanvas:
+    """
+    the items & the horizontal scrolling of a Canvas, without a display
+    """
+
+    def __init__(self, parent, width: int = 0, height: int = 0, **options):
+        self.width = width
+        self.items = {}
+        self.left = 0.0
+        self.scrollregion = (0, 0, width, height)
+        self.xscrollcommand = None
+
+    def _create(self, kind: str, options: dict) -> int:
+        item_id = len(self.items) + 1
+        self.items[item_id] = dict(options, kind=kind)
+        return item_id
+
+    def create_line(self, *coords, **options) -> int:
+        return self._create("line", options)
+
+    def create_oval(self, *coords, **options) -> int:
+        return self._create("oval", options)
+
+    def create_text(self, *coords, **options) -> int:
+        return self._create("text", options)
+
+    def create_image(self, *coords, **options) -> int:
+        return self._create("image", options)
+
+    def coords(self, item_id: int, *coords):
+        pass
+
+    def itemconfigure(self, item_id: int, **options):
+        self.items[item_id].update(options)
+
+    def configure(self, xscrollcommand=None, scrollregion=None, **options):
+        self.xscrollcommand = xscrollcommand or self.xscrollcommand
+        self.scrollregion = scrollregion or self.scrollregion
+
+    def canvasx(self, x: float) -> float:
+        return self.left + x
+
+    def xview(self, *args):
+        pass
+
+    def xview_moveto(self, fraction: float):
+        self.left = fraction * self.scrollregion[2]
+        if self.xscrollcommand:
+            self.xscrollcommand(str(fraction), str(fraction + self.width / self.scrollregion[2]))
+
+    def count(self, kind: str) -> int:
+        return len([item for item in self.items.values() if item["kind"] == kind])
+
+
+class StaticScrollbar:
+    def __init__(self, parent, **options):
+        pass
+
+    def set(self, first: str, last: str):
+        pass
+
+
+class TestModulePathView(TestCase):
+    def setUp(self):
+        with patch("learning.module_path_view.Canvas", ScrollingCanvas), \
+                patch("learning.module_path_view.Scrollbar", StaticScrollbar):
+            self.view = ModulePathView(None, width=500, height=100)
+        self.canvas = self.view.canvas
+
+    def test_only_the_visible_steps_own_items(self):
+        self.view.set_steps([f"C{step % 8}" for step in range(100)])
+        # (500 - MARGIN_W) // STEP_WIDTH steps are visible, plus one step on each side
+        assert self.view._visible_range() == (0, 13)
+        assert sorted(self.view.visible_items.keys()) == list(range(0, 14))
+        assert self.canvas.count("oval") == 14
+
+    def test_items_are_recycled_when_scrolling(self):
+        self.view.set_steps([f"C{step % 8}" for step in range(100)])
+        self.view.see(60)
+        first, last = self.view._visible_range()
+        assert first < 60 < last
+        assert sorted(self.view.visible_items.keys()) == list(range(first, last + 1))
+        assert self.canvas.count("oval") == last - first + 1
+        oval_id, text_id = self.view.visible_items[60]
+        assert self.canvas.items[text_id]["text"] == "C4"
+
+    def test_aspect_of_a_hidden_step_is_applied_when_it_is_scrolled_in(self):
+        self.view.set_steps([f"C{step % 8}" for step in range(100)])
+        self.view.set_step_aspect(80, "#00FF00")
+        assert 80 not in self.view.visible_items
+        self.view.see(80)
+        oval_id, text_id = self.view.visible_items[80]
+        assert self.canvas.items[oval_id]["fill"] == "#00FF00"
+
+    def test_shorter_module_recycles_the_items_past_its_end(self):
+        self.view.set_steps([f"C{step % 8}" for step in range(100)])
+        self.view.set_steps(["C3", "E3", "G3"])
+        assert sorted(self.view.visible_items.keys()) == [0, 1, 2]
+        assert len(self.view.free_items) == 11
+        assert [self.canvas.items[text_id]["text"] for _, text_id in self.view.visible_items.values()] == \
+               ["C3", "E3", "G3"]
@@ -0,0 +1,31 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from note_recorder.note_event_log import NoteEventLog
+
+
+class TestNoteEventLog(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.tmp_dir.name, "song.notes")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_notes_are_written_by_chunks(self):
+        log = NoteEventLog(self.file_name, chunk_size=3)
+        for i in range(0, 10):
+            log.note_on(36 + i % 2, float(i))
+            log.note_on(36 + i % 2, i + 0.5)
+        log.note_off(10.0)
+        log.note_on(40, 11.0)
+        closed = []
+        log.close(12.0, on_closed=closed.append)
+        log.join()
+        assert closed == [log]
+        events = NoteEventLog.read(self.file_name)
+        assert len(events) == log.nb_events == 11
+        assert events["pitch"].tolist()[:3] == [36, 37, 36]
+        assert events["duration"].tolist() == [1.0] * 11
+        assert [len(c) for c in NoteEventLog.iter_chunks(self.file_name, chunk_size=4)] == [4, 4, 3]
@@ -0,0 +1,75 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from instrument.note_grid import NoteGrid
+
+
+class RecordingCanvas:
+    """
+    the items of a Canvas & their reconfigurations, without a display
+    """
+
+    def __init__(self, parent, width: int = 0, height: int = 0, **options):
+        self.width = width
+        self.height = height
+        self.items = {}
+        self.calls = []
+
+    def _create(self, kind: str, coords: tuple, options: dict) -> int:
+        item_id = len(self.items) + 1
+        self.items[item_id] = dict(options, kind=kind, coords=coords)
+        return item_id
+
+    def create_rectangle(self, *coords, **options) -> int:
+        return self._create("rectangle", coords, options)
+
+    def create_text(self, *coords, **options) -> int:
+        return self._create("text", coords, options)
+
+    def bind(self, sequence: str, callback):
+        pass
+
+    def itemconfigure(self, item_id: int, **options):
+        self.items[item_id].update(options)
+        self.calls.append(item_id)
+
+
+class TestNoteGrid(TestCase):
+    def setUp(self):
+        with patch("instrument.note_grid.Canvas", RecordingCanvas):
+            self.grid = NoteGrid(None, 3, "#FFFFFF")
+        self.canvas = self.grid.canvas
+
+    def test_layout(self):
+        # one column per octave, one row per note
+        assert self.canvas.width == 3 * (NoteGrid.CELL_WIDTH + NoteGrid.PADDING) + NoteGrid.PADDING
+        assert self.canvas.height == 12 * (NoteGrid.CELL_HEIGHT + NoteGrid.PADDING) + NoteGrid.PADDING
+        assert len(self.grid.rect_ids) == len(self.grid.text_ids) == 36
+        assert self.grid._cell_origin(0) == (NoteGrid.PADDING, NoteGrid.PADDING)
+        assert self.grid._cell_origin(13) == (NoteGrid.PADDING + NoteGrid.CELL_WIDTH + NoteGrid.PADDING,
+                                              NoteGrid.PADDING + NoteGrid.CELL_HEIGHT + NoteGrid.PADDING)
+        assert self.canvas.items[self.grid.rect_ids[13]]["coords"][:2] == self.grid._cell_origin(13)
+        assert self.canvas.items[self.grid.text_ids[13]]["text"] == "C#1"
+
+    def test_find_pitch(self):
+        for pitch in (0, 11, 13, 35):
+            nw_x, nw_y = self.grid._cell_origin(pitch)
+            assert self.grid.find_pitch(nw_x + 1, nw_y + 1) == pitch
+            assert self.grid.find_pitch(nw_x + NoteGrid.CELL_WIDTH, nw_y + NoteGrid.CELL_HEIGHT) == pitch
+        # between the cells & outside the grid
+        nw_x, nw_y = self.grid._cell_origin(13)
+        assert self.grid.find_pitch(nw_x - 1, nw_y + 1) is None
+        assert self.grid.find_pitch(nw_x + 1, nw_y - 1) is None
+        assert self.grid.find_pitch(self.canvas.width, nw_y) is None
+
+    def test_only_changed_cells_are_reconfigured(self):
+        self.grid.set_range(12, 23, "#00FF00", "#FFFFFF")
+        assert self.grid.flush() == 12
+        assert sorted(self.canvas.calls) == sorted(self.grid.rect_ids[12:24])
+        self.grid.set_cell(12, "#00FF00", "do")
+        self.grid.set_cell(99, "#00FF00")
+        assert self.grid.flush() == 1
+        assert self.canvas.items[self.grid.text_ids[12]]["text"] == "do"
+        self.grid.set_range(12, 23, "#00FF00", "#FFFFFF", reset_texts=True)
+        assert self.grid.flush() == 1
+        assert self.grid.flush() == 0
@@ -0,0 +1,23 @@
+from unittest import TestCase
+
+from learning.pitch import Pitch
+
+
+class TestPitch(TestCase):
+    def test_from_note(self):
+        assert Pitch.from_note("C0") == 0
+        assert Pitch.from_note("A4") == Pitch.A4
+        assert Pitch.from_note("A#2") == Pitch.from_note("Bb2") == 34
+        assert Pitch.from_note("B9") == Pitch.HIGHEST_PITCH
+        with self.assertRaises(ValueError):
+            Pitch.from_note("C")
+
+    def test_accidentals_across_the_octave(self):
+        assert Pitch.from_note("Cb4") == Pitch.from_note("B3") == 47
+        assert Pitch.from_note("B#3") == Pitch.from_note("C4") == 48
+        assert Pitch.from_note("Fb4") == Pitch.from_note("E4")
+        assert Pitch.from_note("E#4") == Pitch.from_note("F4")
+
+    def test_to_note(self):
+        for pitch in (0, 34, 47, 48, Pitch.HIGHEST_PITCH):
+            assert Pitch.from_note(Pitch.to_note(pitch)) == pitch
@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+import numpy as np
+
+from audio.pitch_contour import PitchContour
+
+
+class TestPitchContour(TestCase):
+    def test_growth_and_views(self):
+        contour = PitchContour(capacity=2)
+        for i in range(0, 1000):
+            contour.append(440.0 if i % 10 else 0.0, 440.0, 0.9, hop_time=float(i))
+        assert len(contour) == 1000
+        assert np.isnan(contour.get_column("frequency")[0])
+        assert contour.get_column("cents")[1] == 0.0
+        view = contour.get_view(max_points=100)
+        assert len(view["time"]) == 100
+        assert view["time"].base is not None
+        view = contour.get_view(start_time=100.0, end_time=199.0)
+        assert view["time"][0] == 100.0 and view["time"][-1] == 199.0
+
+    def test_intonation(self):
+        contour = PitchContour()
+        assert contour.get_intonation() == (0.0, 0.0)
+        contour.append(440.0 * 2 ** (10 / 1200), 440.0, 0.9)
+        contour.append(440.0 * 2 ** (30 / 1200), 440.0, 0.9)
+        contour.append(460.0, 440.0, 0.1)
+        mean, deviation = contour.get_intonation()
+        assert round(mean, 3) == 20.0 and round(deviation, 3) == 10.0
+
+    @staticmethod
+    def harmonic_product_spectrum(samples: np.ndarray, num_hps: int = 5) -> np.ndarray:
+        """
+        the HPS of MicAnalyzer.callback() without its noise gates
+        """
+        magnitude_spec = abs(np.fft.fft(samples * np.hanning(len(samples)))[:len(samples) // 2])
+        magnitude_spec[:62] = 0
+        mag_spec_ipol = np.interp(np.arange(0, len(magnitude_spec), 1 / num_hps), np.arange(0, len(magnitude_spec)),
+                                  magnitude_spec)
+        mag_spec_ipol = mag_spec_ipol / np.linalg.norm(mag_spec_ipol, ord=2)
+        hps_spec = mag_spec_ipol.copy()
+        for i in range(num_hps):
+            tmp_hps_spec = np.multiply(hps_spec[:int(np.ceil(len(mag_spec_ipol) / (i + 1)))], mag_spec_ipol[::(i + 1)])
+            if not any(tmp_hps_spec):
+                break
+            hps_spec = tmp_hps_spec
+        return hps_spec
+
+    def test_peak_confidence_of_synthetic_tones(self):
+        # 1 s at 48 kHz, as MicAnalyzer
+        t = np.arange(0, 48000) / 48000
+        tones = {"sine": np.sin(2 * np.pi * 220 * t),
+                 "harmonics": sum(np.sin(2 * np.pi * 220 * k * t) / k for k in range(1, 8))}
+        contour = PitchContour()
+        for samples in tones.values():
+            hps_spec = self.harmonic_product_spectrum(samples)
+            peak = int(np.argmax(hps_spec))
+            assert peak / 5 == 220.0
+            confidence = PitchContour.get_peak_confidence(hps_spec, peak, 10)
+            assert confidence > 0.9
+            contour.append(220.0 * 2 ** (10 / 1200), 220.0, confidence)
+        for seed in range(10):
+            noise = np.random.default_rng(seed).standard_normal(48000)
+            hps_spec = self.harmonic_product_spectrum(noise)
+            assert PitchContour.get_peak_confidence(hps_spec, int(np.argmax(hps_spec)), 10) < 0.1
+        # the voiced hops of clean tones count in the intonation
+        assert round(contour.get_intonation()[0], 3) == 10.0
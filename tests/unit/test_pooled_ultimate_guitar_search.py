@@ -0,0 +1,42 @@
+import threading
+from unittest import TestCase
+
+from pyharmonytools.harmony.circle_of_5th import CircleOf5th
+from pyharmonytools.song.ultimate_guitar_song import UltimateGuitarSong
+
+from tests.testing_framework.stub_http_server import ug_song_page
+from ultimate_guitar.pooled_ultimate_guitar_search import PooledUltimateGuitarSearch
+from ultimate_guitar.song_cache import SongCache
+from ultimate_guitar.song_fetcher import SongFetcher
+
+
+class TestPooledUltimateGuitarSearch(TestCase):
+    def setUp(self):
+        self.song_cache = SongCache(":memory:", offline=True)
+        song = UltimateGuitarSong()
+        song.digest(ug_song_page("The Beatles", "Let It Be", [("C G Am", "When I find myself"), ("F C", "Mother")]))
+        song.url = "https://ug/let-it-be"
+        self.song_cache.put_song(song)
+        self.song_fetcher = SongFetcher(song_cache=self.song_cache)
+        self.engine = PooledUltimateGuitarSearch(song_fetcher=self.song_fetcher)
+
+    def tearDown(self):
+        self.song_fetcher.shutdown()
+        self.song_cache.close()
+
+    def test_progression_at_the_end_of_the_song_matches(self):
+        site = " site:ultimate-guitar.com"
+        assert self.engine.check_matches_exactly("C G Am " + site, "https://ug/let-it-be")
+        assert self.engine.check_matches_exactly("F C " + site, "https://ug/let-it-be")
+        assert not self.engine.check_matches_exactly("C G A " + site, "https://ug/let-it-be")
+
+    def test_cancelled_search_sends_no_google_query(self):
+        cancelled = threading.Event()
+        cancelled.set()
+        with self.assertRaises(InterruptedError):
+            self.engine.search("C G Am ", 5, cancelled=cancelled)
+        with self.assertRaises(InterruptedError):
+            self.engine.search_songs_from_cadence("I-V-vi", CircleOf5th.cof_factory("Natural Major - triads"), 5,
+                                                  matches_exactly=True, cancelled=cancelled)
+        # the next searches of this thread are not cancelled
+        assert self.engine.running_searches.cancelled is None
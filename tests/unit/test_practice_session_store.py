@@ -0,0 +1,42 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from learning.practice_session_store import PracticeSessionStore
+
+
+class TestPracticeSessionStore(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = PracticeSessionStore(os.path.join(self.tmp_dir.name, "sessions.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_module_progress(self):
+        for accuracy in [20.0, 50.0, 100.0]:
+            attempt_id = self.store.start_attempt("C chord", "C3-E3-G3", "VoiceTraining")
+            self.store.end_attempt(attempt_id, accuracy, accuracy == 100.0)
+        self.store.start_attempt("C chord", "C3-E3-G3", "VoiceTraining")
+        self.store.flush()
+        progress = self.store.get_module_progress("C chord")
+        assert [p[1] for p in progress] == [20.0, 50.0, 100.0]
+        assert [p[2] for p in progress] == [0, 0, 1]
+        assert self.store.get_module_progress("D chord") == []
+
+    def test_weakest_notes(self):
+        attempt_id = self.store.start_attempt("C chord", "C3-E3-G3", "VoiceTraining")
+        self.store.record_note(attempt_id, "C3", 36, 0, 36, True, 99.0, 0.0)
+        self.store.record_note(attempt_id, "F3", 41, 1, 40, False, 90.0)
+        self.store.record_note(attempt_id, "E3", 40, 1, 40, True, 95.0, 0.2)
+        self.store.record_note(attempt_id, "G3", 43, 2, 43, True, 97.0, 0.1)
+        self.store.end_attempt(attempt_id, 75.0, True)
+        self.store.record_note(attempt_id, "A3", 45)
+        self.store.flush()
+        assert len(self.store.get_attempt_notes(attempt_id)) == 4
+        weakest = self.store.get_weakest_notes("VoiceTraining", limit=2)
+        assert weakest[0][:3] == (40, 2, 50.0)
+        assert weakest[0][3] == 92.5
+        assert len(weakest) == 2
+        assert self.store.get_weakest_notes("GuitarTraining") == []
@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+from pyharmonytools.song.ultimate_guitar_song import UltimateGuitarSong
+
+from ultimate_guitar.progression_index import ProgressionIndex
+from ultimate_guitar.song_cache import SongCache
+
+
+class TestProgressionIndex(TestCase):
+    def setUp(self):
+        self.index = ProgressionIndex(max_n=3)
+        self.index.add("u1", "The Beatles", "Let It Be", ["C", "G", "Am", "F", "C", "G", "F", "C"])
+        self.index.add("u2", "Oasis", "Wonderwall", ["Em7", "G", "Dsus4", "A7sus4"])
+        self.index.add("u3", "Somebody", "In D", ["D", "A", "Bm", "G", "x"])
+        self.index.add("u4", "Jazz", "Standard", ["Dm7", "G7", "Cmaj7", "Em7", "A7", "Dm7", "G7", "Cmaj"])
+
+    def test_normalize_chord(self):
+        assert ProgressionIndex.normalize_chord("Dbmaj7/F") == (1, "maj7")
+        assert ProgressionIndex.normalize_chord("C#maj7") == (1, "maj7")
+        assert ProgressionIndex.normalize_chord("Amin") == (9, "m")
+        assert ProgressionIndex.normalize_chord("N.C.") is None
+
+    def test_search_chords(self):
+        assert [r[0] for r in self.index.search_chords(["G", "Am", "F"])] == ["u1"]
+        assert [r[0] for r in self.index.search_chords(["G"])] == ["u1", "u2", "u3"]
+        assert [r[0] for r in self.index.search_chords(["G"], limit=2)] == ["u1", "u2"]
+        # longer than the n-grams: the whole sequence is checked
+        assert [r[0] for r in self.index.search_chords(["C", "G", "Am", "F", "C"])] == ["u1"]
+        assert self.index.search_chords(["C", "G", "Am", "F", "G"]) == []
+        assert self.index.search_chords(["Ab", "Bb"]) == []
+
+    def test_search_degrees_in_every_key(self):
+        results = self.index.search_degrees(["C", "G", "Am", "F"])
+        assert [(r[0], r[3]) for r in results] == [("u1", "C G Am F"), ("u3", "D A Bm G")]
+        assert [r[3] for r in self.index.search_degrees(["Dm7", "G7", "Cmaj"])] == ["Dm7 G7 Cmaj"]
+
+    def test_songs_are_indexed_once(self):
+        assert not self.index.add("u1", "The Beatles", "Let It Be", ["C"])
+        assert len(self.index) == 4
+
+    def test_index_is_built_from_the_cache(self):
+        cache = SongCache(":memory:")
+        for i in range(0, 5):
+            song = UltimateGuitarSong()
+            song.url, song.artist, song.song_title, song.chords_sequence = f"u{i}", "A", f"S{i}", ["C", "F", "G"]
+            cache.put_song(song)
+        index = ProgressionIndex()
+        assert index.add_cache(cache) == 5
+        assert len(index.search_degrees(["D", "G", "A"])) == 5
@@ -0,0 +1,86 @@
+import random
+import time
+from unittest import TestCase
+
+from ultimate_guitar.progression_index import ProgressionIndex
+from ultimate_guitar.progression_similarity import ProgressionSimilarity
+
+
+class TestProgressionSimilarity(TestCase):
+    def setUp(self):
+        self.index = ProgressionIndex()
+        self.index.add("u1", "The Beatles", "Let It Be", ["C", "G", "Am", "F", "C", "G", "F", "C"])
+        self.index.add("u2", "Somebody", "In D", ["D", "A", "Bm", "G"])
+        self.index.add("u3", "Jazz", "Standard", ["Dm7", "G7", "Cmaj7", "A7"])
+        self.index.add("u4", "Blues", "Twelve bars", ["E7", "A7", "E7", "B7"])
+        self.similarity = ProgressionSimilarity(self.index, max_distance=2)
+
+    def test_distance_is_transposition_invariant(self):
+        c_major = (ProgressionIndex.normalize_chord("C"), ProgressionIndex.normalize_chord("G"))
+        e_major = (ProgressionIndex.normalize_chord("E"), ProgressionIndex.normalize_chord("B"))
+        e_minor = (ProgressionIndex.normalize_chord("Em"), ProgressionIndex.normalize_chord("B"))
+        transpositions = [ProgressionSimilarity.transpose(c_major, i) for i in range(0, 12)]
+        assert ProgressionSimilarity.distance(transpositions, e_major) == 0
+        assert ProgressionSimilarity.distance(transpositions, e_minor) == 1
+        assert ProgressionSimilarity.edit_distance(c_major, c_major[:1]) == 1
+
+    def test_closest_songs_first(self):
+        results = self.similarity.search(["C", "G", "Am", "F"], k=10, max_distance=1)
+        assert [(r[0], r[3], r[4]) for r in results] == [("u1", "C G Am F", 0), ("u2", "D A Bm G", 0)]
+        results = self.similarity.search(["C", "G", "Am", "Dm"], k=10, max_distance=1)
+        assert [(r[0], r[4], r[5]) for r in results] == [("u1", 1, 0.75), ("u2", 1, 0.75)]
+        assert self.similarity.search(["C", "G", "Am", "Dm"], k=10, max_distance=0) == []
+
+    def test_chords_inserted_or_deleted(self):
+        self.index.add("u5", "Pop", "Inserted", ["F", "A", "Em", "C", "G"])
+        self.index.add("u6", "Pop", "Deleted", ["F", "A", "G"])
+        results = self.similarity.search(["F", "A", "C", "G"], k=10, max_distance=1)
+        found = {r[0]: (r[3], r[4]) for r in results}
+        assert found["u5"] == ("F A Em C G", 1) and found["u6"] == ("F A G", 1)
+        assert found["u1"] == ("F C G", 1)  # Let It Be without the A
+
+    def test_radius_grows_until_k_songs(self):
+        results = self.similarity.search(["Em7", "A7", "Dmaj7"], k=1, max_distance=2)
+        assert [(r[0], r[4]) for r in results] == [("u3", 0)]
+        results = self.similarity.search(["Em7", "A7", "Dmaj7"], k=2, max_distance=2)
+        assert [r[0] for r in results] == ["u3", "u4"]
+
+    def test_new_songs_are_added_to_the_trees(self):
+        assert len(self.similarity.search(["Bm", "E", "A"], max_distance=0)) == 0
+        self.index.add("u5", "Pop", "Song", ["F#m", "Bm", "E", "A"])
+        assert [r[0] for r in self.similarity.search(["Bm", "E", "A"], max_distance=0)] == ["u5"]
+
+    def test_new_songs_are_indexed_by_the_warm_up(self):
+        self.similarity.warm_up(lengths=[3])
+        self.similarity.warm_up_thread.join()
+        assert self.similarity.nb_indexed_songs == {3: 4}
+        self.index.add("u5", "Pop", "Song", ["F#m", "Bm", "E", "A"])
+        assert [r[0] for r in self.similarity.search(["Bm", "E", "A"], max_distance=0)] == ["u5"]
+        assert self.similarity.nb_indexed_songs == {3: 5}
+
+    def test_max_distance_over_the_indexed_edits(self):
+        with self.assertRaises(ValueError):
+            ProgressionSimilarity(self.index).search(["C", "G", "Am"], max_distance=2)
+
+    def test_latency_on_a_large_corpus(self):
+        rng = random.Random(1)
+        degrees = [(0, ""), (5, ""), (7, ""), (9, "m"), (2, "m"), (4, "m"), (7, "7"), (10, ""), (0, "maj7"),
+                   (2, "m7"), (11, "dim"), (7, "sus4")]
+        roots = ["C", "C#", "D", "Eb", "E", "F", "F#", "G", "Ab", "A", "Bb", "B"]
+        index = ProgressionIndex()
+        for song_id in range(0, 2000):
+            key = rng.randrange(0, 12)
+            sections = [rng.choices(degrees, k=rng.choice([4, 8])) for _ in range(0, 3)]
+            chords = [roots[(key + degree) % 12] + quality for _ in range(0, 4)
+                      for degree, quality in rng.choice(sections)]
+            index.add(f"u{song_id}", "Artist", f"Song {song_id}", chords)
+        similarity = ProgressionSimilarity(index)
+        start = time.perf_counter()
+        similarity.warm_up(lengths=range(2, 7))
+        similarity.warm_up_thread.join()
+        assert time.perf_counter() - start < 20
+        for query in (["C", "F", "G"], ["C", "G", "Am", "F"], ["C", "Am", "F", "G", "C"]):
+            start = time.perf_counter()
+            results = similarity.search(query, k=500, max_distance=1)
+            assert time.perf_counter() - start < 0.2, query
+            assert results and [r[4] for r in results] == sorted(r[4] for r in results)
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import wave
+from unittest import TestCase
+
+import numpy as np
+
+from audio.raw_audio_recorder import RawAudioRecorder
+
+
+class TestRawAudioRecorder(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.base_file_name = os.path.join(self.tmp_dir.name, "session")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_samples_are_written_in_chunks(self):
+        # a buffer per block: nothing is dropped even if the writer thread is late
+        recorder = RawAudioRecorder(self.base_file_name, sample_freq=100, buffer_size=30, nb_buffers=10,
+                                    chunk_seconds=1, use_flac=False)
+        recorder.start()
+        signal = np.sin(np.arange(0, 250) / 10).astype(np.float32)
+        for start in range(0, 250, 25):
+            recorder.tap(signal[start:start + 25, None])
+        recorder.stop()
+        assert not recorder.writer_thread.is_alive()
+        assert recorder.nb_dropped_buffers == 0
+        assert recorder.nb_samples == 250
+        assert [os.path.basename(f) for f in recorder.chunk_files] == ["session_0000.wav", "session_0001.wav",
+                                                                       "session_0002.wav"]
+        samples = []
+        for file_name in recorder.chunk_files:
+            with wave.open(file_name, "rb") as chunk:
+                assert chunk.getframerate() == 100
+                samples.append(np.frombuffer(chunk.readframes(chunk.getnframes()), dtype="<i2"))
+        assert [len(s) for s in samples] == [100, 100, 50]
+        assert np.abs(np.concatenate(samples) / 32767 - signal).max() < 1e-3
+
+    def test_tap_drops_buffers_when_the_pool_is_empty(self):
+        recorder = RawAudioRecorder(self.base_file_name, sample_freq=100, buffer_size=10, nb_buffers=2,
+                                    use_flac=False)
+        recorder.is_recording = True  # no writer thread: the pool is never refilled
+        for _ in range(0, 5):
+            recorder.tap(np.zeros((10, 1), dtype=np.float32))
+        assert recorder.nb_dropped_buffers == 3
+        assert recorder.filled_buffers.qsize() == 2
+
+    def test_large_blocks_are_split_across_buffers(self):
+        recorder = RawAudioRecorder(self.base_file_name, sample_freq=100, buffer_size=10, nb_buffers=2,
+                                    use_flac=False)
+        recorder.is_recording = True  # no writer thread: the pool is never refilled
+        recorder.tap(np.arange(0, 25, dtype=np.float32)[:, None])
+        assert recorder.nb_dropped_buffers == 1
+        buffer, length = recorder.filled_buffers.get_nowait()
+        assert length == 10 and buffer[0] == 0
+        buffer, length = recorder.filled_buffers.get_nowait()
+        assert length == 10 and buffer[0] == 10
+        assert recorder.filled_buffers.empty()
+
+    def test_large_blocks_are_written_whole(self):
+        recorder = RawAudioRecorder(self.base_file_name, sample_freq=100, buffer_size=10, nb_buffers=4,
+                                    use_flac=False)
+        recorder.start()
+        signal = np.sin(np.arange(0, 35) / 10).astype(np.float32)
+        recorder.tap(signal[:, None])
+        recorder.stop()
+        assert recorder.nb_dropped_buffers == 0
+        assert recorder.nb_samples == 35
+        with wave.open(recorder.chunk_files[0], "rb") as chunk:
+            samples = np.frombuffer(chunk.readframes(chunk.getnframes()), dtype="<i2")
+        assert np.abs(samples / 32767 - signal).max() < 1e-3
@@ -0,0 +1,78 @@
+from unittest import TestCase
+
+from learning.pitch import Pitch
+from learning.score_follower import ScoreFollower
+
+
+class TestScoreFollower(TestCase):
+    def setUp(self):
+        self.follower = ScoreFollower(Pitch.from_play_notes("C3-D3-E3-F3-G3-A3-B3"), step_duration=1.0)
+
+    def play(self, notes: [str], start: float = 0.0, step: float = 1.0) -> [dict]:
+        res = []
+        for i, n in enumerate(notes):
+            res.append(self.follower.feed_note(n, start + i * step))
+        return res
+
+    def test_exact_performance(self):
+        statuses = self.play(["C3", "D3", "E3", "F3", "G3", "A3", "B3"])
+        assert [s["position"] for s in statuses] == list(range(0, 7))
+        assert all(s["matched"] for s in statuses)
+        assert self.follower.is_finished()
+        assert self.follower.get_accuracy() == 100
+
+    def test_held_note(self):
+        assert self.follower.feed_note("C3", 0.0)["position"] == 0
+        assert self.follower.feed_note("C3", 0.1) is None
+        self.follower.feed_silence()
+        assert self.follower.feed_note("C3", 0.5)["extra"]
+
+    def test_skipped_note(self):
+        statuses = self.play(["C3", "D3", "F3", "G3"])
+        assert statuses[2]["position"] == 3
+        assert statuses[2]["skipped_steps"] == [2]
+        assert statuses[3]["position"] == 4
+
+    def test_extra_note(self):
+        statuses = self.play(["C3", "D3", "G#5", "E3", "F3"])
+        assert not statuses[2]["matched"]
+        assert statuses[3]["position"] == 2 and statuses[3]["matched"]
+        assert statuses[4]["position"] == 3
+
+    def test_noise_before_the_1st_note(self):
+        statuses = self.play(["A5", "C3", "D3", "E3", "F3", "G3", "A3", "B3"])
+        assert statuses[0]["extra"] and statuses[0]["position"] == ScoreFollower.START
+        assert statuses[1]["position"] == 0 and statuses[1]["matched"]
+        assert not any(s["skipped_steps"] for s in statuses)
+        assert self.follower.get_accuracy() == 100 * 7 / 8
+
+    def test_replayed_steps_are_matched_once(self):
+        self.play(["C3", "D3", "C3", "D3", "E3", "F3", "G3"])
+        assert self.follower.nb_matched == 5
+        assert self.follower.get_accuracy() < 100
+
+    def test_steps_passed_over_are_reported_when_the_alignment_catches_up(self):
+        follower = ScoreFollower(Pitch.from_play_notes("C3-D3-E3-F3-G3-A3-B3-C4"))
+        statuses = [follower.feed_note(n, i) for i, n in enumerate(["C3", "D3", "G3", "A3", "B3", "C4"])]
+        # a jump of 2 steps is not an extra note
+        assert statuses[2]["position"] == 4 and statuses[2]["matched"]
+        assert statuses[2]["skipped_steps"] == [2, 3]
+        assert follower.nb_skipped == 2 and follower.is_finished()
+        follower.reset()
+        statuses = [follower.feed_note(n, i) for i, n in enumerate(["C3", "D3", "A3", "B3", "C4"])]
+        # a jump of 3 steps is confirmed by the next note
+        assert statuses[2]["extra"] and statuses[2]["position"] == 1
+        assert statuses[3]["position"] == 6 and statuses[3]["skipped_steps"] == [2, 3, 4, 5]
+        assert follower.nb_skipped == 4 and follower.is_finished()
+
+    def test_timing_deviation(self):
+        statuses = self.play(["C3", "D3", "E3"], start=10.0, step=1.5)
+        assert statuses[0]["timing_deviation"] == 0
+        assert statuses[2]["timing_deviation"] == 1.0
+
+    def test_long_module(self):
+        pitches = [40 + (i * 7) % 24 for i in range(0, 20000)]
+        follower = ScoreFollower(pitches)
+        for i, p in enumerate(pitches):
+            status = follower.feed(p, i * 0.1)
+        assert status["finished"]
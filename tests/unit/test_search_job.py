@@ -0,0 +1,88 @@
+import threading
+from unittest import TestCase
+
+from ultimate_guitar.search_job import SearchJob
+
+
+class ManualWidget:
+    """
+    after() of a widget whose callbacks are run by run_pending() instead of the Tk main loop
+    """
+
+    def __init__(self):
+        self.callbacks = {}
+        self.next_id = 0
+
+    def after(self, ms: int, callback) -> str:
+        self.next_id += 1
+        self.callbacks[f"after#{self.next_id}"] = callback
+        return f"after#{self.next_id}"
+
+    def after_cancel(self, after_id: str):
+        self.callbacks.pop(after_id, None)
+
+    def run_pending(self):
+        callbacks = list(self.callbacks.values())
+        self.callbacks.clear()
+        for callback in callbacks:
+            callback()
+
+
+class TestSearchJob(TestCase):
+    def setUp(self):
+        self.widget = ManualWidget()
+        self.displayed = []
+        self.progress = []
+        self.done = []
+
+    def _job(self, work) -> SearchJob:
+        return SearchJob(self.widget, work, self.displayed.extend, lambda n, t: self.progress.append((n, t)),
+                         self.done.append)
+
+    def test_results_are_displayed_by_batches(self):
+        def work(job: SearchJob):
+            job.set_total(120)
+            for i in range(0, 119):
+                job.add_result(i)
+            job.add_failure()
+
+        job = self._job(work)
+        job.start()
+        job.thread.join()
+        self.widget.run_pending()
+        assert self.displayed == list(range(0, SearchJob.BATCH_SIZE))
+        while self.widget.callbacks:
+            self.widget.run_pending()
+        assert self.displayed == list(range(0, 119))
+        assert self.progress[-1] == (120, 120)
+        assert self.done == [job] and job.displayed.is_set()
+
+    def test_cancelled_job_displays_nothing_more(self):
+        started = threading.Event()
+
+        def work(job: SearchJob):
+            job.add_result("first")
+            started.set()
+            job.cancelled.wait()
+            job.add_result("late")
+
+        job = self._job(work)
+        job.start()
+        started.wait()
+        self.widget.run_pending()
+        job.cancel()
+        job.thread.join()
+        assert not self.widget.callbacks
+        assert self.displayed == ["first"]
+        assert self.done == []
+
+    def test_errors_are_reported_on_done(self):
+        def work(job: SearchJob):
+            raise ValueError("No more query is accepted")
+
+        job = self._job(work)
+        job.start()
+        job.thread.join()
+        self.widget.run_pending()
+        assert self.done == [job]
+        assert str(job.error) == "No more query is accepted"
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from pyharmonytools.song.ultimate_guitar_song import UltimateGuitarSong
+
+from tests.testing_framework.stub_http_server import StubHttpServer, ug_song_page
+from ultimate_guitar.song_cache import SongCache
+from ultimate_guitar.song_fetcher import SongFetcher
+
+
+class TestSongCache(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_file_name = os.path.join(self.tmp_dir.name, "cache.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def _song(url: str) -> UltimateGuitarSong:
+        song = UltimateGuitarSong()
+        song.digest(ug_song_page("The Beatles", "Let It Be", [("C G Am", "When I find myself"), ("F C", "Mother")]))
+        song.url = url
+        return song
+
+    def test_songs_persist_between_sessions(self):
+        cache = SongCache(self.db_file_name)
+        cache.put_song(self._song("https://ug/let-it-be"))
+        cache.put_search("chords:C G|20", ["https://ug/let-it-be"])
+        cache.close()
+        cache = SongCache(self.db_file_name)
+        song = cache.get_song("https://ug/let-it-be")
+        assert song.artist == "The Beatles" and song.song_title == "Let It Be"
+        assert song.line_of_chords == self._song("").line_of_chords
+        assert [str(c) for c in song.chords_sequence] == ["C", "G", "Am", "F", "C"]
+        assert cache.get_search("chords:C G|20") == ["https://ug/let-it-be"]
+        assert cache.get_song("https://ug/yesterday") is None
+        cache.close()
+
+    def test_expired_entries_are_used_offline_only(self):
+        cache = SongCache(self.db_file_name, search_ttl=0.01)
+        cache.put_search("chords:C G|20", ["https://ug/let-it-be"])
+        time.sleep(0.05)
+        assert cache.get_search("chords:C G|20") is None
+        cache.offline = True
+        assert cache.get_search("chords:C G|20") == ["https://ug/let-it-be"]
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = SongCache(":memory:", max_bytes=200)
+        for i in range(0, 3):
+            cache.put_search(f"q{i}", ["x" * 50])
+        cache.get_search("q0")
+        cache.put_search("q3", ["x" * 50])
+        assert cache.size <= 200
+        assert cache.get_search("q1") is None
+        assert cache.get_search("q0") and cache.get_search("q3")
+
+    def test_fetcher_downloads_each_song_once(self):
+        cache = SongCache(":memory:")
+        fetcher = SongFetcher(min_host_interval=0.0, song_cache=cache)
+        with StubHttpServer({"/tab/1": ug_song_page("A", "B", [("C", "la")])}) as server:
+            for _ in range(0, 3):
+                assert fetcher.fetch_song(server.url("/tab/1")).artist == "A"
+            assert server.requests == ["/tab/1"]
+        cache.offline = True
+        with self.assertRaises(LookupError):
+            fetcher.fetch_song("http://127.0.0.1:1/tab/2")
+        fetcher.shutdown()
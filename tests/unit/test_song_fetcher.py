@@ -0,0 +1,52 @@
+import threading
+import urllib.error
+from unittest import TestCase
+
+from tests.testing_framework.stub_http_server import StubHttpServer, ug_song_page
+from ultimate_guitar.song_fetcher import SongFetcher
+
+
+class TestSongFetcher(TestCase):
+    def setUp(self):
+        self.pages = {f"/tab/song-{i}": ug_song_page(f"Artist {i}", f"Song {i}", [("C G Am", "la la")])
+                      for i in range(0, 6)}
+        self.fetcher = SongFetcher(max_workers=6, max_per_host=2, min_host_interval=0.0, backoff=0.01)
+
+    def tearDown(self):
+        self.fetcher.shutdown()
+
+    def test_songs_are_fetched_concurrently_within_the_host_limit(self):
+        with StubHttpServer(self.pages, delay=0.05) as server:
+            urls = [server.url(path) for path in self.pages]
+            results = list(self.fetcher.fetch(urls + urls[:2]))
+        assert sorted(url for url, _, _ in results) == sorted(urls)
+        assert all(error is None for _, _, error in results)
+        songs = {url: song for url, song, _ in results}
+        assert songs[urls[3]].artist == "Artist 3"
+        assert songs[urls[3]].song_title == "Song 3"
+        assert [str(c) for c in songs[urls[3]].chords_sequence] == ["C", "G", "Am"]
+        assert server.max_concurrent_requests == 2
+        assert len(server.requests) == 6
+
+    def test_failed_requests_are_retried(self):
+        with StubHttpServer({"/tab/busy": [503, 429, self.pages["/tab/song-0"]], "/tab/broken": [503]}) as server:
+            results = {url: (song, error) for url, song, error in
+                       self.fetcher.fetch([server.url("/tab/busy"), server.url("/tab/broken"),
+                                           server.url("/tab/missing")])}
+        song, error = results[server.url("/tab/busy")]
+        assert error is None and song.artist == "Artist 0"
+        assert isinstance(results[server.url("/tab/broken")][1], urllib.error.HTTPError)
+        assert server.requests.count("/tab/broken") == 1 + self.fetcher.max_retries
+        assert server.requests.count("/tab/missing") == 1
+
+    def test_cancelled_fetch_stops_delivering(self):
+        fetcher = SongFetcher(max_workers=1, min_host_interval=0.0)
+        cancelled = threading.Event()
+        with StubHttpServer(self.pages, delay=0.05) as server:
+            delivered = []
+            for url, song, error in fetcher.fetch([server.url(path) for path in self.pages], cancelled):
+                delivered.append(url)
+                cancelled.set()
+            fetcher.shutdown()
+        assert len(delivered) == 1
+        assert len(server.requests) < len(self.pages)
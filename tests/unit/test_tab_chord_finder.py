@@ -0,0 +1,56 @@
+from unittest import TestCase
+
+import numpy as np
+
+from instrument.tab_chord_finder import TabChordFinder
+
+TAB = """Intro
+e|-0-------|-3-----|-0-----|-0-----|
+B|-1-------|-0-----|-1-----|-1-----|
+G|-0-------|-0-----|-2-----|-2-----|
+D|-2-------|-0-----|-2-----|-2-----|
+A|-3-------|-2-----|-0-----|-0-----|
+E|---------|-3-----|-------|-------|
+la la
+e|---------0-|-----|-----|
+B|-------1---|-----|-----|
+G|-----0-----|-----|--7--|
+D|---2-------|--12-|--7--|
+A|-3---------|--10-|--5--|
+E|-----------|-----|-----|
+"""
+
+
+class TestTabChordFinder(TestCase):
+    def setUp(self):
+        self.finder = TabChordFinder()
+
+    def test_templates(self):
+        chroma = np.zeros((3, 12))
+        chroma[0, [0, 4, 7]] = 1  # C E G
+        chroma[1, [0, 4, 7, 9]] = 1  # C E G A, over A
+        chroma[2, [0, 4]] = 1  # C E: ambiguous
+        assert self.finder.match(chroma, np.array([0, 9, 0])) == ["C", "Am7", None]
+        chroma[0] = 0
+        chroma[0, [0, 4, 7]] = 1
+        assert self.finder.match(chroma[:1], np.array([4])) == ["C/E"]
+
+    def test_line_of_chords(self):
+        assert self.finder.get_line_of_chords(TAB) == ["   C         G       Am",
+                                                       "   C            G5    D5"]
+        annotated = self.finder.annotate(TAB).splitlines()
+        assert annotated[1] == "   C         G       Am"
+        assert annotated[9] == "   C            G5    D5"
+        assert annotated[2:8] == TAB.splitlines()[1:7]
+
+    def test_other_tuning(self):
+        # the G is played with the 5th fret of the lowest string
+        drop_d = TAB.replace("E|---------|-3---", "D|---------|-5---").replace("E|---", "D|---")
+        assert TabChordFinder("Drop D").get_line_of_chords(drop_d)[0].split() == ["C", "G", "Am"]
+        assert TabChordFinder().get_line_of_chords(drop_d)[0].split() == ["C", "Gadd9/A", "Am"]
+
+    def test_batch(self):
+        tabs = [TAB, "no tab", TAB.replace("-0-----|-0-----|\n", "-0-----|-1-----|\n", 1)] * 3
+        expected = [self.finder.get_line_of_chords(tab) for tab in tabs]
+        assert TabChordFinder.find_chords_in_tabs(tabs, processes=0) == expected
+        assert TabChordFinder.find_chords_in_tabs(tabs, processes=2, chunk_size=2) == expected
@@ -0,0 +1,45 @@
+from unittest import TestCase
+
+from instrument.tab_parser import TabParser
+
+TAB = """Verse
+e|-0-----|-10-----|
+B|-1-----|-10-----|
+G|-0-----|--9-----|
+D|-2-----|-10-----|
+A|-3-----|--------|
+E|-------|--------|
+la la la
+  e|-------|
+  B|---1---|
+  G|-------|
+  D|-------|
+  A|-------|
+  E|-------|
+
+G|-5-7---|
+D|-5-7---|
+A|-3-5---|
+E|-------|
+"""
+
+
+class TestTabParser(TestCase):
+    def setUp(self):
+        self.parser = TabParser()
+
+    def test_systems_are_found(self):
+        systems = self.parser.find_systems(TAB)
+        assert [line_index for line_index, _ in systems] == [1, 8]
+        assert systems[1][1][0] == "  e|-------|"
+        # a bass tab
+        assert len(TabParser(4).find_systems(TAB)) == 1
+        assert not self.parser.is_tab_line("la la la")
+
+    def test_events(self):
+        _, system = self.parser.find_systems(TAB)[0]
+        events = self.parser.get_events(system)
+        assert events[0] == (3, 0, {5: 0, 4: 1, 3: 0, 2: 2, 1: 3})
+        # the 1 digit fret under the 2nd digit of a 2 digits fret is simultaneous
+        assert events[1] == (11, 1, {5: 10, 4: 10, 3: 9, 2: 10})
+        assert len(events) == 2
@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+import numpy as np
+from pyharmonytools.harmony.note import Note
+
+from file_capabilities.midi_file import MidiFile
+from learning.module_index import ModuleIndex
+from note_recorder.tempo_quantizer import TempoQuantizer
+
+
+class TestTempoQuantizer(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.beats = np.cumsum(rng.choice([0.5, 1, 1, 2], size=2000))
+        self.onsets = self.beats * 60 / 100 + 3.21 + rng.normal(0, 0.01, len(self.beats))
+
+    def test_estimate_tempo(self):
+        assert TempoQuantizer.estimate_tempo(self.onsets) == 100.0
+        assert TempoQuantizer.estimate_tempo(np.array([1.0])) == TempoQuantizer.PREFERRED_BPM
+
+    def test_quantize(self):
+        onsets, durations, steps = TempoQuantizer.quantize(self.onsets, np.full(len(self.onsets), 0.25), 100, 2)
+        assert np.array_equal(steps, np.round((self.beats - self.beats[0]) * 2).astype(int))
+        assert np.allclose(np.diff(onsets), np.diff(self.beats) * 0.6)
+        assert np.allclose(durations, 0.3)
+
+    def test_to_play_notes(self):
+        assert TempoQuantizer.to_play_notes(np.array([36, 40, 43]), np.array([0, 1, 3])) == "C3-E3-G3"
+        assert TempoQuantizer.get_rests(np.array([0, 1, 3])) == [0, 0, 1]
+        assert TempoQuantizer.get_rests(np.array([0, 3]), np.array([4, 1])) == [0, 0]
+        assert TempoQuantizer.to_play_notes(np.array([36, 43]), np.array([0, 3]), np.array([4, 1])) == "C3-G3"
+        assert TempoQuantizer.to_play_notes(np.array([]), np.array([])) == ""
+
+    def test_module_with_a_rest_is_readable(self):
+        steps = np.array([2, 3, 6])
+        module = {"name": "take", "description": "recorded notes",
+                  "play_notes": TempoQuantizer.to_play_notes(np.array([36, 40, 43]), steps),
+                  "rests": TempoQuantizer.get_rests(steps), "next possible": ""}
+        # as read by the Learning Center: range of the module, transposition & exercise
+        notes = [Note(n) for n in module["play_notes"].split("-")]
+        assert [n.transpose(2) for n in notes] == ["D3", "F#3", "A3"]
+        ModuleIndex().add_module(0, module, "songs")
+        midi_file = MidiFile.from_module(module)
+        assert [(n[0], n[1]) for n in midi_file.notes] == [(36, 0.0), (40, 1.0), (43, 4.0)]
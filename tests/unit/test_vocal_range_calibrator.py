@@ -0,0 +1,30 @@
+from unittest import TestCase
+
+from instrument.vocal_range_calibrator import VocalRangeCalibrator
+from learning.pitch import Pitch
+
+
+class TestVocalRangeCalibrator(TestCase):
+    @staticmethod
+    def frequency(note: str) -> float:
+        return Pitch.CONCERT_PITCH * 2 ** ((Pitch.from_note(note) - Pitch.A4) / 12)
+
+    def test_octave_errors_are_ignored(self):
+        calibrator = VocalRangeCalibrator()
+        assert calibrator.get_bounds() is None
+        for note in ["C3", "D3", "E3", "F3", "G3", "A3", "B3", "C4", "D4", "E4"] * 4:
+            calibrator.add_sample(self.frequency(note))
+        calibrator.add_sample(self.frequency("E5"))
+        calibrator.add_sample(self.frequency("C2"))
+        assert calibrator.get_bounds() == (Pitch.from_note("C3"), Pitch.from_note("E4"))
+
+    def test_convergence(self):
+        calibrator = VocalRangeCalibrator()
+        assert not calibrator.add_sample(0.0)
+        assert not calibrator.add_sample(self.frequency("A4") * 2 ** (0.5 / 12))
+        nb_samples = 0
+        while not calibrator.is_confident():
+            calibrator.add_sample(self.frequency(["G3", "A3", "B3"][nb_samples % 3]))
+            nb_samples += 1
+        assert nb_samples < VocalRangeCalibrator.MAX_SAMPLES
+        assert calibrator.get_bounds() == (Pitch.from_note("G3"), Pitch.from_note("B3"))
@@ -0,0 +1,167 @@
+import gzip
+import json
+import os
+import sys
+import threading
+import zlib
+
+from pyharmonytools.harmony.cadence import Cadence
+from pyharmonytools.harmony.circle_of_5th import CircleOf5th
+from pyharmonytools.song.ultimate_guitar_search import UltimateGuitarSearch
+
+from ultimate_guitar.pooled_ultimate_guitar_search import PooledUltimateGuitarSearch
+from ultimate_guitar.song_fetcher import SongFetcher
+
+
+class CorpusHarvester:
+    """
+    headless bulk download of Ultimate Guitar songs into a gzipped JSON lines corpus, one song per line
+    the queries are "chords:C G Am" or "cadence:ii-V-I"; the URLs found for each query & the finished queries
+    are checkpointed, so that an interrupted harvest resumes where it stopped without searching again
+    a song already in the corpus is never fetched again
+    """
+    CORPUS_FILE_NAME = "ug_corpus.jsonl.gz"
+    MAX_WORKERS = 4
+    SONGS_PER_QUERY = 20
+    SONGS_PER_TONE = 5  # cadence queries
+    TRUNCATION_ERRORS = (EOFError, zlib.error, gzip.BadGzipFile, json.JSONDecodeError)
+
+    def __init__(self, corpus_file_name: str = CORPUS_FILE_NAME, search_engine: UltimateGuitarSearch = None,
+                 song_fetcher: SongFetcher = None, songs_per_query: int = SONGS_PER_QUERY,
+                 songs_per_tone: int = SONGS_PER_TONE):
+        """
+        :param corpus_file_name: eg "corpus.jsonl.gz", appended
+        :param search_engine: finds the URLs of the songs of a query
+        :param song_fetcher: downloads the songs concurrently
+        :param songs_per_query: limit of a chords query
+        :param songs_per_tone: limit of a cadence query in each tone
+        """
+        self.corpus_file_name = corpus_file_name
+        self.checkpoint_file_name = corpus_file_name + ".checkpoint.json"
+        self.song_fetcher = song_fetcher or SongFetcher(max_workers=self.MAX_WORKERS)
+        self.search_engine = search_engine or PooledUltimateGuitarSearch(song_fetcher=self.song_fetcher)
+        self.songs_per_query = songs_per_query
+        self.songs_per_tone = songs_per_tone
+        self.cancelled = threading.Event()
+        self.debug = False
+        self.checkpoint = {"queries": {}}  # query -> {"urls": [...], "done": bool}
+        self.harvested_urls = set()
+        self.nb_errors = 0
+
+    @staticmethod
+    def _iter_corpus(corpus_file_name: str):
+        if not os.path.exists(corpus_file_name):
+            return
+        with gzip.open(corpus_file_name, "rt", encoding="utf-8") as corpus:
+            for line in corpus:
+                yield json.loads(line)
+
+    @staticmethod
+    def read_corpus(corpus_file_name: str):
+        """
+        streaming read - the end of a corpus truncated by an interruption is ignored
+        :param corpus_file_name: a corpus written by a CorpusHarvester
+        :return: generator of the songs {"url", "artist", "song_title", "query", "chords_sequence", ...}
+        """
+        try:
+            yield from CorpusHarvester._iter_corpus(corpus_file_name)
+        except CorpusHarvester.TRUNCATION_ERRORS:
+            return
+
+    def _repair_corpus(self):
+        """
+        rewrites the songs of a corpus truncated by an interruption, the next songs would be unreadable otherwise
+        :return:
+        """
+        temporary_file_name = self.corpus_file_name + ".tmp"
+        with gzip.open(temporary_file_name, "wt", encoding="utf-8") as repaired:
+            for song in self.read_corpus(self.corpus_file_name):
+                repaired.write(json.dumps(song, ensure_ascii=False) + "\n")
+        os.replace(temporary_file_name, self.corpus_file_name)
+
+    def _load_checkpoint(self):
+        if os.path.exists(self.checkpoint_file_name):
+            with open(self.checkpoint_file_name, encoding="utf-8") as file:
+                self.checkpoint = json.load(file)
+        try:
+            self.harvested_urls = {song["url"] for song in self._iter_corpus(self.corpus_file_name)}
+        except self.TRUNCATION_ERRORS:
+            self._repair_corpus()
+            self.harvested_urls = {song["url"] for song in self._iter_corpus(self.corpus_file_name)}
+
+    def _save_checkpoint(self):
+        temporary_file_name = self.checkpoint_file_name + ".tmp"
+        with open(temporary_file_name, "w", encoding="utf-8") as file:
+            json.dump(self.checkpoint, file)
+        os.replace(temporary_file_name, self.checkpoint_file_name)
+
+    def _search(self, query: str) -> [str]:
+        kind, _, pattern = query.partition(":")
+        if kind == "cadence":
+            cof = CircleOf5th.cof_factory(Cadence.guess_tone_and_mode_from_cadence(pattern)["cof_name"])
+            songs = self.search_engine.search_songs_from_cadence(cadence=pattern, mode=cof,
+                                                                 limit_per_tone=self.songs_per_tone,
+                                                                 matches_exactly=True,
+                                                                 try_avoiding_blocked_searches=True)
+            return [url for urls in songs.values() for url in urls]
+        if kind == "chords":
+            return self.search_engine.search(pattern, self.songs_per_query)
+        raise ValueError(f"Unknown query '{query}' - 'chords:...' or 'cadence:...' expected")
+
+    def harvest(self, queries: [str]) -> int:
+        """
+        :param queries: eg ["chords:C G Am", "cadence:ii-V-I"]
+        :return: the number of songs added to the corpus
+        """
+        self.cancelled.clear()
+        self._load_checkpoint()
+        nb_songs = 0
+        with gzip.open(self.corpus_file_name, "ab") as corpus:
+            for query in queries:
+                if self.cancelled.is_set():
+                    break
+                progress = self.checkpoint["queries"].get(query)
+                if progress and progress["done"]:
+                    continue
+                if not progress:
+                    progress = {"urls": self._search(query), "done": False}
+                    self.checkpoint["queries"][query] = progress
+                    self._save_checkpoint()
+                urls = [url for url in progress["urls"] if url not in self.harvested_urls]
+                nb_query_errors = 0
+                for url, song, error in self.song_fetcher.fetch(urls, self.cancelled):
+                    if error:
+                        nb_query_errors += 1
+                        self.nb_errors += 1
+                        print(f">>> {url} could not be retrieved: {error}")
+                        continue
+                    corpus.write(json.dumps({"url": url, "artist": song.artist, "song_title": song.song_title,
+                                             "query": query,
+                                             "chords_sequence": [str(c) for c in song.chords_sequence],
+                                             "line_of_chords": song.line_of_chords, "lyrics": song.lyrics},
+                                            ensure_ascii=False).encode("utf-8") + b"\n")
+                    # the songs written so far are readable even if the harvest is killed
+                    corpus.flush(zlib.Z_SYNC_FLUSH)
+                    self.harvested_urls.add(url)
+                    nb_songs += 1
+                    if self.debug:
+                        print(f"CorpusHarvester: {song.artist} - {song.song_title}")
+                # the songs in error are retried by the next harvest
+                if not self.cancelled.is_set() and not nb_query_errors:
+                    progress["done"] = True
+                    self._save_checkpoint()
+        return nb_songs
+
+    def stop(self):
+        """
+        interrupts harvest() - the next one resumes
+        :return:
+        """
+        self.cancelled.set()
+
+
+if __name__ == "__main__":
+    # eg python -m ultimate_guitar.corpus_harvester "chords:C G Am" "cadence:ii-V-I"
+    harvester = CorpusHarvester()
+    print(harvester.harvest(sys.argv[1:]), "songs harvested")
+    harvester.song_fetcher.shutdown()
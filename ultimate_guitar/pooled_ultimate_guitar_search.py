@@ -0,0 +1,103 @@
+import http.client
+import threading
+from random import randint
+
+from google.modules.utils import _get_search_url as google_search
+from pyharmonytools.harmony.circle_of_5th import CircleOf5th
+from pyharmonytools.song.ultimate_guitar_search import UltimateGuitarSearch
+
+from file_capabilities.http_session import HttpSession
+from ultimate_guitar.song_fetcher import SongFetcher
+
+
+class PooledUltimateGuitarSearch(UltimateGuitarSearch):
+    """
+    UltimateGuitarSearch downloading the Google results through an HttpSession & checking the songs with a
+    SongFetcher, so that repeated searches reuse warm connections (and the cached songs) instead of opening new ones
+    a search given a cancelled event raises InterruptedError at its next Google page once the event is set
+    """
+    MAX_GOOGLE_QUERIES = 40  # before waiting, see UltimateGuitarSearch.get_google_search_page()
+    default_engine = None
+    default_engine_lock = threading.Lock()
+
+    def __init__(self, http_session: HttpSession = None, song_fetcher: SongFetcher = None):
+        super().__init__()
+        self.http_session = http_session or HttpSession.get_default_session()
+        self.song_fetcher = song_fetcher or SongFetcher.get_default_fetcher()
+        # the cancelled event of the search run by each thread
+        self.running_searches = threading.local()
+
+    @staticmethod
+    def get_default_engine():
+        """
+        :return: the engine shared by the whole application
+        """
+        with PooledUltimateGuitarSearch.default_engine_lock:
+            if not PooledUltimateGuitarSearch.default_engine:
+                PooledUltimateGuitarSearch.default_engine = PooledUltimateGuitarSearch()
+            return PooledUltimateGuitarSearch.default_engine
+
+    def _run_search(self, cancelled: threading.Event, search, *args, **kwargs):
+        previous = getattr(self.running_searches, "cancelled", None)
+        self.running_searches.cancelled = cancelled or previous
+        try:
+            return search(*args, **kwargs)
+        finally:
+            self.running_searches.cancelled = previous
+
+    def _get_cancelled(self) -> threading.Event:
+        return getattr(self.running_searches, "cancelled", None) or threading.Event()
+
+    def search(self, query: str, limit: int, artist: str = None, matches_exactly=False,
+               cancelled: threading.Event = None) -> [str]:
+        """
+        see UltimateGuitarSearch.search()
+        :param cancelled: the search stops before its next Google page once set
+        :return:
+        """
+        return self._run_search(cancelled, super().search, query, limit, artist=artist,
+                                matches_exactly=matches_exactly)
+
+    def search_songs_from_cadence(self, cadence: str, mode: CircleOf5th, limit_per_tone: int, artist: str = None,
+                                  matches_exactly: bool = False, try_avoiding_blocked_searches: bool = True,
+                                  cancelled: threading.Event = None) -> dict:
+        """
+        see UltimateGuitarSearch.search_songs_from_cadence()
+        :param cancelled: the search stops before its next tone or Google page once set
+        :return:
+        """
+        return self._run_search(cancelled, super().search_songs_from_cadence, cadence, mode, limit_per_tone,
+                                artist=artist, matches_exactly=matches_exactly,
+                                try_avoiding_blocked_searches=try_avoiding_blocked_searches)
+
+    def check_matches_exactly(self, query: str, link: str) -> bool:
+        ugs = self.song_fetcher.fetch_song(link, self._get_cancelled())
+        # each chord followed by a space as in UltimateGuitarSearch: the cadence queries end with a space
+        cs = "".join(f"{chord} " for chord in ugs.chords_sequence)
+        return query[0:len(query) - len(" site:ultimate-guitar.com")] in cs
+
+    def get_google_search_page(self, query, page) -> str:
+        """
+        same wait as UltimateGuitarSearch.get_google_search_page()
+        :param query:
+        :param page:
+        :return: the html page - None if Google rejected the search
+        """
+        cancelled = self._get_cancelled()
+        if cancelled.is_set():
+            raise InterruptedError(f"Search of {query} cancelled")
+        nb_searches = self.add_new_google_search()
+        if nb_searches > self.MAX_GOOGLE_QUERIES:
+            min_wait = UltimateGuitarSearch.GOOGLE_SEARCH_WAIT_AFTER_REJECTION \
+                       - (UltimateGuitarSearch.GOOGLE_SEARCH_WAIT_AFTER_REJECTION * 0.1)
+            max_wait = UltimateGuitarSearch.GOOGLE_SEARCH_WAIT_AFTER_REJECTION
+            print(f"Too many queries - let's try to wait for {min_wait} to {max_wait} minutes")
+            if cancelled.wait(randint(int(min_wait * 60), int(max_wait * 60))):
+                raise InterruptedError(f"Search of {query} cancelled")
+            self.reset_google_searches()
+        url = google_search(query, page, lang='en', area='com', ncr=False, time_period=False, sort_by_date=False)
+        try:
+            return self.http_session.get_text(url)
+        except (OSError, http.client.HTTPException) as err:
+            print(f">>> Error accessing {url}: {err}")
+            return None
@@ -0,0 +1,188 @@
+import re
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from pyharmonytools.song.ultimate_guitar_song import UltimateGuitarSong
+
+from learning.pitch import Pitch
+from ultimate_guitar.corpus_harvester import CorpusHarvester
+from ultimate_guitar.song_cache import SongCache
+
+
+class ProgressionIndex:
+    """
+    in memory inverted index of the chord progressions of the fetched songs, for offline searches
+    - chord n-grams: (C, G, Am) -> the songs playing these chords in a row
+    - degree n-grams: the same n-grams relative to their first chord ((0, ""), (7, ""), (9, "m")),
+      so that a cadence is found in every key
+    the posting lists are the increasing ids of the songs; a query longer than MAX_N chords intersects
+    the posting lists of its n-grams & checks the whole sequence in the candidate songs
+    """
+    MAX_N = 4
+    CHORD_PATTERN = re.compile(r"^([A-G][#b]?)([^/]*)(/.*)?$")
+    QUALITY_ALIASES = {"maj": "", "M": "", "min": "m", "mi": "m", "-": "m"}
+    default_index = None
+    default_index_lock = threading.Lock()
+
+    def __init__(self, max_n: int = MAX_N):
+        """
+        :param max_n: longest indexed n-gram
+        """
+        self.max_n = max_n
+        self.lock = threading.Lock()
+        self.song_ids = {}  # url -> song id
+        self.songs = []  # song id -> (url, artist, title)
+        self.sequences = []  # song id -> normalized chords, see normalize_chord()
+        self.chord_names = []  # song id -> names of the chords as written in the song
+        self.chord_postings = defaultdict(list)
+        self.degree_postings = defaultdict(list)
+
+    def __len__(self):
+        return len(self.songs)
+
+    @staticmethod
+    def get_default_index():
+        """
+        :return: the index shared by the whole application, built from the songs of the default SongCache
+                 & of the default corpus of the CorpusHarvester
+        """
+        with ProgressionIndex.default_index_lock:
+            if not ProgressionIndex.default_index:
+                index = ProgressionIndex()
+                index.add_cache(SongCache.get_default_cache())
+                index.add_corpus(CorpusHarvester.CORPUS_FILE_NAME)
+                ProgressionIndex.default_index = index
+            return ProgressionIndex.default_index
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def normalize_chord(chord_name: str) -> (int, str):
+        """
+        :param chord_name: eg "Dbmaj7/F"
+        :return: (pitch class of the root, quality) eg (1, "maj7") - None if this is not a chord
+        """
+        match = ProgressionIndex.CHORD_PATTERN.match(str(chord_name).strip())
+        if not match:
+            return None
+        quality = match.group(2)
+        return Pitch.pitch_class(Pitch.from_note(match.group(1) + "0")), \
+            ProgressionIndex.QUALITY_ALIASES.get(quality, quality)
+
+    @staticmethod
+    def to_degrees(chords: [tuple]) -> tuple:
+        """
+        :param chords: normalized chords, see normalize_chord()
+        :return: the chords relative to the first one, eg ((0, ""), (7, ""), (9, "m")) for C G Am or D A Bm
+        """
+        if not chords:
+            return ()
+        first = chords[0][0]
+        return tuple(((root - first) % 12, quality) for root, quality in chords)
+
+    def add(self, url: str, artist: str, title: str, chord_names: [str]) -> bool:
+        """
+        :param url: identifies the song
+        :param artist:
+        :param title:
+        :param chord_names: the chords of the song in order, eg ["C", "G", "Am"]
+        :return: False if the song was already indexed
+        """
+        names = []
+        sequence = []
+        for name in chord_names:
+            chord = self.normalize_chord(str(name))
+            if chord:
+                names.append(str(name))
+                sequence.append(chord)
+        sequence = tuple(sequence)
+        with self.lock:
+            if url in self.song_ids:
+                return False
+            song_id = len(self.songs)
+            self.song_ids[url] = song_id
+            self.songs.append((url, artist, title))
+            self.sequences.append(sequence)
+            self.chord_names.append(names)
+            for n in range(1, min(self.max_n, len(sequence)) + 1):
+                for i in range(0, len(sequence) - n + 1):
+                    gram = sequence[i:i + n]
+                    for postings, key in ((self.chord_postings, gram), (self.degree_postings, self.to_degrees(gram))):
+                        posting = postings[key]
+                        if not posting or posting[-1] != song_id:
+                            posting.append(song_id)
+        return True
+
+    def add_song(self, song: UltimateGuitarSong) -> bool:
+        return self.add(song.url, song.artist, song.song_title, song.chords_sequence)
+
+    def add_cache(self, song_cache: SongCache) -> int:
+        """
+        :param song_cache: every song of the cache is indexed
+        :return: the number of new songs
+        """
+        return sum(self.add(*song) for song in song_cache.iter_songs())
+
+    def add_corpus(self, corpus_file_name: str) -> int:
+        """
+        :param corpus_file_name: a corpus written by a CorpusHarvester
+        :return: the number of new songs
+        """
+        return sum(self.add(song["url"], song["artist"], song["song_title"], song["chords_sequence"])
+                   for song in CorpusHarvester.read_corpus(corpus_file_name))
+
+    @staticmethod
+    def _find(sequence: tuple, pattern: tuple, relative: bool) -> int:
+        n = len(pattern)
+        for i in range(0, len(sequence) - n + 1):
+            window = sequence[i:i + n]
+            if (ProgressionIndex.to_degrees(window) if relative else window) == pattern:
+                return i
+        return -1
+
+    def _search(self, chord_names: [str], relative: bool, limit: int = None) -> [tuple]:
+        pattern = tuple(c for c in (self.normalize_chord(str(name)) for name in chord_names) if c)
+        if not pattern:
+            return []
+        n = min(self.max_n, len(pattern))
+        grams = [pattern[i:i + n] for i in range(0, len(pattern) - n + 1)]
+        if relative:
+            pattern = self.to_degrees(pattern)
+            postings = [self.degree_postings.get(self.to_degrees(g), []) for g in grams]
+        else:
+            postings = [self.chord_postings.get(g, []) for g in grams]
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            posting = set(posting)
+            candidates = [song_id for song_id in candidates if song_id in posting]
+        results = []
+        for song_id in candidates:
+            # also checks the whole pattern when it is longer than the n-grams
+            position = self._find(self.sequences[song_id], pattern, relative)
+            if position < 0:
+                continue
+            url, artist, title = self.songs[song_id]
+            results.append((url, artist, title, " ".join(self.chord_names[song_id][position:position + len(pattern)])))
+            if limit and len(results) >= limit:
+                break
+        return results
+
+    def search_chords(self, chord_names: [str], limit: int = None) -> [tuple]:
+        """
+        :param chord_names: chords played in a row, eg ["C", "E", "F"]
+        :param limit: max number of songs
+        :return: [(url, artist, title, the chords as written in the song)]
+        """
+        return self._search(chord_names, False, limit)
+
+    def search_degrees(self, chord_names: [str], limit: int = None) -> [tuple]:
+        """
+        transposition invariant search
+        :param chord_names: chords of the progression in any key, eg ["Dm7", "G7", "Cmaj"] for ii7-V7-Imaj
+        :param limit: max number of songs
+        :return: [(url, artist, title, the chords as written in the song)]
+        """
+        return self._search(chord_names, True, limit)
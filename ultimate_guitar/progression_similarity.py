@@ -0,0 +1,211 @@
+import threading
+from itertools import combinations
+from math import comb
+
+from ultimate_guitar.progression_index import ProgressionIndex
+
+
+class ProgressionSimilarity:
+    """
+    top-k search of the songs playing a progression like the query, over the songs of a ProgressionIndex
+    the distance between 2 progressions is the edit distance of their chords (root & quality), minimized over the
+    12 transpositions; the query is compared with the progressions of its length +/- the max distance, so that
+    the songs playing it with some chords inserted or deleted are found
+    the distinct progressions of the songs are indexed per length by their deletion neighbourhood: the progression
+    without up to max_distance of its chords, relative to its first remaining chord. 2 progressions within
+    max_distance edits share a key, so a query only computes the distance to the progressions sharing one of its keys
+    https://en.wikipedia.org/wiki/Approximate_string_matching (symmetric deletion)
+    """
+    MAX_DISTANCE = 1
+    WARM_UP_LENGTHS = range(1, 8)  # the usual lengths of cadences, +/- MAX_DISTANCE
+    default_similarity = None
+    default_similarity_lock = threading.Lock()
+
+    def __init__(self, progression_index: ProgressionIndex, max_distance: int = MAX_DISTANCE):
+        """
+        :param progression_index: the indexed songs
+        :param max_distance: max number of chord edits of the searches
+        """
+        self.progression_index = progression_index
+        self.max_distance = max_distance
+        self.lock = threading.Lock()
+        self.neighbourhoods = {}  # progression length -> {deletion key: [progressions]}
+        self.occurrences = {}  # progression length -> {progression: [(song id, position)]}
+        self.nb_indexed_songs = {}  # progression length -> number of songs of the index already indexed
+        self.warm_up_thread = None
+
+    @staticmethod
+    def get_default_similarity():
+        """
+        :return: the search over the songs of ProgressionIndex.get_default_index(), shared by the whole application
+        """
+        with ProgressionSimilarity.default_similarity_lock:
+            if not ProgressionSimilarity.default_similarity:
+                similarity = ProgressionSimilarity(ProgressionIndex.get_default_index())
+                similarity.warm_up()
+                ProgressionSimilarity.default_similarity = similarity
+            return ProgressionSimilarity.default_similarity
+
+    @staticmethod
+    def warm_up_default_similarity():
+        """
+        loads the default index & indexes its progressions in background, ahead of the 1st search
+        :return:
+        """
+        threading.Thread(target=ProgressionSimilarity.get_default_similarity, name="_default_similarity",
+                         daemon=True).start()
+
+    @staticmethod
+    def transpose(progression: tuple, interval: int) -> tuple:
+        return tuple(((root + interval) % 12, quality) for root, quality in progression)
+
+    @staticmethod
+    def edit_distance(a: tuple, b: tuple) -> int:
+        """
+        :param a: chords (root, quality)
+        :param b: chords (root, quality)
+        :return: Levenshtein distance, every edit of a chord costs 1
+        """
+        if a == b:
+            return 0
+        previous = list(range(0, len(b) + 1))
+        for i, chord in enumerate(a, 1):
+            current = [i]
+            for j, other in enumerate(b, 1):
+                current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (chord != other)))
+            previous = current
+        return previous[-1]
+
+    @staticmethod
+    def distance(transpositions: [tuple], b: tuple) -> int:
+        """
+        :param transpositions: the 12 transpositions of a progression
+        :param b: a progression
+        :return: transposition invariant edit distance
+        """
+        # without any common chord, every chord is edited
+        best = max(len(transpositions[0]), len(b))
+        chords = set(b)
+        for a in transpositions:
+            if not chords.isdisjoint(a):
+                best = min(best, ProgressionSimilarity.edit_distance(a, b))
+                if not best:
+                    break
+        return best
+
+    @staticmethod
+    def get_deletion_keys(progression: tuple, max_deletions: int) -> [tuple]:
+        """
+        :param progression: chords (root, quality)
+        :param max_deletions: max number of chords removed
+        :return: the progression without 0, 1... max_deletions of its chords, relative to its first remaining chord
+                 in the order of the number of deletions
+        """
+        keys = []
+        for nb_deletions in range(0, min(max_deletions, len(progression)) + 1):
+            for deleted in combinations(range(0, len(progression)), nb_deletions):
+                keys.append(ProgressionIndex.to_degrees([chord for i, chord in enumerate(progression)
+                                                         if i not in deleted]))
+        return keys
+
+    def _update(self, length: int):
+        """
+        indexes the progressions of the songs added to the index since the last call
+        :param length: number of chords of the progressions
+        :return:
+        """
+        first_song_id = self.nb_indexed_songs.get(length, 0)
+        # ProgressionIndex.add() appends to several lists: the songs are read once completely added
+        with self.progression_index.lock:
+            sequences = self.progression_index.sequences[first_song_id:]
+        nb_songs = first_song_id + len(sequences)
+        occurrences = self.occurrences.setdefault(length, {})
+        neighbourhood = self.neighbourhoods.setdefault(length, {})
+        for song_id, sequence in enumerate(sequences, first_song_id):
+            for position in range(0, len(sequence) - length + 1):
+                progression = ProgressionIndex.to_degrees(sequence[position:position + length])
+                song_positions = occurrences.get(progression)
+                if song_positions is None:
+                    occurrences[progression] = [(song_id, position)]
+                    for key in self.get_deletion_keys(progression, self.max_distance):
+                        neighbourhood.setdefault(key, []).append(progression)
+                elif song_positions[-1][0] != song_id:
+                    song_positions.append((song_id, position))
+        self.nb_indexed_songs[length] = nb_songs
+
+    def warm_up(self, lengths: [int] = WARM_UP_LENGTHS):
+        """
+        indexes the progressions of these lengths in background, the searches only index the songs added since
+        :param lengths: of the expected queries
+        :return:
+        """
+        self.warm_up_thread = threading.Thread(target=self._warm_up, args=(lengths,), name="_progression_warm_up",
+                                               daemon=True)
+        self.warm_up_thread.start()
+
+    def _warm_up(self, lengths: [int]):
+        for length in lengths:
+            # a search may run between 2 lengths
+            with self.lock:
+                self._update(length)
+
+    def search(self, chord_names: [str], k: int = 10, max_distance: int = None) -> [tuple]:
+        """
+        :param chord_names: the progression in any key, eg ["Dm7", "G7", "Cmaj"] for ii7-V7-Imaj
+        :param k: max number of songs
+        :param max_distance: max number of chord edits, up to the max_distance of this search - its value if None
+        :return: [(url, artist, title, the chords as written in the song, distance, score between 0 and 1)]
+                 the closest songs first
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        if max_distance > self.max_distance:
+            raise ValueError(f"max_distance {max_distance} is over the {self.max_distance} edits indexed")
+        query = tuple(c for c in (ProgressionIndex.normalize_chord(str(name)) for name in chord_names) if c)
+        if not query:
+            return []
+        length = len(query)
+        transpositions = [self.transpose(query, interval) for interval in range(0, 12)]
+        keys = self.get_deletion_keys(query, max_distance)
+        # keys of the query per number of deletions
+        keys_by_deletions = []
+        for nb_deletions in range(0, min(max_distance, length) + 1):
+            nb_keys = sum(len(k) for k in keys_by_deletions)
+            keys_by_deletions.append(keys[nb_keys:nb_keys + comb(length, nb_deletions)])
+        # the chords inserted in or deleted from the query are in longer or shorter progressions
+        lengths = range(max(1, length - max_distance), length + max_distance + 1)
+        with self.lock:
+            for window_length in lengths:
+                self._update(window_length)
+            distances = {}  # progression sharing a key with the query -> distance
+            best = {}  # song id -> (distance, length difference, position, length of the progression)
+            # a progression within n edits shares a key of at most n deletions of the query & of the progression:
+            # the radius grows until k songs are found
+            for radius in range(0, max_distance + 1):
+                for window_length in lengths:
+                    neighbourhood = self.neighbourhoods[window_length]
+                    for nb_deletions, deletion_keys in enumerate(keys_by_deletions):
+                        # the keys of the progression have as many chords as those of the query
+                        if max(nb_deletions, nb_deletions + window_length - length) != radius \
+                                or nb_deletions + window_length - length < 0:
+                            continue
+                        for key in deletion_keys:
+                            for progression in neighbourhood.get(key, ()):
+                                if progression not in distances:
+                                    distances[progression] = self.distance(transpositions, progression)
+                for progression, distance in distances.items():
+                    if distance == radius:
+                        window_length = len(progression)
+                        for song_id, position in self.occurrences[window_length][progression]:
+                            match = (distance, abs(window_length - length), position, window_length)
+                            if song_id not in best or match < best[song_id]:
+                                best[song_id] = match
+                if len(best) >= k:
+                    break
+        results = []
+        for song_id, (distance, _, position, window_length) in sorted(best.items(),
+                                                                        key=lambda s: (s[1][0], s[0]))[:k]:
+            url, artist, title = self.progression_index.songs[song_id]
+            chords = " ".join(self.progression_index.chord_names[song_id][position:position + window_length])
+            results.append((url, artist, title, chords, distance, round(1 - distance / length, 3)))
+        return results
@@ -1,15 +1,24 @@
-import threading
 import tkinter
-from tkinter import Frame, NO, CENTER, Text, Label, Entry, Button, END
+from tkinter import Frame, NO, CENTER, Text, Label, Entry, Button, END, Checkbutton, IntVar, messagebox
 from tkinter.ttk import Treeview, Progressbar
 
 from pyharmonytools.harmony.cadence import Cadence
 from pyharmonytools.harmony.circle_of_5th import CircleOf5th
-from pyharmonytools.song.ultimate_guitar_search import UltimateGuitarSearch
+from pyharmonytools.harmony.degree import Degree
 from pyharmonytools.song.ultimate_guitar_song import UltimateGuitarSong
 
+from ultimate_guitar.pooled_ultimate_guitar_search import PooledUltimateGuitarSearch
+from ultimate_guitar.progression_index import ProgressionIndex
+from ultimate_guitar.progression_similarity import ProgressionSimilarity
+from ultimate_guitar.song_cache import SongCache
+from ultimate_guitar.search_job import SearchJob
+from ultimate_guitar.song_fetcher import SongFetcher
+
 
 class SearchSongFromCadence(tkinter.Tk):
+    MAX_LOCAL_SONGS = 500
+    MAX_CHORD_EDITS = 1  # distance of the near matches to the cadence
+
     def __init__(self):
         self.list_of_songs = None
         self.song = None
@@ -17,8 +26,15 @@ class SearchSongFromCadence(tkinter.Tk):
         self.pattern_label = None
         self.search_button = None
         self.progress_bar = None
-        self.ug_engine = UltimateGuitarSearch()
-        self.download_thread = None
+        self.progress_label = None
+        self.ug_engine = PooledUltimateGuitarSearch.get_default_engine()
+        self.song_cache = SongCache.get_default_cache()
+        self.song_fetcher = SongFetcher.get_default_fetcher()
+        self.offline_var = None
+        self.search_job = None
+        self.song_job = None
+        # the progressions of the fetched songs are indexed before the 1st search
+        ProgressionSimilarity.warm_up_default_similarity()
 
     def get_ui_frame(self, root: tkinter.Tk) -> Frame:
         self.frame = Frame(root)
@@ -28,20 +44,27 @@ class SearchSongFromCadence(tkinter.Tk):
         self.pattern.pack()
         self.search_button = Button(self.frame, text='Search', command=self.do_search_songs)
         self.search_button.pack()
+        self.offline_var = IntVar(value=int(self.song_cache.offline))
+        Checkbutton(self.frame, text="Offline (cached songs only)", variable=self.offline_var,
+                    command=self._do_toggle_offline).pack()
 
         self.progress_bar = Progressbar(self.frame, orient='horizontal', mode='indeterminate', length=280)
         self.progress_bar.pack()
+        self.progress_label = Label(self.frame, text="")
+        self.progress_label.pack()
 
         self.list_of_songs = Treeview(self.frame)
-        self.list_of_songs['columns'] = ('Sequence', 'Author', 'Title', 'URL')
+        self.list_of_songs['columns'] = ('Sequence', 'Score', 'Author', 'Title', 'URL')
         self.list_of_songs.column("#0", width=0, stretch=NO)
         self.list_of_songs.column('Sequence', anchor=CENTER, width=80)
+        self.list_of_songs.column('Score', anchor=CENTER, width=50)
         self.list_of_songs.column('Author', anchor=CENTER, width=80)
         self.list_of_songs.column('Title', anchor=CENTER, width=80)
         self.list_of_songs.column('URL', anchor=CENTER, width=80)
 
         self.list_of_songs.heading("#0", text="", anchor=CENTER)
         self.list_of_songs.heading('Sequence', text="Sequence", anchor=CENTER)
+        self.list_of_songs.heading('Score', text="Score", anchor=CENTER)
         self.list_of_songs.heading('Author', text="Author", anchor=CENTER)
         self.list_of_songs.heading('Title', text="Title", anchor=CENTER)
         self.list_of_songs.heading('URL', text="URL", anchor=CENTER)
@@ -53,37 +76,114 @@ class SearchSongFromCadence(tkinter.Tk):
         self.song.pack()
         return self.frame
 
-    def do_search_songs(self):
-        self.download_thread = threading.Thread(target=self._download_songs, name="_download_songs")
-        self.download_thread.start()
+    def _do_toggle_offline(self):
+        self.song_cache.offline = bool(self.offline_var.get())
 
-    def _download_songs(self):
-        self.progress_bar.start()
+    def do_search_songs(self):
+        # a new search replaces the running one
+        if self.search_job:
+            self.search_job.cancel()
+        self.list_of_songs.delete(*self.list_of_songs.get_children())
         query = self.pattern.get()
-        ug_song = UltimateGuitarSong()
+        self.progress_bar.configure(mode='indeterminate')
+        self.progress_bar.start()
+        self.progress_label.configure(text="Searching...")
+        self.search_job = SearchJob(self.frame, lambda job: self._download_songs(job, query), self._show_songs,
+                                    self._show_progress, self._end_search)
+        self.search_job.start()
+
+    def _download_songs(self, job: SearchJob, query: str):
+        """
+        run by the thread of the job
+        :param job:
+        :param query: eg "ii-V-I"
+        :return:
+        """
         cadence_and_tone = Cadence.guess_tone_and_mode_from_cadence(query)
         cof = CircleOf5th.cof_factory(cadence_and_tone["cof_name"])
         MAX_SONG_PER_SEARCH = 5
-        ugs = UltimateGuitarSearch()
-        songs = ugs.search_songs_from_cadence(cadence=query, mode=cof, limit_per_tone=MAX_SONG_PER_SEARCH,
-                                              matches_exactly=True, try_avoiding_blocked_searches=True)
-
-        index = 0
-        for chords in songs.keys():
-            for s in songs[chords]:
-                # self.progress_bar.step()
-                ug_song.extract_song_from_url(s)
-                self.list_of_songs.insert(parent="", index='end', iid=index, text="",
-                                          values=(str(chords), ug_song.artist, ug_song.song_title, ug_song.url))
-                index += 1
+        progression_index = ProgressionIndex.get_default_index()
+        # the songs already fetched first, in any key & the closest first - UG is searched unless one matches exactly
+        chords_in_c = [Degree.get_chord_from_degree(degree, "C", cof) for degree in query.split("-")]
+        local_songs = ProgressionSimilarity.get_default_similarity().search(chords_in_c, self.MAX_LOCAL_SONGS,
+                                                                            self.MAX_CHORD_EDITS)
+        job.set_total(len(local_songs))
+        for url, artist, title, chords, _, score in local_songs:
+            job.add_result((chords, score, artist, title, url))
+        search_key = f"cadence:{query}|{MAX_SONG_PER_SEARCH}"
+        exact_local_songs = any(distance == 0 for _, _, _, _, distance, _ in local_songs)
+        songs = self.song_cache.get_search(search_key) if not exact_local_songs else {}
+        if songs is None:
+            if self.song_cache.offline:
+                print(f">>> '{query}' has not been searched yet - offline mode")
+                songs = {}
+            else:
+                try:
+                    songs = self.ug_engine.search_songs_from_cadence(cadence=query, mode=cof,
+                                                                     limit_per_tone=MAX_SONG_PER_SEARCH,
+                                                                     matches_exactly=True,
+                                                                     try_avoiding_blocked_searches=True,
+                                                                     cancelled=job.cancelled)
+                except InterruptedError:
+                    return
+                # a cancelled search may be incomplete
+                if job.is_cancelled():
+                    return
+                self.song_cache.put_search(search_key, songs)
+        if job.is_cancelled():
+            return
+        # the near matches already listed are not fetched again
+        local_urls = {song[0] for song in local_songs}
+        chords_of_songs = {url: chords for chords in songs.keys() for url in songs[chords] if url not in local_urls}
+        job.set_total(job.total + len(chords_of_songs))
+        for url, ug_song, error in self.song_fetcher.fetch(chords_of_songs.keys(), job.cancelled):
+            if error:
+                print(f">>> {url} could not be retrieved: {error}")
+                job.add_failure()
+                continue
+            progression_index.add_song(ug_song)
+            job.add_result((str(chords_of_songs[url]), 1.0, ug_song.artist, ug_song.song_title, ug_song.url))
+
+    def _show_songs(self, songs: [tuple]):
+        for values in songs:
+            self.list_of_songs.insert(parent="", index='end', text="", values=values)
+
+    def _show_progress(self, nb_done: int, total: int):
+        if total:
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode='determinate', maximum=total, value=nb_done)
+            self.progress_label.configure(text=f"{nb_done} of {total} songs")
+
+    def _end_search(self, job: SearchJob):
         self.progress_bar.stop()
-        self.list_of_songs.pack()
+        self.progress_label.configure(text=f"{len(self.list_of_songs.get_children())} songs found")
+        if job.error:
+            messagebox.showwarning("Search", str(job.error))
 
     def _on_song_select(self, event):
         item = self.list_of_songs.item(self.list_of_songs.selection())['values']
         print("Selected item : ", item)
-        ug_song = UltimateGuitarSong()
-        ug_song.extract_song_from_url(item[3])
+        if not item:
+            return
+        # the song is downloaded in background, the last selected one replaces the previous
+        if self.song_job:
+            self.song_job.cancel()
+        url = item[4]
+        self.song_job = SearchJob(self.frame, lambda job: self._download_song(job, url), self._show_song,
+                                  on_done=self._end_song_download)
+        self.song_job.start()
+
+    def _download_song(self, job: SearchJob, url: str):
+        """
+        run by the thread of the job
+        :param job:
+        :param url: of the selected song
+        :return:
+        """
+        job.add_result(self.song_fetcher.fetch_song(url, job.cancelled))
+
+    def _show_song(self, songs: [UltimateGuitarSong]):
+        ug_song = songs[-1]
         self.song.configure(state='normal')
         song_string = ""
         self.song.delete('1.0', END)
@@ -96,3 +196,7 @@ class SearchSongFromCadence(tkinter.Tk):
             self.song.insert('end', "\n")
         print(song_string)
         self.song.configure(state='disabled')
+
+    def _end_song_download(self, job: SearchJob):
+        if job.error:
+            messagebox.showwarning("Song", str(job.error))
@@ -1,11 +1,15 @@
-import threading
 import tkinter
-from tkinter import Frame, NO, CENTER, Text, Label, Entry, Button, END
+from tkinter import Frame, NO, CENTER, Text, Label, Entry, Button, END, Checkbutton, IntVar, messagebox
 from tkinter.ttk import Treeview, Progressbar
 
-from pyharmonytools.song.ultimate_guitar_search import UltimateGuitarSearch
 from pyharmonytools.song.ultimate_guitar_song import UltimateGuitarSong
 
+from ultimate_guitar.pooled_ultimate_guitar_search import PooledUltimateGuitarSearch
+from ultimate_guitar.progression_index import ProgressionIndex
+from ultimate_guitar.song_cache import SongCache
+from ultimate_guitar.search_job import SearchJob
+from ultimate_guitar.song_fetcher import SongFetcher
+
 
 class SearchSongFromChords(tkinter.Tk):
     def __init__(self):
@@ -17,8 +21,13 @@ class SearchSongFromChords(tkinter.Tk):
         self.pattern_label = None
         self.search_button = None
         self.progress_bar = None
-        self.ug_engine = UltimateGuitarSearch()
-        self.download_thread = None
+        self.progress_label = None
+        self.ug_engine = PooledUltimateGuitarSearch.get_default_engine()
+        self.song_cache = SongCache.get_default_cache()
+        self.song_fetcher = SongFetcher.get_default_fetcher()
+        self.offline_var = None
+        self.search_job = None
+        self.song_job = None
 
     def get_ui_frame(self, root: tkinter.Tk) -> Frame:
         self.frame = Frame(root)
@@ -35,9 +44,14 @@ class SearchSongFromChords(tkinter.Tk):
 
         self.progress_bar = Progressbar(self.frame, orient='horizontal', mode='indeterminate', length=280)
         self.progress_bar.pack()
+        self.progress_label = Label(self.frame, text="")
+        self.progress_label.pack()
 
         self.search_button = Button(self.frame, text='Search', command=self.do_search_songs)
         self.search_button.pack()
+        self.offline_var = IntVar(value=int(self.song_cache.offline))
+        Checkbutton(self.frame, text="Offline (cached songs only)", variable=self.offline_var,
+                    command=self._do_toggle_offline).pack()
         self.list_of_songs = Treeview(self.frame)
         self.list_of_songs['columns'] = ('Author', 'Title', 'URL')
         self.list_of_songs.column("#0", width=0, stretch=NO)
@@ -57,30 +71,107 @@ class SearchSongFromChords(tkinter.Tk):
         self.song.pack()
         return self.frame
 
-    def do_search_songs(self):
-        self.download_thread = threading.Thread(target=self._download_songs, name="_download_songs")
-        self.download_thread.start()
+    def _do_toggle_offline(self):
+        self.song_cache.offline = bool(self.offline_var.get())
 
-    def _download_songs(self):
-        self.progress_bar.start()
+    def do_search_songs(self):
+        # a new search replaces the running one
+        if self.search_job:
+            self.search_job.cancel()
+        self.list_of_songs.delete(*self.list_of_songs.get_children())
         query = self.pattern.get()
         nb_songs = int(self.song_limit_entry.get())
-        songs = self.ug_engine.search(query, nb_songs)
-        song = UltimateGuitarSong()
-        index = 0
-        for s in songs:
-            song.extract_song_from_url(s)
-            self.list_of_songs.insert(parent="", index='end', iid=index, text="",
-                                      values=(song.artist, song.song_title, song.url))
-            index += 1
+        self.progress_bar.configure(mode='indeterminate')
+        self.progress_bar.start()
+        self.progress_label.configure(text="Searching...")
+        self.search_job = SearchJob(self.frame, lambda job: self._download_songs(job, query, nb_songs),
+                                    self._show_songs, self._show_progress, self._end_search)
+        self.search_job.start()
+
+    def _download_songs(self, job: SearchJob, query: str, nb_songs: int):
+        """
+        run by the thread of the job
+        :param job:
+        :param query: eg "C E F"
+        :param nb_songs:
+        :return:
+        """
+        progression_index = ProgressionIndex.get_default_index()
+        # the songs already fetched first - UG is searched for the missing ones
+        local_songs = progression_index.search_chords(query.split(), nb_songs)
+        job.set_total(len(local_songs))
+        for url, artist, title, _ in local_songs:
+            job.add_result((artist, title, url))
+        nb_missing_songs = nb_songs - len(local_songs)
+        search_key = f"chords:{query}|{nb_missing_songs}"
+        songs = self.song_cache.get_search(search_key) if nb_missing_songs > 0 else []
+        if songs is None:
+            if self.song_cache.offline:
+                print(f">>> '{query}' has not been searched yet - offline mode")
+                songs = []
+            else:
+                try:
+                    songs = self.ug_engine.search(query, nb_missing_songs, cancelled=job.cancelled)
+                except InterruptedError:
+                    return
+                # a cancelled search may be incomplete
+                if job.is_cancelled():
+                    return
+                self.song_cache.put_search(search_key, songs)
+        if job.is_cancelled():
+            return
+        # the songs already listed are not fetched again
+        local_urls = {song[0] for song in local_songs}
+        songs = [url for url in songs if url not in local_urls]
+        job.set_total(job.total + len(songs))
+        for url, song, error in self.song_fetcher.fetch(songs, job.cancelled):
+            if error:
+                print(f">>> {url} could not be retrieved: {error}")
+                job.add_failure()
+                continue
+            progression_index.add_song(song)
+            job.add_result((song.artist, song.song_title, song.url))
+
+    def _show_songs(self, songs: [tuple]):
+        for values in songs:
+            self.list_of_songs.insert(parent="", index='end', text="", values=values)
+
+    def _show_progress(self, nb_done: int, total: int):
+        if total:
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode='determinate', maximum=total, value=nb_done)
+            self.progress_label.configure(text=f"{nb_done} of {total} songs")
+
+    def _end_search(self, job: SearchJob):
         self.progress_bar.stop()
-        self.list_of_songs.pack()
+        self.progress_label.configure(text=f"{len(self.list_of_songs.get_children())} songs found")
+        if job.error:
+            messagebox.showwarning("Search", str(job.error))
 
     def _on_song_select(self, event):
         item = self.list_of_songs.item(self.list_of_songs.selection())['values']
         print("Selected item : ", item)
-        ug_song = UltimateGuitarSong()
-        ug_song.extract_song_from_url(item[2])
+        if not item:
+            return
+        # the song is downloaded in background, the last selected one replaces the previous
+        if self.song_job:
+            self.song_job.cancel()
+        url = item[2]
+        self.song_job = SearchJob(self.frame, lambda job: self._download_song(job, url), self._show_song,
+                                  on_done=self._end_song_download)
+        self.song_job.start()
+
+    def _download_song(self, job: SearchJob, url: str):
+        """
+        run by the thread of the job
+        :param job:
+        :param url: of the selected song
+        :return:
+        """
+        job.add_result(self.song_fetcher.fetch_song(url, job.cancelled))
+
+    def _show_song(self, songs: [UltimateGuitarSong]):
+        ug_song = songs[-1]
         self.song.configure(state='normal')
         song_string = ""
         self.song.delete('1.0', END)
@@ -94,3 +185,6 @@ class SearchSongFromChords(tkinter.Tk):
         print(song_string)
         self.song.configure(state='disabled')
 
+    def _end_song_download(self, job: SearchJob):
+        if job.error:
+            messagebox.showwarning("Song", str(job.error))
@@ -0,0 +1,108 @@
+import queue
+import threading
+
+
+class SearchJob:
+    """
+    a search run by a background thread whose results are displayed by the Tk thread
+    the thread queues the results; the Tk thread drains the queue by batches every DRAIN_PERIOD
+    a cancelled job stops its thread as soon as possible & its pending results are never displayed
+    """
+    DRAIN_PERIOD = 50  # ms
+    BATCH_SIZE = 50
+
+    def __init__(self, widget, work, on_results, on_progress=None, on_done=None):
+        """
+        :param widget: any widget of the frame, for after()
+        :param work: function(job) run by the background thread, see add_result(), add_failure() & set_total()
+        :param on_results: function(list of results) called by the Tk thread
+        :param on_progress: function(nb done, total - 0 if unknown yet) called by the Tk thread
+        :param on_done: function(job) called by the Tk thread once everything is displayed - job.error is set
+                        if work() failed; not called if the job is cancelled
+        """
+        self.widget = widget
+        self.work = work
+        self.on_results = on_results
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.cancelled = threading.Event()
+        self.results = queue.Queue()
+        self.nb_done = 0
+        self.total = 0
+        self.error = None
+        self.finished = False
+        self.displayed = threading.Event()  # set once every result is displayed
+        self.drain_id = None
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="_search_job", daemon=True)
+        self.thread.start()
+        self.drain_id = self.widget.after(self.DRAIN_PERIOD, self._drain)
+
+    def cancel(self):
+        """
+        called by the Tk thread
+        :return:
+        """
+        self.cancelled.set()
+        if self.drain_id:
+            self.widget.after_cancel(self.drain_id)
+            self.drain_id = None
+
+    def is_cancelled(self) -> bool:
+        return self.cancelled.is_set()
+
+    # background thread
+
+    def set_total(self, total: int):
+        """
+        :param total: number of expected results
+        :return:
+        """
+        self.total = total
+
+    def add_result(self, result):
+        self.nb_done += 1
+        self.results.put(result)
+
+    def add_failure(self):
+        """
+        an expected result that will never come
+        :return:
+        """
+        self.nb_done += 1
+
+    def _run(self):
+        try:
+            self.work(self)
+        except Exception as err:
+            print(f">>> Search failed: {err}")
+            self.error = err
+        finally:
+            self.finished = True
+
+    # Tk thread
+
+    def _drain(self):
+        self.drain_id = None
+        if self.cancelled.is_set():
+            return
+        # read before draining: no result can be queued after a finished job is seen
+        finished = self.finished
+        batch = []
+        while len(batch) < self.BATCH_SIZE:
+            try:
+                batch.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self.on_results(batch)
+        if self.on_progress:
+            self.on_progress(self.nb_done, self.total)
+        if finished and self.results.empty():
+            self.displayed.set()
+            if self.on_done:
+                self.on_done(self)
+        else:
+            self.drain_id = self.widget.after(self.DRAIN_PERIOD, self._drain)
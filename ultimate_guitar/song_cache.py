@@ -0,0 +1,176 @@
+import json
+import sqlite3
+import threading
+import time
+
+from pychord import Chord
+from pyharmonytools.song.ultimate_guitar_song import UltimateGuitarSong
+
+
+class SongCache:
+    """
+    persistent cache of the Ultimate Guitar lookups in a SQLite database, keyed by URL or query
+    - songs: the digested UltimateGuitarSong data (artist, title, chord lines, lyrics...), kept SONG_TTL
+    - searches: the song URLs found for a query, kept SEARCH_TTL
+    the least recently used entries are evicted beyond max_bytes
+    in offline mode the expired entries are still used & the misses never go to the network
+    """
+    DB_FILE_NAME = "ug_cache.db"
+    SONG_TTL = 30 * 24 * 3600  # seconds
+    SEARCH_TTL = 24 * 3600  # seconds
+    MAX_BYTES = 200 * 1024 * 1024
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            value TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            stored_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entries_by_access ON entries (accessed_at);
+    """
+    default_cache = None
+
+    def __init__(self, db_file_name: str = DB_FILE_NAME, max_bytes: int = MAX_BYTES, song_ttl: float = SONG_TTL,
+                 search_ttl: float = SEARCH_TTL, offline: bool = False):
+        """
+        :param db_file_name: ":memory:" for a cache of the session only
+        :param max_bytes: size of the stored values beyond which the least recently used are evicted
+        :param song_ttl: in seconds
+        :param search_ttl: in seconds
+        :param offline: True to never go to the network
+        """
+        self.db_file_name = db_file_name
+        self.max_bytes = max_bytes
+        self.ttls = {"song": song_ttl, "search": search_ttl}
+        self.offline = offline
+        self.debug = False
+        self.nb_hits = 0
+        self.nb_misses = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_file_name, check_same_thread=False)
+        if db_file_name != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(self.SCHEMA)
+        self.size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    @staticmethod
+    def get_default_cache():
+        """
+        :return: the cache shared by the whole application
+        """
+        if not SongCache.default_cache:
+            SongCache.default_cache = SongCache()
+        return SongCache.default_cache
+
+    def _get(self, kind: str, key: str):
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute("SELECT value, stored_at FROM entries WHERE key = ? AND kind = ?",
+                                          (key, kind)).fetchone()
+            if not row or (not self.offline and now - row[1] > self.ttls[kind]):
+                self.nb_misses += 1
+                return None
+            self.connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.connection.commit()
+            self.nb_hits += 1
+        return json.loads(row[0])
+
+    def _put(self, kind: str, key: str, value):
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self.lock:
+            previous = self.connection.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self.connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                                    (key, kind, data, len(data), now, now))
+            self.size += len(data) - (previous[0] if previous else 0)
+            self._evict()
+            self.connection.commit()
+
+    def _evict(self):
+        if self.size <= self.max_bytes:
+            return
+        # oldest accesses first, until the cache fits
+        for key, size in self.connection.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+            self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.size -= size
+            if self.debug:
+                print("SongCache: evicted", key)
+            if self.size <= self.max_bytes:
+                break
+
+    # songs
+
+    def get_song(self, url: str) -> UltimateGuitarSong:
+        """
+        :param url: a UG song page
+        :return: the cached song, None if missing or expired
+        """
+        data = self._get("song", url)
+        if data is None:
+            return None
+        song = UltimateGuitarSong()
+        song.url = url
+        song.artist = data["artist"]
+        song.song_title = data["song_title"]
+        song.page_title = data["page_title"]
+        song.line_of_chords = data["line_of_chords"]
+        song.lyrics = data["lyrics"]
+        song.tabs = data["tabs"]
+        for chord_name in data["chords_sequence"]:
+            try:
+                song.chords_sequence.append(Chord(chord_name))
+            except ValueError:
+                song.chords_sequence.append(chord_name)
+        return song
+
+    def put_song(self, song: UltimateGuitarSong):
+        """
+        :param song: a digested song - the html of the page is not kept
+        :return:
+        """
+        self._put("song", song.url, {"artist": song.artist, "song_title": song.song_title,
+                                     "page_title": song.page_title, "line_of_chords": song.line_of_chords,
+                                     "lyrics": song.lyrics, "tabs": [str(t) for t in song.tabs],
+                                     "chords_sequence": [str(c) for c in song.chords_sequence]})
+
+    def iter_songs(self, batch_size: int = 1000):
+        """
+        every cached song, expired or not - the access times are not updated
+        :param batch_size: number of songs read at once
+        :return: generator of (url, artist, song title, names of the chords)
+        """
+        offset = 0
+        while True:
+            with self.lock:
+                rows = self.connection.execute(
+                    "SELECT key, json_extract(value, '$.artist'), json_extract(value, '$.song_title'), "
+                    "json_extract(value, '$.chords_sequence') FROM entries WHERE kind = 'song' "
+                    "ORDER BY rowid LIMIT ? OFFSET ?", (batch_size, offset)).fetchall()
+            for url, artist, song_title, chords_sequence in rows:
+                yield url, artist, song_title, json.loads(chords_sequence)
+            if len(rows) < batch_size:
+                break
+            offset += batch_size
+
+    # searches
+
+    def get_search(self, query: str):
+        """
+        :param query: eg "chords:C E F|20"
+        :return: the cached result of the search (list of URLs, dict of lists of URLs...), None if missing or expired
+        """
+        return self._get("search", query)
+
+    def put_search(self, query: str, result):
+        """
+        :param query: eg "chords:C E F|20"
+        :param result: list of URLs, dict of lists of URLs...
+        :return:
+        """
+        self._put("search", query, result)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
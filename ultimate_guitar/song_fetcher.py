@@ -0,0 +1,161 @@
+import http.client
+import socket
+import threading
+import time
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from pyharmonytools.song.ultimate_guitar_song import UltimateGuitarSong
+
+from file_capabilities.http_session import HttpSession
+from ultimate_guitar.song_cache import SongCache
+
+
+class SongFetcher:
+    """
+    downloads & digests Ultimate Guitar song pages in a pool of threads
+    the requests to a host are limited in number (MAX_PER_HOST at once) and in rate (MIN_HOST_INTERVAL between 2)
+    to avoid the HTTP ERROR 429 of UG; failed requests are retried with an exponential backoff
+    the songs found in the SongCache are not downloaded again
+    the pages are downloaded through an HttpSession, so that the connections to UG are kept alive
+    """
+    MAX_WORKERS = 8
+    MAX_PER_HOST = 2
+    MIN_HOST_INTERVAL = 0.25  # seconds between 2 requests to the same host
+    MAX_RETRIES = 3
+    BACKOFF = 1.0  # seconds before the 1st retry, doubled at each retry
+    RETRY_HTTP_CODES = (429, 500, 502, 503, 504)
+    RETRY_ERRORS = (urllib.error.URLError, http.client.HTTPException, socket.timeout, ConnectionError)
+    default_fetcher = None
+    default_fetcher_lock = threading.Lock()
+
+    def __init__(self, max_workers: int = MAX_WORKERS, max_per_host: int = MAX_PER_HOST,
+                 min_host_interval: float = MIN_HOST_INTERVAL, max_retries: int = MAX_RETRIES,
+                 backoff: float = BACKOFF, song_cache: SongCache = None, http_session: HttpSession = None):
+        self.max_per_host = max_per_host
+        self.min_host_interval = min_host_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.song_cache = song_cache
+        self.http_session = http_session or HttpSession.get_default_session()
+        self.debug = False
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="_song_fetcher")
+        self.lock = threading.Lock()
+        self.host_semaphores = {}
+        self.host_next_request = {}
+        self.active_fetches = set()  # cancellation events of the running fetch()
+
+    @staticmethod
+    def get_default_fetcher():
+        """
+        :return: the fetcher shared by the whole application, backed by the default SongCache & HttpSession
+        """
+        with SongFetcher.default_fetcher_lock:
+            if not SongFetcher.default_fetcher:
+                SongFetcher.default_fetcher = SongFetcher(song_cache=SongCache.get_default_cache())
+            return SongFetcher.default_fetcher
+
+    def _wait_for_host(self, host: str, cancelled: threading.Event):
+        with self.lock:
+            now = time.monotonic()
+            request_time = max(now, self.host_next_request.get(host, now))
+            self.host_next_request[host] = request_time + self.min_host_interval
+        cancelled.wait(request_time - now)
+
+    def _get_host_semaphore(self, host: str) -> threading.Semaphore:
+        with self.lock:
+            if host not in self.host_semaphores:
+                self.host_semaphores[host] = threading.Semaphore(self.max_per_host)
+            return self.host_semaphores[host]
+
+    def _download(self, url: str) -> str:
+        return self.http_session.get(url).text('utf-8')
+
+    def fetch_html(self, url: str, cancelled: threading.Event = None) -> str:
+        """
+        :param url: page to download
+        :param cancelled: the download stops before the next attempt once set
+        :return: the content of the page
+        """
+        cancelled = cancelled or threading.Event()
+        host = urlsplit(url).netloc
+        semaphore = self._get_host_semaphore(host)
+        attempt = 0
+        while True:
+            if cancelled.is_set():
+                raise InterruptedError(f"Download of {url} cancelled")
+            self._wait_for_host(host, cancelled)
+            try:
+                with semaphore:
+                    return self._download(url)
+            except urllib.error.HTTPError as err:
+                if err.code not in self.RETRY_HTTP_CODES or attempt >= self.max_retries:
+                    raise
+                retry_after = err.headers.get("Retry-After") if err.headers else None
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else self.backoff * 2 ** attempt
+            except self.RETRY_ERRORS:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+            attempt += 1
+            if self.debug:
+                print(f"SongFetcher: retry {attempt} of {url} in {delay}s")
+            cancelled.wait(delay)
+
+    def fetch_song(self, url: str, cancelled: threading.Event = None) -> UltimateGuitarSong:
+        """
+        :param url: a UG song page
+        :param cancelled: the download stops before the next attempt once set
+        :return: the digested song
+        """
+        if self.song_cache:
+            song = self.song_cache.get_song(url)
+            if song:
+                return song
+            if self.song_cache.offline:
+                raise LookupError(f"{url} is not in the cache - offline mode")
+        song = UltimateGuitarSong()
+        song.digest(self.fetch_html(url, cancelled))
+        song.url = url
+        if self.song_cache:
+            self.song_cache.put_song(song)
+        return song
+
+    def fetch(self, urls: [str], cancelled: threading.Event = None):
+        """
+        downloads the songs concurrently - duplicated URLs are downloaded once
+        :param urls: UG song pages
+        :param cancelled: set it (or call cancel()) to stop the downloads, the pending ones are not started
+        :return: generator of (url, UltimateGuitarSong or None, exception or None) in the order of completion
+        """
+        cancelled = cancelled or threading.Event()
+        with self.lock:
+            self.active_fetches.add(cancelled)
+        futures = {}
+        try:
+            for url in dict.fromkeys(urls):
+                futures[self.executor.submit(self.fetch_song, url, cancelled)] = url
+            for future in as_completed(futures):
+                if cancelled.is_set():
+                    break
+                error = future.exception()
+                yield futures[future], None if error else future.result(), error
+        finally:
+            for future in futures:
+                future.cancel()
+            with self.lock:
+                self.active_fetches.discard(cancelled)
+
+    def cancel(self):
+        """
+        stops all the running fetch()
+        :return:
+        """
+        with self.lock:
+            for cancelled in self.active_fetches:
+                cancelled.set()
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False)